@@ -1,27 +1,69 @@
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs, parse_qsl, urlencode, urlunparse
+import requests
+from requests.adapters import HTTPAdapter
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
 import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException
 from datetime import datetime
+from helpers.helper import save_json
+from helpers.legisinfo_export import EXPORT_JSON_URL, iter_export_bills
+from helpers.bill_index import (FIELDS_TO_COMPARE, append_changelog, bill_fingerprint, build_index,
+                                field_transitions, index_paths, load_index, save_index)
 
-def scrape_canada_bills():
-    """
-    Scrapes Canadian law bill information from the Parliament of Canada website,
-    updates the existing JSON data, and records changes with timestamps.
+# ============================================================
+# ==================== CONFIGURATION ========================
+# ============================================================
 
-    This function is designed to be run as a cron job or called via an API.
-    """
+# Listing page to crawl. Point BILLS_LISTING_URL at a local server to crawl saved listing pages.
+LISTING_URL = os.getenv("BILLS_LISTING_URL", "https://www.parl.ca/LegisInfo/en/bills?advancedview=true")
 
-    # ### Once upon a time, there was a scraper that had to visit a website with Canadian law-bill information.
-    # To achieve its mission, it set up the necessary tools to make its journey a success.
+# 'http' fetches listing pages over pooled HTTP and falls back to Selenium; 'selenium' drives Chrome only;
+# 'export' streams the LegisInfo bulk JSON/XML export from BILLS_EXPORT_SOURCE instead of scraping HTML.
+FETCH_MODE = os.getenv("BILLS_FETCH_MODE", "http")
+
+# Path or URL of the bulk export read in 'export' mode.
+EXPORT_SOURCE = os.getenv("BILLS_EXPORT_SOURCE", EXPORT_JSON_URL)
+
+# Number of listing pages requested in parallel (also the size of the HTTP connection pool).
+HTTP_MAX_WORKERS = int(os.getenv("BILLS_HTTP_MAX_WORKERS", "8"))
+
+# Card parser used for listing pages: 'lxml' (compiled XPath, single parse) or 'bs4' (reference parser).
+PARSER_ENGINE = os.getenv("BILLS_PARSER_ENGINE", "lxml")
 
+# 'full' walks every listing page; 'delta' walks the listing sorted by latest activity and stops
+# once DELTA_UNCHANGED_PAGES pages in a row hold only unchanged bills (HTTP fetch mode only).
+CRAWL_MODE = os.getenv("BILLS_CRAWL_MODE", "full")
+
+# Consecutive fully-unchanged pages after which a delta crawl stops.
+DELTA_UNCHANGED_PAGES = int(os.getenv("BILLS_DELTA_UNCHANGED_PAGES", "2"))
+
+# Query parameters that sort the listing by most recently updated bills first, for the delta crawl.
+DELTA_SORT_PARAMS = {"sortBy": "LatestActivityDateTime", "sortDirection": "desc"}
+
+# Seconds to wait for a single listing page over HTTP.
+HTTP_TIMEOUT = 30
+
+# Base used to absolutize the relative bill links found on listing cards.
+PARL_BASE_URL = "https://www.parl.ca"
+
+
+def build_chrome_driver():
+    """
+    Builds the Chrome driver used for the Selenium crawl.
+
+    Returns:
+        webdriver.Chrome: A configured Chrome driver.
+    """
     # Set up Chrome options
     # #### Our scraper needed a vehicle to traverse the web - a Chrome browser with specific configurations to keep it running smoothly.
     chrome_options = Options()
@@ -38,106 +80,460 @@ def scrape_canada_bills():
     # Initialize the Chrome driver
     # #### With everything set, the scraper called upon ChromeDriver and got ready to begin the mission.
     service = Service(chromedriver_path)
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    return webdriver.Chrome(service=service, options=chrome_options)
 
-    # ### Our scraper's main goal was to collect information about bills in Canada.
-    # It had to carefully navigate through pages, pick up pieces of data, and return with a full basket of information.
 
-    # Function to scrape bill information
-    # #### First, it defined a strategy - a function to gather all the bill details it could find on a given page.
-    def scrape_bills_info(driver):
-        # #### The scraper had to wait for the right elements to appear before collecting the information, ensuring no detail was missed.
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.bill"))
-        )
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'div.progress-bar-wrapper'))
-        )
-
-        # Get the page source and parse it with BeautifulSoup
-        # #### Once ready, it gathered all the HTML data and asked BeautifulSoup to help it read through.
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-
-        # Initialize an empty list to hold the bill information
-        bills_info = []
-
-        # Find all bill card containers
-        # #### The scraper discovered several bill cards, each containing valuable information.
-        bill_cards = soup.find_all('div', class_='bill')
-
-        # Loop through each bill card and extract information
-        # #### For each card, it carefully extracted details such as the title, bill number, and progress.
-        for card in bill_cards:
-            bill_info = {}
-            bill_info['href'] = "https://www.parl.ca" + card.find('a', class_='bill-tile-container')['href']
-            bill_info['bill_number'] = card.find('h4', class_='bill-number').text.strip()
-            bill_info['title'] = card.find('h5').text.strip()
-            bill_info['current_status'] = card.find_all('dl')[0].find('dd').text.strip()
-            bill_info['last_major_stage_completed'] = card.find_all('dl')[1].find('dd').text.strip()
-            bill_info['parliament_session'] = card.find('div', class_='parliament-session').text.strip()
-
-            # #### The scraper needed to understand if the bill was a House bill (C) or a Senate bill (S).
-            is_c_bill = 'c-' in bill_info['href'].lower()
-
-            # Process the progress bars
-            # #### It then moved on to analyze the bill's progress, carefully examining the House and Senate readings.
-            progress_bar_wrapper = card.find('div', class_='progress-bar-wrapper')
-            if is_c_bill:
-                house_progress = progress_bar_wrapper.find('div', class_='progress-bar-group first-group house')
-                senate_progress = progress_bar_wrapper.find('div', class_='progress-bar-group second-group senate')
+def parse_bills_page(page_source):
+    """
+    Parses the bill cards of one listing page.
+
+    Args:
+        page_source (str): The HTML of a LegisInfo listing page.
+
+    Returns:
+        list: One dictionary of bill information per bill card.
+    """
+    # Get the page source and parse it with BeautifulSoup
+    # #### Once ready, it gathered all the HTML data and asked BeautifulSoup to help it read through.
+    soup = BeautifulSoup(page_source, 'html.parser')
+
+    # Initialize an empty list to hold the bill information
+    bills_info = []
+
+    # Find all bill card containers
+    # #### The scraper discovered several bill cards, each containing valuable information.
+    bill_cards = soup.find_all('div', class_='bill')
+
+    # Loop through each bill card and extract information
+    # #### For each card, it carefully extracted details such as the title, bill number, and progress.
+    for card in bill_cards:
+        bill_info = {}
+        bill_info['href'] = PARL_BASE_URL + card.find('a', class_='bill-tile-container')['href']
+        bill_info['bill_number'] = card.find('h4', class_='bill-number').text.strip()
+        bill_info['title'] = card.find('h5').text.strip()
+        bill_info['current_status'] = card.find_all('dl')[0].find('dd').text.strip()
+        bill_info['last_major_stage_completed'] = card.find_all('dl')[1].find('dd').text.strip()
+        bill_info['parliament_session'] = card.find('div', class_='parliament-session').text.strip()
+
+        # #### The scraper needed to understand if the bill was a House bill (C) or a Senate bill (S).
+        is_c_bill = 'c-' in bill_info['href'].lower()
+
+        # Process the progress bars
+        # #### It then moved on to analyze the bill's progress, carefully examining the House and Senate readings.
+        progress_bar_wrapper = card.find('div', class_='progress-bar-wrapper')
+        if is_c_bill:
+            house_progress = progress_bar_wrapper.find('div', class_='progress-bar-group first-group house')
+            senate_progress = progress_bar_wrapper.find('div', class_='progress-bar-group second-group senate')
+        else:
+            senate_progress = progress_bar_wrapper.find('div', class_='progress-bar-group first-group senate')
+            house_progress = progress_bar_wrapper.find('div', class_='progress-bar-group second-group house')
+
+        royal_assent_progress = progress_bar_wrapper.find('div', class_='royal-assent-group')
+
+        # Senate progress
+        # #### The scraper documented the status of each reading in the Senate - whether it was completed or not.
+        for reading, stage in [('first_reading', 'first-reading'), ('second_reading', 'second-reading'),
+                               ('third_reading', 'third-reading')]:
+            if senate_progress and senate_progress.find('div', class_=stage):
+                bill_info['senate_' + reading] = 'Completed' if 'stage-completed' in \
+                                                                senate_progress.find('div', class_=stage)[
+                                                                    'class'] else 'Not Completed'
             else:
-                senate_progress = progress_bar_wrapper.find('div', class_='progress-bar-group first-group senate')
-                house_progress = progress_bar_wrapper.find('div', class_='progress-bar-group second-group house')
-
-            royal_assent_progress = progress_bar_wrapper.find('div', class_='royal-assent-group')
-
-            # Senate progress
-            # #### The scraper documented the status of each reading in the Senate - whether it was completed or not.
-            for reading, stage in [('first_reading', 'first-reading'), ('second_reading', 'second-reading'),
-                                   ('third_reading', 'third-reading')]:
-                if senate_progress and senate_progress.find('div', class_=stage):
-                    bill_info['senate_' + reading] = 'Completed' if 'stage-completed' in \
-                                                                    senate_progress.find('div', class_=stage)[
-                                                                        'class'] else 'Not Completed'
-                else:
-                    bill_info['senate_' + reading] = 'Not Applicable'
-
-            # House progress
-            # #### Similarly, it checked the House progress for each reading.
-            for reading, stage in [('first_reading', 'first-reading'), ('second_reading', 'second-reading'),
-                                   ('third_reading', 'third-reading')]:
-                if house_progress and house_progress.find('div', class_=stage):
-                    bill_info['house_' + reading] = 'Completed' if 'stage-completed' in \
-                                                                   house_progress.find('div', class_=stage)[
-                                                                       'class'] else 'Not Completed'
-                else:
-                    bill_info['house_' + reading] = 'Not Applicable'
-
-            # Royal Assent
-            # #### The final step was to determine if the bill had received Royal Assent.
-            if royal_assent_progress:
-                royal_assent_div = royal_assent_progress.find('div', class_='royal-assent')
-                bill_info['royal_assent'] = 'Completed' if royal_assent_div and 'stage-completed' in royal_assent_div[
-                    'class'] else 'Not Completed'
+                bill_info['senate_' + reading] = 'Not Applicable'
+
+        # House progress
+        # #### Similarly, it checked the House progress for each reading.
+        for reading, stage in [('first_reading', 'first-reading'), ('second_reading', 'second-reading'),
+                               ('third_reading', 'third-reading')]:
+            if house_progress and house_progress.find('div', class_=stage):
+                bill_info['house_' + reading] = 'Completed' if 'stage-completed' in \
+                                                               house_progress.find('div', class_=stage)[
+                                                                   'class'] else 'Not Completed'
             else:
-                bill_info['royal_assent'] = 'Not Applicable'
+                bill_info['house_' + reading] = 'Not Applicable'
+
+        # Royal Assent
+        # #### The final step was to determine if the bill had received Royal Assent.
+        if royal_assent_progress:
+            royal_assent_div = royal_assent_progress.find('div', class_='royal-assent')
+            bill_info['royal_assent'] = 'Completed' if royal_assent_div and 'stage-completed' in royal_assent_div[
+                'class'] else 'Not Completed'
+        else:
+            bill_info['royal_assent'] = 'Not Applicable'
+
+        # #### Add the current timestamp to the bill information
+        bill_info['last_updated_at'] = datetime.now().isoformat()
+
+        # #### With all the gathered details, it added this bill's information to its collection.
+        bills_info.append(bill_info)
+
+    return bills_info
+
+
+def scrape_bills_info(driver):
+    """
+    Waits for the listing page loaded in the driver to render and parses its bill cards.
+
+    Args:
+        driver (webdriver.Chrome): Driver currently showing a listing page.
+
+    Returns:
+        list: One dictionary of bill information per bill card.
+    """
+    # #### The scraper had to wait for the right elements to appear before collecting the information, ensuring no detail was missed.
+    WebDriverWait(driver, 10).until(
+        EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.bill"))
+    )
+    WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, 'div.progress-bar-wrapper'))
+    )
+    return PAGE_PARSERS[PARSER_ENGINE](driver.page_source)
+
+
+def listing_page_url(listing_url, page_number):
+    """
+    Builds the URL of a numbered listing page.
+
+    Args:
+        listing_url (str): The first listing page URL.
+        page_number (int): 1-based page number.
+
+    Returns:
+        str: The listing URL with its 'page' query parameter set.
+    """
+    parts = urlparse(listing_url)
+    query = parse_qs(parts.query, keep_blank_values=True)
+    query['page'] = [str(page_number)]
+    return urlunparse(parts._replace(query=urlencode(query, doseq=True)))
+
+
+def delta_listing_url(listing_url):
+    """
+    Builds the URL of a listing sorted by latest activity, as walked by the delta crawl.
+
+    Args:
+        listing_url (str): The first listing page URL.
+
+    Returns:
+        str: The listing URL with its sort parameters set to DELTA_SORT_PARAMS.
+    """
+    parts = urlparse(listing_url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if key not in DELTA_SORT_PARAMS]
+    query.extend(DELTA_SORT_PARAMS.items())
+    return urlunparse(parts._replace(query=urlencode(query)))
+
+
+def _has_class(tag, class_name):
+    """Builds an XPath step matching a tag that carries class_name as one of its classes."""
+    return f"{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+
+
+def _has_exact_class(tag, class_value):
+    """Builds an XPath step matching a tag whose whole class attribute is class_value."""
+    return f"{tag}[normalize-space(@class)='{class_value}']"
+
+
+# Compiled once and reused for every card of every page.
+_XP_BILL_CARDS = etree.XPath('//' + _has_class('div', 'bill'))
+_XP_CARD_HREF = etree.XPath('(.//' + _has_class('a', 'bill-tile-container') + ')[1]/@href')
+_XP_CARD_NUMBER = etree.XPath('string((.//' + _has_class('h4', 'bill-number') + ')[1])')
+_XP_CARD_TITLE = etree.XPath('string((.//h5)[1])')
+_XP_CARD_CURRENT_STATUS = etree.XPath('string(((.//dl)[1]//dd)[1])')
+_XP_CARD_LAST_STAGE = etree.XPath('string(((.//dl)[2]//dd)[1])')
+_XP_CARD_SESSION = etree.XPath('string((.//' + _has_class('div', 'parliament-session') + ')[1])')
+_XP_PROGRESS_WRAPPER = etree.XPath('(.//' + _has_class('div', 'progress-bar-wrapper') + ')[1]')
+_XP_PROGRESS_GROUPS = {
+    group: etree.XPath('(.//' + _has_exact_class('div', 'progress-bar-group ' + group) + ')[1]')
+    for group in ('first-group house', 'second-group senate', 'first-group senate', 'second-group house')
+}
+_XP_ROYAL_ASSENT_GROUP = etree.XPath('(.//' + _has_class('div', 'royal-assent-group') + ')[1]')
+_XP_STAGE_CLASSES = {
+    stage: etree.XPath('(.//' + _has_class('div', stage) + ')[1]/@class')
+    for stage in ('first-reading', 'second-reading', 'third-reading', 'royal-assent')
+}
+_XP_NEXT_PAGE = etree.XPath('//a[contains(@aria-label, "Next page")]')
+
+READING_STAGES = [('first_reading', 'first-reading'), ('second_reading', 'second-reading'),
+                  ('third_reading', 'third-reading')]
+
+
+def _first(elements):
+    return elements[0] if elements else None
+
+
+def _stage_status(group, stage):
+    """Returns 'Completed'/'Not Completed' for a stage div inside group, or None when it is absent."""
+    if group is None:
+        return None
+    classes = _first(_XP_STAGE_CLASSES[stage](group))
+    if classes is None:
+        return None
+    return 'Completed' if 'stage-completed' in classes.split() else 'Not Completed'
+
+
+def parse_bills_page_lxml(page_source):
+    """
+    Parses the bill cards of one listing page with lxml and compiled XPath selectors.
+
+    Produces the same records as parse_bills_page, but the page is parsed once by libxml2
+    and every field is read with a precompiled selector instead of repeated soup searches.
+
+    Args:
+        page_source (str): The HTML of a LegisInfo listing page.
+
+    Returns:
+        list: One dictionary of bill information per bill card.
+    """
+    root = lxml_html.fromstring(page_source)
+    last_updated_at = datetime.now().isoformat()
+    bills_info = []
+
+    for card in _XP_BILL_CARDS(root):
+        bill_info = {}
+        bill_info['href'] = PARL_BASE_URL + _XP_CARD_HREF(card)[0]
+        bill_info['bill_number'] = _XP_CARD_NUMBER(card).strip()
+        bill_info['title'] = _XP_CARD_TITLE(card).strip()
+        bill_info['current_status'] = _XP_CARD_CURRENT_STATUS(card).strip()
+        bill_info['last_major_stage_completed'] = _XP_CARD_LAST_STAGE(card).strip()
+        bill_info['parliament_session'] = _XP_CARD_SESSION(card).strip()
+
+        progress_bar_wrapper = _first(_XP_PROGRESS_WRAPPER(card))
+        if 'c-' in bill_info['href'].lower():
+            house_group, senate_group = 'first-group house', 'second-group senate'
+        else:
+            house_group, senate_group = 'second-group house', 'first-group senate'
+        house_progress = _first(_XP_PROGRESS_GROUPS[house_group](progress_bar_wrapper))
+        senate_progress = _first(_XP_PROGRESS_GROUPS[senate_group](progress_bar_wrapper))
+
+        for reading, stage in READING_STAGES:
+            bill_info['senate_' + reading] = _stage_status(senate_progress, stage) or 'Not Applicable'
+        for reading, stage in READING_STAGES:
+            bill_info['house_' + reading] = _stage_status(house_progress, stage) or 'Not Applicable'
+
+        royal_assent_progress = _first(_XP_ROYAL_ASSENT_GROUP(progress_bar_wrapper))
+        if royal_assent_progress is not None:
+            bill_info['royal_assent'] = _stage_status(royal_assent_progress, 'royal-assent') or 'Not Completed'
+        else:
+            bill_info['royal_assent'] = 'Not Applicable'
+
+        bill_info['last_updated_at'] = last_updated_at
+        bills_info.append(bill_info)
+
+    return bills_info
+
+
+# Card parsers by engine name. Both emit identical bill records.
+PAGE_PARSERS = {
+    'bs4': parse_bills_page,
+    'lxml': parse_bills_page_lxml
+}
+
+
+def has_next_page(page_source):
+    """
+    Checks whether a listing page links to a following page.
+
+    Args:
+        page_source (str): The HTML of a listing page.
+
+    Returns:
+        bool: True if the page has a "Next page" link.
+    """
+    return bool(_XP_NEXT_PAGE(lxml_html.fromstring(page_source)))
+
+
+def build_http_session(pool_size=HTTP_MAX_WORKERS):
+    """
+    Builds a requests session whose connection pool can serve every parallel page request.
+
+    Args:
+        pool_size (int): Number of pooled connections per host.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
 
-            # #### Add the current timestamp to the bill information
-            bill_info['last_updated_at'] = datetime.now().isoformat()
+def iter_listing_pages_http(listing_url=LISTING_URL, max_workers=HTTP_MAX_WORKERS):
+    """
+    Fetches listing pages over pooled HTTP, requesting pages in parallel windows.
+
+    Pages are requested max_workers at a time and yielded in page order. The crawl stops at the
+    first page without bill cards or without a "Next page" link, or when the caller stops iterating.
 
-            # #### With all the gathered details, it added this bill's information to its collection.
-            bills_info.append(bill_info)
+    Args:
+        listing_url (str): The first listing page URL.
+        max_workers (int): Number of pages requested in parallel.
 
-        return bills_info
+    Yields:
+        str: The HTML of each listing page, in page order.
+    """
+    session = build_http_session(max_workers)
 
+    def fetch(page_number):
+        response = session.get(listing_page_url(listing_url, page_number), timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+        return response.text
+
+    next_page_number = 1
     try:
-        # ### The adventure begins - the scraper visited the website, gathering information from page to page.
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                window = range(next_page_number, next_page_number + max_workers)
+                for page_source in executor.map(fetch, window):
+                    if 'bill-tile-container' not in page_source:
+                        return
+                    yield page_source
+                    if not has_next_page(page_source):
+                        return
+                next_page_number += max_workers
+    finally:
+        session.close()
+
+
+def scrape_all_bills_http(listing_url=LISTING_URL, max_workers=HTTP_MAX_WORKERS):
+    """
+    Scrapes every listing page without a browser.
+
+    Args:
+        listing_url (str): The first listing page URL.
+        max_workers (int): Number of pages requested in parallel.
+
+    Returns:
+        list: Bill information for every bill card, in listing order.
+    """
+    page_sources = list(iter_listing_pages_http(listing_url, max_workers))
+
+    # #### Reading the pages was now the slow part, so the scraper timed how long each one took.
+    parse_page = PAGE_PARSERS[PARSER_ENGINE]
+    all_bills_info = []
+    parse_started_at = time.perf_counter()
+    for page_source in page_sources:
+        all_bills_info.extend(parse_page(page_source))
+    parse_seconds = time.perf_counter() - parse_started_at
+    if page_sources:
+        print(f"Parsed {len(page_sources)} pages with {PARSER_ENGINE} in {parse_seconds * 1000:.1f}ms "
+              f"({parse_seconds * 1000 / len(page_sources):.2f}ms/page)")
+    return all_bills_info
+
+
+def is_bill_unchanged(bill, existing_data_dict):
+    """
+    Checks whether a scraped bill matches its stored snapshot on every compared field.
+
+    Args:
+        bill (dict): Freshly scraped bill information.
+        existing_data_dict (dict): Stored bills keyed by 'href'.
+
+    Returns:
+        bool: True if the bill is already stored with identical compared fields.
+    """
+    existing_bill = existing_data_dict.get(bill['href'])
+    if existing_bill is None:
+        return False
+    return all(existing_bill.get(field) == bill.get(field) for field in FIELDS_TO_COMPARE)
+
+
+def scrape_changed_bills_http(existing_data_dict, listing_url=None,
+                              unchanged_pages_to_stop=DELTA_UNCHANGED_PAGES, max_workers=HTTP_MAX_WORKERS):
+    """
+    Scrapes the most recently updated listing pages until the listing stops showing changes.
+
+    The listing is expected to be sorted by latest activity, so once unchanged_pages_to_stop pages
+    in a row hold only bills identical to the stored snapshot, the remaining pages are skipped.
+
+    Args:
+        existing_data_dict (dict): Stored bills keyed by 'href'.
+        listing_url (str): The first page of the listing sorted by latest activity;
+            defaults to LISTING_URL sorted by delta_listing_url.
+        unchanged_pages_to_stop (int): Consecutive fully-unchanged pages that end the crawl.
+        max_workers (int): Number of pages requested in parallel.
+
+    Returns:
+        tuple: (bill information for every fetched card, crawl statistics dictionary)
+    """
+    if listing_url is None:
+        listing_url = delta_listing_url(LISTING_URL)
+    parse_page = PAGE_PARSERS[PARSER_ENGINE]
+    all_bills_info = []
+    pages_fetched = 0
+    pages_unchanged = 0
+    consecutive_unchanged = 0
+    bills_per_page = 0
+
+    # Fetching far past the stopping point would waste requests, so the window never exceeds it.
+    pages = iter_listing_pages_http(listing_url, max(1, min(max_workers, unchanged_pages_to_stop)))
+    try:
+        for page_source in pages:
+            page_bills = parse_page(page_source)
+            pages_fetched += 1
+            bills_per_page = max(bills_per_page, len(page_bills))
+            all_bills_info.extend(page_bills)
+
+            if all(is_bill_unchanged(bill, existing_data_dict) for bill in page_bills):
+                pages_unchanged += 1
+                consecutive_unchanged += 1
+                if consecutive_unchanged >= unchanged_pages_to_stop:
+                    break
+            else:
+                consecutive_unchanged = 0
+    finally:
+        pages.close()
+
+    # Skipped pages are estimated from the stored snapshot, since the crawl never saw the listing's end.
+    total_bills = max(len(existing_data_dict), len(all_bills_info))
+    estimated_pages = -(-total_bills // bills_per_page) if bills_per_page else pages_fetched
+    stats = {
+        'pages_fetched': pages_fetched,
+        'pages_unchanged': pages_unchanged,
+        'pages_skipped': max(0, estimated_pages - pages_fetched)
+    }
+    return all_bills_info, stats
 
-        # Define the URL
-        url = "https://www.parl.ca/LegisInfo/en/bills?advancedview=true"
 
+def load_existing_bills(output_file_path):
+    """
+    Loads the stored bills keyed by 'href'.
+
+    Args:
+        output_file_path (str): Path of CanadaBills.json.
+
+    Returns:
+        dict: Stored bills keyed by 'href'; empty when the file is missing or unreadable.
+    """
+    # Load existing data if the JSON file exists
+    if not os.path.exists(output_file_path):
+        return {}
+    with open(output_file_path, 'r') as json_file:
+        try:
+            existing_data = json.load(json_file)
+        except json.JSONDecodeError:
+            print("Existing JSON file is empty or corrupted. Starting fresh.")
+            return {}
+    # Convert the list to a dictionary keyed by 'href' for easy updating
+    return {bill['href']: bill for bill in existing_data}
+
+
+def scrape_all_bills_selenium(listing_url=LISTING_URL):
+    """
+    Scrapes every listing page by driving Chrome through the "Next page" links.
+
+    Args:
+        listing_url (str): The first listing page URL.
+
+    Returns:
+        list: Bill information for every bill card, in listing order.
+    """
+    driver = build_chrome_driver()
+    try:
         # Navigate to the URL
-        driver.get(url)
+        driver.get(listing_url)
         time.sleep(5)  # Wait for the page to load
 
         # Initialize an empty list to hold all bill information
@@ -164,93 +560,144 @@ def scrape_canada_bills():
                 print("No more pages available. Exiting...")
                 break
 
-        # ### After gathering all this valuable information, it was time for the scraper to store it safely.
+        return all_bills_info
+
+    finally:
+        # Close the browser window
+        driver.quit()
+
+
+def scrape_canada_bills(fetch_mode=FETCH_MODE, listing_url=LISTING_URL, output_file_path=None, crawl_mode=CRAWL_MODE):
+    """
+    Scrapes Canadian law bill information from the Parliament of Canada website,
+    updates the existing JSON data, and records changes with timestamps.
+
+    This function is designed to be run as a cron job or called via an API.
+
+    Args:
+        fetch_mode (str): 'http' to fetch listing pages over pooled HTTP with a Selenium fallback,
+            'selenium' to drive Chrome only, 'export' to read the bulk export at EXPORT_SOURCE.
+        listing_url (str): The first listing page URL.
+        output_file_path (str): Where to write the bills; defaults to storage/CanadaBills.json.
+        crawl_mode (str): 'full' to walk every page, 'delta' to stop once pages stop changing.
+    """
+
+    # ### Once upon a time, there was a scraper that had to visit a website with Canadian law-bill information.
+    # Our scraper's main goal was to collect information about bills in Canada.
+    # It had to carefully navigate through pages, pick up pieces of data, and return with a full basket of information.
+
+    try:
+        # ### The adventure begins - the scraper visited the website, gathering information from page to page.
+        started_at = time.monotonic()
+        all_bills_info = []
+        crawl_stats = None
 
         # Define the output file path
-        output_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../../storage', 'CanadaBills.json')
-
-        # Load existing data if the JSON file exists
-        if os.path.exists(output_file_path):
-            with open(output_file_path, 'r') as json_file:
-                try:
-                    existing_data = json.load(json_file)
-                    # Convert the list to a dictionary keyed by 'href' for easy updating
-                    existing_data_dict = {bill['href']: bill for bill in existing_data}
-                except json.JSONDecodeError:
-                    print("Existing JSON file is empty or corrupted. Starting fresh.")
-                    existing_data_dict = {}
-        else:
-            existing_data_dict = {}
+        if output_file_path is None:
+            output_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../../storage', 'CanadaBills.json')
+        existing_data_dict = load_existing_bills(output_file_path)
+
+        # #### When it could, the scraper skipped the browser entirely and asked for the pages directly, several at once.
+        if fetch_mode == 'http':
+            try:
+                # #### And when it already knew most bills, it only read the freshest pages until nothing new turned up.
+                if crawl_mode == 'delta' and existing_data_dict:
+                    all_bills_info, crawl_stats = scrape_changed_bills_http(
+                        existing_data_dict, delta_listing_url(listing_url))
+                else:
+                    all_bills_info = scrape_all_bills_http(listing_url)
+            except requests.RequestException as e:
+                print(f"HTTP listing fetch failed: {e}")
+            if not all_bills_info:
+                print("No bills found over HTTP. Falling back to Selenium...")
+
+        # #### Better still, LegisInfo offered the whole list as one download, which the scraper could read bill by bill.
+        if fetch_mode == 'export':
+            all_bills_info = list(iter_export_bills(EXPORT_SOURCE))
+        elif not all_bills_info:
+            if crawl_mode == 'delta' and existing_data_dict:
+                print("Delta crawl is only supported over HTTP; the Selenium crawl reads every page.")
+            all_bills_info = scrape_all_bills_selenium(listing_url)
+
+        crawl_seconds = time.monotonic() - started_at
+        print(f"Listing crawl took {crawl_seconds:.1f}s")
+
+        # ### After gathering all this valuable information, it was time for the scraper to store it safely.
+
+        # #### Rather than trusting its memory of every field, the scraper kept a fingerprint of each bill in a small index.
+        index_path, changelog_path = index_paths(output_file_path)
+        index = load_index(index_path)
+        if index is None:
+            index = build_index(existing_data_dict.values())
 
         # Initialize counters for summary statistics
         total_scraped = len(all_bills_info)
         new_bills_added = 0
         existing_bills_changed = 0
+        changed_at = datetime.now().isoformat()
+        changelog_entries = []
+        changed_hrefs = set()
 
         # Update the existing data with the newly scraped data
         for bill in all_bills_info:
             href = bill['href']
+            fingerprint = bill_fingerprint(bill)
+            index_entry = index.get(href)
+
+            # Unchanged bills keep their stored record, including its last_updated_at
+            if href in existing_data_dict and index_entry and index_entry['fingerprint'] == fingerprint:
+                continue
+            changed_hrefs.add(href)
+
             if href in existing_data_dict:
-                # Compare existing bill data with the new bill data
-                existing_bill = existing_data_dict[href]
-                # Define the fields to compare
-                fields_to_compare = [
-                    'bill_number',
-                    'title',
-                    'current_status',
-                    'last_major_stage_completed',
-                    'parliament_session',
-                    'senate_first_reading',
-                    'senate_second_reading',
-                    'senate_third_reading',
-                    'house_first_reading',
-                    'house_second_reading',
-                    'house_third_reading',
-                    'royal_assent'
-                ]
-
-                # Check if any field has changed
-                change_detected = False
-                for field in fields_to_compare:
-                    if existing_bill.get(field) != bill.get(field):
-                        change_detected = True
-                        break
-
-                # Set the change_status based on whether a change was detected
-                bill['change_status'] = change_detected
-
-                if change_detected:
-                    existing_bills_changed += 1
-
-                # Update the bill information in the existing data
-                existing_data_dict[href] = bill
+                existing_bills_changed += 1
             else:
-                # New bill entry
-                bill['change_status'] = True  # Since it's a new entry
-                existing_data_dict[href] = bill
                 new_bills_added += 1
 
-        # Convert the dictionary back to a list
-        updated_data = list(existing_data_dict.values())
-
-        # Write the updated bill information to the JSON file
-        with open(output_file_path, 'w') as json_file:
-            json.dump(updated_data, json_file, indent=4)
+            # #### Each change was written down field by field, so nobody would have to compare whole snapshots again.
+            changelog_entries.extend(field_transitions(existing_data_dict.get(href), bill, changed_at))
+            bill['change_status'] = True
+            existing_data_dict[href] = bill
+            index[href] = {
+                'fingerprint': fingerprint,
+                'bill_number': bill['bill_number'],
+                'last_changed_at': changed_at
+            }
+
+        # #### change_status only flags the bills this run changed, so the flags of earlier runs were cleared.
+        statuses_cleared = 0
+        for href, bill in existing_data_dict.items():
+            if href not in changed_hrefs and bill.get('change_status'):
+                bill['change_status'] = False
+                statuses_cleared += 1
+
+        if new_bills_added or existing_bills_changed or statuses_cleared or not os.path.exists(index_path):
+            # Convert the dictionary back to a list
+            updated_data = list(existing_data_dict.values())
+
+            # Write the updated bill information to the JSON file, replacing it atomically. The file stays one
+            # snapshot because its readers load it whole; the changelog is the per-record history.
+            save_json(output_file_path, updated_data)
+
+            append_changelog(changelog_path, changelog_entries)
+            save_index(index_path, index)
+            print(f"Scraped bill information has been written to {output_file_path}")
+        else:
+            print(f"No bill changed. {output_file_path} left untouched.")
 
-        # ### And so, after completing its mission, our scraper closed its browser window and rested.
+        # ### And so, after completing its mission, our scraper rested.
 
         # Print summary statistics
         print(f"Total bills scraped: {total_scraped}")
         print(f"New bills added: {new_bills_added}")
         print(f"Existing bills changed: {existing_bills_changed}")
-        print(f"Scraped bill information has been written to {output_file_path}")
+        if crawl_stats is not None:
+            print(f"Delta crawl: {crawl_stats['pages_fetched']} pages fetched "
+                  f"({crawl_stats['pages_unchanged']} unchanged), "
+                  f"~{crawl_stats['pages_skipped']} pages skipped, {crawl_seconds:.1f}s wall time")
 
     except Exception as e:
         print(f"An error occurred during scraping: {e}")
 
-    finally:
-        # Close the browser window
-        driver.quit()
-
 if __name__ == "__main__":
     scrape_canada_bills()
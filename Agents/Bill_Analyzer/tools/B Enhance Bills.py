@@ -1,6 +1,14 @@
 import json
 import os
 import time
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urljoin, urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from lxml import html as lxml_html
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
@@ -8,100 +16,591 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
+from datetime import datetime, timedelta
+from config import STORAGE_DIR
+from helpers.helper import JsonlAppender, iter_json_file, iter_jsonl, save_json
+from helpers.blob_store import store_bill_content
+from helpers.bill_structure import index_bill_structure
+from helpers.bill_index import bill_fingerprint
 
 ### MAKE SURE TO MERGE THE DATA NOT APPEND THE DATA TO cANAFAbILLSeNHANCED.JSON - CURRENT YDOUBLE THE NUMBER OF BILLS.
 
-# Set up Chrome options
-chrome_options = Options()
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-dev-shm-usage")
-chrome_options.add_argument("--disable-extensions")
-chrome_options.add_argument("--disable-gpu")
-chrome_options.add_argument("--start-maximized")
-chrome_options.add_experimental_option("detach", True)
+# ============================================================
+# ==================== CONFIGURATION ========================
+# ============================================================
 
-# Define the path to your new ChromeDriver location
-chromedriver_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../../assets', 'chromedriver.exe')
+# 'selenium' runs a pool of headless Chrome drivers; 'http' fetches detail and publication pages without a browser.
+FETCH_MODE = os.getenv("ENHANCE_FETCH_MODE", "selenium")
 
-# Initialize the Chrome driver
-service = Service(chromedriver_path)
-driver = webdriver.Chrome(service=service, options=chrome_options)
+# Number of bills enhanced in parallel (one driver per worker in 'selenium' mode).
+ENHANCE_WORKERS = int(os.getenv("ENHANCE_WORKERS", "4"))
 
-# Function to enhance bill information
-def enhance_bill_info(bill):
-    driver.get(bill['href'])
-    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, 'attribute')))
+# Maximum simultaneous page loads against a single host, whatever the number of workers.
+PER_HOST_CONCURRENCY = int(os.getenv("ENHANCE_PER_HOST_CONCURRENCY", "4"))
 
-    # Extract the sponsor
-    try:
-        sponsor_element = driver.find_element(By.XPATH, "//div[div[@class='label' and contains(text(),'Sponsor')]]/div[not(@class='label')]")
-        bill['sponsor'] = sponsor_element.text
-    except:
-        bill['sponsor'] = 'Not Available'
+# A driver is quit and replaced after this many bill pages, to cap Chrome's memory growth.
+DRIVER_MAX_PAGES = int(os.getenv("ENHANCE_DRIVER_MAX_PAGES", "50"))
+
+# Run the pooled drivers without a window.
+HEADLESS = os.getenv("ENHANCE_HEADLESS", "true").lower() == "true"
+
+# Bill links point at parl.ca; BILLS_FETCH_BASE_URL redirects the fetches to another host, e.g. a local fixture server.
+PARL_BASE_URL = "https://www.parl.ca"
+FETCH_BASE_URL = os.getenv("BILLS_FETCH_BASE_URL", PARL_BASE_URL)
+
+# Seconds to wait for a single page over HTTP.
+HTTP_TIMEOUT = 30
+
+# Records synced to the checkpoint between fsyncs.
+CHECKPOINT_FSYNC_EVERY = int(os.getenv("ENHANCE_CHECKPOINT_FSYNC_EVERY", "10"))
+
+# Keep bill texts in the compressed blob store and only their hash and length in the records.
+# Their summary/part/section index is stored there too (see helpers/bill_structure.py).
+STORE_CONTENT_AS_BLOBS = os.getenv("ENHANCE_STORE_CONTENT_AS_BLOBS", "true").lower() == "true"
+
+def max_age_days(name, default):
+    """Reads a field's maximum age in days from the environment; an empty value or 'none' never expires."""
+    value = os.getenv(name, default).strip()
+    return None if value.lower() in ('', 'none') else float(value)
+
+
+# Maximum age in days of each enhanced field before its bill is fetched again; None never expires.
+# A bill is also fetched again as soon as its listing fingerprint differs from the one it was enhanced with.
+FIELD_MAX_AGE_DAYS = {
+    'sponsor': max_age_days("ENHANCE_SPONSOR_MAX_AGE_DAYS", "90"),
+    'bill_type': max_age_days("ENHANCE_BILL_TYPE_MAX_AGE_DAYS", "none"),
+    'bill_content': max_age_days("ENHANCE_CONTENT_MAX_AGE_DAYS", "30"),
+    'contact_email': max_age_days("ENHANCE_CONTACT_EMAIL_MAX_AGE_DAYS", "90")
+}
+
+# Keys derived from a bill's fetched text. A re-enhanced record is their only source: when it lacks one,
+# the consolidated record's old value is dropped rather than kept next to the new text.
+TEXT_DERIVED_KEYS = ['bill_content', 'bill_content_hash', 'bill_content_length', 'bill_structure_hash']
+
+# Storage files
+input_file_path = os.path.join(STORAGE_DIR, 'CanadaBills.json')
+output_file_path = os.path.join(STORAGE_DIR, 'CanadaBillsEnhanced.json')
+# Enhanced bills are appended here one per line, then compacted into output_file_path
+checkpoint_file_path = os.path.join(STORAGE_DIR, 'CanadaBillsEnhanced.checkpoint.jsonl')
+
+SPONSOR_XPATH = "//div[div[@class='label' and contains(text(),'Sponsor')]]/div[not(@class='label')]"
+BILL_TYPE_XPATH = "//div[div[@class='label' and contains(text(),'Bill type')]]/div[not(@class='label')]"
+PUBLICATION_BUTTON_CSS = 'a.publication.btn.btn-primary'
+PUBLICATION_BUTTON_XPATH = ("//a[contains(concat(' ', normalize-space(@class), ' '), ' publication ') and "
+                            "contains(concat(' ', normalize-space(@class), ' '), ' btn ') and "
+                            "contains(concat(' ', normalize-space(@class), ' '), ' btn-primary ')]")
+CONTACT_EMAIL_XPATH = "//a[contains(@href, 'mailto:')]"
+
+# HTTP mode reads pages the way Selenium's element.text (WebDriver's visible text) shows them:
+# elements whose end starts a new line of visible text
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'footer', 'form',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre',
+    'section', 'table', 'tr', 'ul'
+}
+# Table cells, separated by a space on their row's line
+CELL_TAGS = {'td', 'th'}
+# Elements never rendered, and elements hidden by an attribute or inline style. Elements hidden by a
+# stylesheet rule or by script are only hidden in the browser, so HTTP mode keeps their text.
+HIDDEN_TAGS = ['script', 'style', 'noscript', 'template', 'head']
+HIDDEN_XPATH = '|'.join(['.//' + tag for tag in HIDDEN_TAGS] + [
+    './/*[@hidden]',
+    ".//*[contains(translate(@style, ' ', ''), 'display:none')]",
+    ".//*[contains(translate(@style, ' ', ''), 'visibility:hidden')]"
+])
+
+
+def build_chrome_driver(headless=HEADLESS):
+    """
+    Builds a Chrome driver for enhancing bills.
+
+    Args:
+        headless (bool): Run Chrome without a window.
+
+    Returns:
+        webdriver.Chrome: A configured Chrome driver.
+    """
+    # Set up Chrome options
+    chrome_options = Options()
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--start-maximized")
+    if headless:
+        chrome_options.add_argument("--headless=new")
+    else:
+        chrome_options.add_experimental_option("detach", True)
+
+    # Define the path to your new ChromeDriver location
+    chromedriver_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../../assets', 'chromedriver.exe')
+
+    # Initialize the Chrome driver
+    service = Service(chromedriver_path)
+    return webdriver.Chrome(service=service, options=chrome_options)
+
+
+# Per-host semaphores limiting simultaneous page loads
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+
+@contextmanager
+def host_slot(url):
+    """
+    Holds one of the PER_HOST_CONCURRENCY slots of the url's host while loading it.
+
+    Args:
+        url (str): The URL about to be loaded.
+    """
+    host = urlparse(url).netloc
+    with _host_slots_lock:
+        slot = _host_slots.setdefault(host, threading.BoundedSemaphore(PER_HOST_CONCURRENCY))
+    with slot:
+        yield
 
-    # Extract the bill type
+
+def fetch_url(url):
+    """
+    Maps a parl.ca link onto FETCH_BASE_URL.
+
+    Args:
+        url (str): A link as stored on the bill.
+
+    Returns:
+        str: The URL to actually load.
+    """
+    if url.startswith(PARL_BASE_URL):
+        return FETCH_BASE_URL + url[len(PARL_BASE_URL):]
+    return url
+
+
+# Each worker thread owns one driver, replaced after DRIVER_MAX_PAGES bills
+_worker_state = threading.local()
+_pool_drivers = []
+_pool_drivers_lock = threading.Lock()
+
+
+def discard_worker_driver():
+    """Quits the calling worker's driver, e.g. after its browser crashed; the next bill gets a new one."""
+    driver = getattr(_worker_state, 'driver', None)
+    _worker_state.driver = None
+    if driver is not None:
+        release_driver(driver)
+
+
+def fetch_with_worker_driver(bill):
+    """
+    Enhances a bill with the calling worker's driver, replacing the driver when the bill fails.
+
+    Args:
+        bill (dict): The bill to enhance.
+
+    Returns:
+        dict: The enhanced bill.
+    """
     try:
-        bill_type_element = driver.find_element(By.XPATH, "//div[div[@class='label' and contains(text(),'Bill type')]]/div[not(@class='label')]")
-        bill['bill_type'] = bill_type_element.text
-    except:
-        bill['bill_type'] = 'Not Available'
+        return enhance_bill_info(bill, get_worker_driver())
+    except Exception:
+        # A crashed browser or dead session would otherwise fail every later bill of this worker
+        discard_worker_driver()
+        raise
+
 
-    # Attempt to click the "Text of the bill" button
+def get_worker_driver():
+    """
+    Returns the calling worker's driver, recycling it once it has loaded DRIVER_MAX_PAGES bills.
+
+    Returns:
+        webdriver.Chrome: The worker's driver.
+    """
+    driver = getattr(_worker_state, 'driver', None)
+    if driver is not None and _worker_state.pages >= DRIVER_MAX_PAGES:
+        release_driver(driver)
+        driver = None
+    if driver is None:
+        driver = build_chrome_driver()
+        with _pool_drivers_lock:
+            _pool_drivers.append(driver)
+        _worker_state.driver = driver
+        _worker_state.pages = 0
+    _worker_state.pages += 1
+    return driver
+
+
+def release_driver(driver):
+    """
+    Quits a pooled driver and forgets it.
+
+    Args:
+        driver (webdriver.Chrome): The driver to quit.
+    """
+    with _pool_drivers_lock:
+        if driver in _pool_drivers:
+            _pool_drivers.remove(driver)
     try:
-        WebDriverWait(driver, 3).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, 'a.publication.btn.btn-primary')))
-        text_button = driver.find_element(By.CSS_SELECTOR, 'a.publication.btn.btn-primary')
+        driver.quit()
+    except Exception as e:
+        print(f"Error closing driver: {e}")
+
+
+def shutdown_driver_pool():
+    """Quits every driver still held by a worker."""
+    with _pool_drivers_lock:
+        drivers = list(_pool_drivers)
+    for driver in drivers:
+        release_driver(driver)
+
+
+# Function to enhance bill information
+def enhance_bill_info(bill, driver):
+    url = fetch_url(bill['href'])
+    with host_slot(url):
+        driver.get(url)
+        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, 'attribute')))
+
+        # Extract the sponsor
+        try:
+            sponsor_element = driver.find_element(By.XPATH, SPONSOR_XPATH)
+            bill['sponsor'] = sponsor_element.text
+        except:
+            bill['sponsor'] = 'Not Available'
+
+        # Extract the bill type
+        try:
+            bill_type_element = driver.find_element(By.XPATH, BILL_TYPE_XPATH)
+            bill['bill_type'] = bill_type_element.text
+        except:
+            bill['bill_type'] = 'Not Available'
+
+        # Attempt to click the "Text of the bill" button
+        try:
+            WebDriverWait(driver, 3).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, PUBLICATION_BUTTON_CSS)))
+            text_button = driver.find_element(By.CSS_SELECTOR, PUBLICATION_BUTTON_CSS)
 
-        # Click using JavaScript
-        driver.execute_script("arguments[0].click();", text_button)
+            # Click using JavaScript
+            driver.execute_script("arguments[0].click();", text_button)
 
-        # Wait for the text to be visible
-        WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.TAG_NAME, 'body')))
-        time.sleep(2)  # Wait a bit more for safety
+            # Wait for the text to be visible
+            WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.TAG_NAME, 'body')))
+            time.sleep(2)  # Wait a bit more for safety
 
-        # Extract all visible text as the bill content
-        bill_text = driver.find_element(By.TAG_NAME, 'body').text
-        bill['bill_content'] = bill_text
-    except TimeoutException:
+            # Extract all visible text as the bill content
+            bill_text = driver.find_element(By.TAG_NAME, 'body').text
+            bill['bill_content'] = bill_text
+        except TimeoutException:
+            bill['bill_content'] = 'No Text Available Yet'
+
+        # Extract the contact email
+        try:
+            contact_email_element = driver.find_element(By.XPATH, CONTACT_EMAIL_XPATH)
+            bill['contact_email'] = contact_email_element.get_attribute('href').split(':')[1]
+        except:
+            bill['contact_email'] = 'Not Available'
+
+    return bill
+
+
+def build_http_session(pool_size=ENHANCE_WORKERS):
+    """
+    Builds a requests session whose connection pool can serve every worker.
+
+    Args:
+        pool_size (int): Number of pooled connections per host.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_page(session, url):
+    """
+    Loads and parses a page over HTTP within its host's concurrency limit.
+
+    Args:
+        session (requests.Session): The shared session.
+        url (str): The URL to load.
+
+    Returns:
+        lxml.html.HtmlElement: The parsed page.
+    """
+    with host_slot(url):
+        response = session.get(url, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    return lxml_html.fromstring(response.text, base_url=response.url)
+
+
+def visible_text(element):
+    """
+    Approximates the text Selenium's element.text gives for an element: hidden elements dropped,
+    one line per block element and table row, blank lines removed.
+
+    Args:
+        element (lxml.html.HtmlElement): The element to read.
+
+    Returns:
+        str: The visible text.
+    """
+    for hidden in element.xpath(HIDDEN_XPATH):
+        hidden.drop_tree()
+    # Line breaks in the page source are plain whitespace to the browser, outside preformatted text
+    preformatted = {node for pre in element.iter('pre') for node in pre.iter()}
+    for node in element.iter():
+        if node not in preformatted:
+            node.text = node.text and node.text.replace('\n', ' ')
+            node.tail = node.tail and node.tail.replace('\n', ' ')
+    for block in element.iter(*BLOCK_TAGS):
+        block.tail = '\n' + (block.tail or '')
+    for cell in element.iter(*CELL_TAGS):
+        cell.tail = ' ' + (cell.tail or '')
+    lines = (' '.join(line.split()) for line in element.text_content().split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+def enhance_bill_info_http(bill, session):
+    """
+    Enhances a bill by fetching its detail and publication pages over plain HTTP.
+
+    Mirrors enhance_bill_info: the contact email is read from the publication page when the
+    bill has one, since that is the page the browser ends up on.
+
+    Args:
+        bill (dict): The bill to enhance.
+        session (requests.Session): The shared session.
+
+    Returns:
+        dict: The enhanced bill.
+    """
+    page = get_page(session, fetch_url(bill['href']))
+
+    sponsor = page.xpath(SPONSOR_XPATH)
+    bill['sponsor'] = ' '.join(sponsor[0].text_content().split()) if sponsor else 'Not Available'
+
+    bill_type = page.xpath(BILL_TYPE_XPATH)
+    bill['bill_type'] = ' '.join(bill_type[0].text_content().split()) if bill_type else 'Not Available'
+
+    publication_link = page.xpath(PUBLICATION_BUTTON_XPATH + '/@href')
+    if publication_link:
+        page = get_page(session, urljoin(page.base_url, publication_link[0]))
+        body = page.find('body')
+        bill['bill_content'] = visible_text(body if body is not None else page)
+    else:
         bill['bill_content'] = 'No Text Available Yet'
 
-    # Extract the contact email
-    try:
-        contact_email_element = driver.find_element(By.XPATH, "//a[contains(@href, 'mailto:')]")
-        bill['contact_email'] = contact_email_element.get_attribute('href').split(':')[1]
-    except:
-        bill['contact_email'] = 'Not Available'
+    contact_email = page.xpath(CONTACT_EMAIL_XPATH + '/@href')
+    bill['contact_email'] = contact_email[0].split(':')[1] if contact_email else 'Not Available'
 
     return bill
 
-# Load the existing data
-input_file_path = os.path.join('../../../storage', 'CanadaBills.json')
-with open(input_file_path, 'r') as file:
-    bills_data = json.load(file)
 
-# Define the output file path
-output_file_path = os.path.join('../../../storage', 'CanadaBillsEnhanced.json')
+def compact_enhanced_bills():
+    """
+    Folds the checkpoint into CanadaBillsEnhanced.json and clears the checkpoint.
+
+    Checkpoint records are merged over consolidated records with the same bill number, so fields
+    added downstream (e.g. by the summarizer) survive a re-enhancement, while TEXT_DERIVED_KEYS
+    are taken from the checkpoint record alone. Inline bill texts
+    left by older runs are moved to the blob store and indexed. The consolidated file is written atomically
+    before the checkpoint is removed, so a crash at any point loses nothing.
 
-# Check if the enhanced file already exists, if not, create an empty list
-if not os.path.exists(output_file_path):
-    with open(output_file_path, 'w') as file:
-        json.dump([], file)
+    Returns:
+        int: Number of bills in the consolidated file.
+    """
+    enhanced_bills_by_number = {}
+    externalized = 0
+    if os.path.exists(output_file_path):
+        for bill in iter_json_file(output_file_path):
+            if STORE_CONTENT_AS_BLOBS and 'bill_content' in bill:
+                store_bill_content(bill)
+                index_bill_structure(bill)
+                externalized += 1
+            enhanced_bills_by_number[bill['bill_number']] = bill
+    checkpointed = 0
+    for bill in iter_jsonl(checkpoint_file_path):
+        merged_bill = enhanced_bills_by_number.get(bill['bill_number'], {})
+        for key in TEXT_DERIVED_KEYS:
+            if key not in bill:
+                merged_bill.pop(key, None)
+        merged_bill.update(bill)
+        enhanced_bills_by_number[bill['bill_number']] = merged_bill
+        checkpointed += 1
 
-# Load the current state of the enhanced file
-with open(output_file_path, 'r') as file:
-    enhanced_bills_data = json.load(file)
+    if checkpointed or externalized or not os.path.exists(output_file_path):
+        save_json(output_file_path, list(enhanced_bills_by_number.values()))
+    if os.path.exists(checkpoint_file_path):
+        os.remove(checkpoint_file_path)
+    print(f"Compacted {checkpointed} checkpointed bills into {output_file_path} "
+          f"({len(enhanced_bills_by_number)} bills)")
+    return len(enhanced_bills_by_number)
+
+
+def load_enhancement_state():
+    """
+    Streams the consolidated file and the checkpoint for what each enhanced bill was enhanced from.
+
+    Returns:
+        dict: Bill number mapped to its 'listing_fingerprint' and 'enhanced_at' (None for older records).
+    """
+    enhancement_state = {}
+
+    def record(bill):
+        enhancement_state[bill['bill_number']] = {
+            'listing_fingerprint': bill.get('listing_fingerprint'),
+            'enhanced_at': bill.get('enhanced_at')
+        }
+
+    if os.path.exists(output_file_path):
+        for bill in iter_json_file(output_file_path):
+            record(bill)
+    for bill in iter_jsonl(checkpoint_file_path):
+        record(bill)
+    return enhancement_state
+
+
+def refetch_reason(bill, state, now):
+    """
+    Decides whether a bill's detail pages must be fetched.
+
+    Args:
+        bill (dict): The bill as listed in CanadaBills.json.
+        state (dict): The bill's enhancement state, or None if it was never enhanced.
+        now (datetime): Time of the run.
+
+    Returns:
+        str: 'new', 'listing changed', 'stale <field>', or None when the enhanced record is current.
+    """
+    if state is None:
+        return 'new'
+    if state['listing_fingerprint'] is None:
+        # Records from before fingerprints were kept fall back to the scraper's change flag
+        if bill.get('change_status'):
+            return 'listing changed'
+    elif state['listing_fingerprint'] != bill_fingerprint(bill):
+        return 'listing changed'
+    if state['enhanced_at']:
+        age = now - datetime.fromisoformat(state['enhanced_at'])
+        for field, max_age_days in FIELD_MAX_AGE_DAYS.items():
+            if max_age_days is not None and age > timedelta(days=max_age_days):
+                return 'stale ' + field
+    return None
+
+
+def select_bills_to_enhance(bills_data, now=None):
+    """
+    Picks the minimal set of bills whose detail pages must be fetched.
+
+    Args:
+        bills_data (list): Bills from CanadaBills.json.
+        now (datetime): Time of the run; defaults to now.
+
+    Returns:
+        list: The bills to enhance, in listing order.
+    """
+    now = now or datetime.now()
+    enhancement_state = load_enhancement_state()
+    bills_to_enhance = []
+    reasons = Counter()
+    for bill in bills_data:
+        reason = refetch_reason(bill, enhancement_state.get(bill['bill_number']), now)
+        if reason:
+            bills_to_enhance.append(bill)
+            reasons[reason] += 1
+    print(f"{len(bills_to_enhance)} of {len(bills_data)} bills to fetch"
+          + (f" ({', '.join(f'{count} {reason}' for reason, count in reasons.items())})" if reasons else ""))
+    return bills_to_enhance
+
+
+def enhance_bills(fetch_mode=FETCH_MODE, workers=ENHANCE_WORKERS, compact=True):
+    """
+    Enhances the bills of CanadaBills.json that are new, changed on the listing, or past a field's
+    maximum age, several bills at a time.
+
+    Each enhanced bill is appended to the checkpoint as soon as it is ready, so an interrupted
+    run resumes where it stopped. A bill whose pages fail to load is reported and left out of the
+    checkpoint, so the next run fetches it again. The checkpoint is compacted into
+    CanadaBillsEnhanced.json at the end of the run.
+
+    Args:
+        fetch_mode (str): 'selenium' for the driver pool, 'http' for plain HTTP fetches.
+        workers (int): Number of bills enhanced in parallel.
+        compact (bool): Compact the checkpoint once every bill has been enhanced.
+
+    Returns:
+        list: (bill number, error message) of each bill that could not be enhanced.
+    """
+    # Load the existing data
+    with open(input_file_path, 'r') as file:
+        bills_data = json.load(file)
+
+    # Only bills whose listing state or fields went out of date are fetched again
+    bills_to_enhance = select_bills_to_enhance(bills_data)
+
+    if fetch_mode == 'http':
+        session = build_http_session(workers)
+        fetch_details = lambda bill: enhance_bill_info_http(bill, session)
+    else:
+        session = None
+        fetch_details = fetch_with_worker_driver
+
+    failures = []
+
+    def enhance(bill):
+        listing_fingerprint = bill_fingerprint(bill)
+        try:
+            enhanced_bill = fetch_details(bill)
+        except Exception as e:
+            # One bill's broken page must not end the run; the bill is fetched again next time
+            print(f"Error enhancing bill {bill['bill_number']}: {e}")
+            failures.append((bill['bill_number'], str(e)))
+            return None
+        # Remember what the bill was enhanced from, for the next run's refetch decision
+        enhanced_bill['listing_fingerprint'] = listing_fingerprint
+        enhanced_bill['enhanced_at'] = datetime.now().isoformat()
+        return enhanced_bill
+
+    started_at = time.monotonic()
+    enhanced_count = 0
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor, \
+                JsonlAppender(checkpoint_file_path, CHECKPOINT_FSYNC_EVERY) as checkpoint:
+            # map keeps the input order, so the output file lists bills as the original loop did
+            for enhanced_bill in executor.map(enhance, bills_to_enhance):
+                if enhanced_bill is None:
+                    continue
+                if STORE_CONTENT_AS_BLOBS:
+                    store_bill_content(enhanced_bill)
+                    index_bill_structure(enhanced_bill)
+                # Save each enhanced bill as one appended line instead of rewriting the whole file
+                checkpoint.append(enhanced_bill)
+                enhanced_count += 1
+    finally:
+        if session is not None:
+            session.close()
+        shutdown_driver_pool()
 
-# Create a set of bill numbers from the enhanced data for quick lookup
-enhanced_bill_numbers = {bill['bill_number'] for bill in enhanced_bills_data}
+    elapsed_minutes = (time.monotonic() - started_at) / 60
+    if enhanced_count and elapsed_minutes:
+        print(f"Enhanced {enhanced_count} bills with {workers} {fetch_mode} workers: "
+              f"{enhanced_count / elapsed_minutes:.1f} bills/minute")
+    if failures:
+        print(f"{len(failures)} bills could not be enhanced and will be fetched again on the next run:")
+        for bill_number, error in sorted(failures):
+            print(f"  {bill_number}: {error}")
 
-for bill in bills_data:
-    # Check if the bill number is already in the enhanced data
-    if bill['bill_number'] not in enhanced_bill_numbers:
-        enhanced_bill = enhance_bill_info(bill)
-        enhanced_bills_data.append(enhanced_bill)
+    if compact:
+        compact_enhanced_bills()
+    return failures
 
-        # Save the updated data back to the file after each successful enhancement
-        with open(output_file_path, 'w') as file:
-            json.dump(enhanced_bills_data, file, indent=4)
 
-driver.quit()
+if __name__ == "__main__":
+    import sys
+    if sys.argv[1:] == ['compact']:
+        compact_enhanced_bills()
+    else:
+        enhance_bills()
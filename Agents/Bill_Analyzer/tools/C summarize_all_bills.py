@@ -1,12 +1,28 @@
 import os
 import re
+import copy
+import difflib
 import json
-import multiprocessing
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
+import time
+import asyncio
+import math
+from collections import deque
 from datetime import datetime, timezone
-from openaiconfig.openaiservice import generate_text  # Functional wrapper of OpenAI
-from helpers.helper import load_json, save_json  # JSON helpers
+from openaiconfig.openaiservice import (  # Async wrapper of OpenAI
+    BatchRequestQueued, GenerationError, agenerate_text, close_async_client, collect_batch_requests,
+    track_usage, cache_stats, concurrency_metrics, count_tokens, OPENAI_MODEL,
+    OPENAI_ESTIMATED_COMPLETION_TOKENS, OPENAI_CACHE_BYPASS
+)
+from openaiconfig.telemetry import collect_telemetry, estimate_cost, record_bill, record_local, record_parse, record_reuse, telemetry_labels  # Per-task LLM call telemetry
+from openaiconfig.batchservice import ingest_batch_output, load_batch_responses, submit_batch, wait_for_batch  # Batch API jobs
+from helpers.helper import JsonlAppender, iter_jsonl, load_json, save_json  # JSON helpers
+from helpers.blob_store import bill_content_hash, bill_content_length  # Bill text hash and length without reading it
+from helpers.bill_index import bill_fingerprint  # Stable hash of selected fields
+from helpers.bill_structure import load_bill_body  # Bill text without page navigation
+from helpers.bill_chunks import leading_chunks, split_bill_text  # Provision-aligned chunks of long bills
+from helpers.bill_similarity import SimilarityIndex, minhash_signature  # Near-duplicate bill texts
+from helpers.bill_extractors import extract_bill_references  # Rule-based references, amended Acts and sections
+from helpers.bill_tfidf import TfidfIndex  # Corpus-wide TF-IDF similarity of bills
 from config import STORAGE_DIR
 
 # ============================================================
@@ -17,8 +33,94 @@ from config import STORAGE_DIR
 ENHANCED_BILLS_FILE = 'CanadaBillsEnhanced.json'
 OUTPUT_FILE = 'CanadaBillsEnhanced.json'  # Overwrite the existing file with enhanced data
 
-# Initialize a lock for thread-safe operations
-lock = Lock()
+# Every derived field is appended to the checkpoint as soon as it is ready and folded into
+# OUTPUT_FILE at the end of the run, so an interrupted run resumes without redoing finished tasks
+ANALYSIS_CHECKPOINT_FILE = 'CanadaBillsAnalysis.checkpoint.jsonl'
+ANALYSIS_CHECKPOINT_FSYNC_EVERY = int(os.getenv("SUMMARIZE_CHECKPOINT_FSYNC_EVERY", "1"))
+
+# Telemetry of each run: per-task/per-bill tokens, cost and latency quantiles, and the same per task
+# in the Prometheus text format (e.g. for node_exporter's textfile collector)
+RUN_REPORT_FILE = 'summarize_run_report.json'
+METRICS_FILE = 'summarize_metrics.prom'
+
+# Bills analysed at the same time; the requests themselves are paced by the
+# shared RPM/TPM limiter in openaiservice, so this only bounds memory and open tasks
+BILL_CONCURRENCY = int(os.getenv("SUMMARIZE_BILL_CONCURRENCY", "16"))
+
+# Bills are analysed in priority order: bills the scraper flagged as changed first, then by bill type
+# and by how many stages they have completed (most recently updated first among equals).
+# Bill type weights match case-insensitive substrings of bill_type.
+PRIORITY_CHANGED_WEIGHT = float(os.getenv("SUMMARIZE_PRIORITY_CHANGED_WEIGHT", "100"))
+PRIORITY_STAGE_WEIGHT = float(os.getenv("SUMMARIZE_PRIORITY_STAGE_WEIGHT", "5"))
+PRIORITY_BILL_TYPE_WEIGHTS = json.loads(os.getenv("SUMMARIZE_PRIORITY_BILL_TYPE_WEIGHTS", "null")) or {
+    'government': 30,
+    'senate public': 10,
+    'private member': 0
+}
+
+# Budget of a run; 0 means unlimited. Once the next bill's estimated usage no longer fits, no more bills
+# start: bills in flight finish and the rest stay outdated, so the next run picks them up first.
+RUN_MAX_TOKENS = int(os.getenv("SUMMARIZE_RUN_MAX_TOKENS", "0"))
+RUN_MAX_COST_USD = float(os.getenv("SUMMARIZE_RUN_MAX_COST_USD", "0"))
+RUN_MAX_SECONDS = float(os.getenv("SUMMARIZE_RUN_MAX_SECONDS", "0"))
+
+# Near-duplicate bills (pro forma bills, reintroductions, amending-act templates) reuse the analysis of a bill
+# whose text is at least DUPLICATE_THRESHOLD similar (MinHash estimate of shared 5-word shingles) and whose
+# analysis is up to date: identical texts copy it, others update it from a diff of the texts in one request.
+# 0 turns reuse off; diffs over DUPLICATE_MAX_DIFF_TOKENS are analysed from scratch.
+DUPLICATE_THRESHOLD = float(os.getenv("SUMMARIZE_DUPLICATE_THRESHOLD", "0.9"))
+DUPLICATE_MAX_DIFF_TOKENS = int(os.getenv("SUMMARIZE_DUPLICATE_MAX_DIFF_TOKENS", "3000"))
+# MinHash signatures by bill content hash, so each text is only shingled once
+SIGNATURES_FILE = 'bill_signatures.json'
+
+# Bills shorter than this have no usable publication text yet
+MIN_BILL_CONTENT_LENGTH = int(os.getenv("SUMMARIZE_MIN_BILL_CONTENT_LENGTH", "500"))
+
+# Bills longer than SINGLE_CALL_MAX_TOKENS are split into chunks of at most CHUNK_MAX_TOKENS:
+# CHUNKED_TASKS are map-reduced over the chunks, the other tasks get the bill's opening chunks
+SINGLE_CALL_MAX_TOKENS = int(os.getenv("SUMMARIZE_SINGLE_CALL_MAX_TOKENS", "12000"))
+CHUNK_MAX_TOKENS = int(os.getenv("SUMMARIZE_CHUNK_MAX_TOKENS", "4000"))
+
+# Batch mode: job input files and the state of the job in flight live under storage/summarize_batches
+BATCH_DIR = 'summarize_batches'
+BATCH_STATE_FILE = os.path.join(BATCH_DIR, 'state.json')
+# The run's batch responses, kept until it has replayed them; the response cache may evict or expire them first
+BATCH_RESPONSES_FILE = os.path.join(BATCH_DIR, 'responses.jsonl')
+# Rounds of submit/ingest before giving up on requests that keep failing (fused mode needs two)
+BATCH_MAX_ROUNDS = int(os.getenv("SUMMARIZE_BATCH_MAX_ROUNDS", "5"))
+
+# 'per_task' sends one request per wrapper function; 'fused' asks for every text-based
+# analysis in a single JSON response and only falls back to the wrappers for fields that fail validation
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "per_task")
+
+# Wrappers ask for JSON shaped like their TASK_STRUCTURES entry: 'json_schema' (structured outputs,
+# enforced by the API) or 'json_object' (JSON mode, for models without structured outputs; always used
+# with the shared_prefix layout). Either way each field is validated, and fields that fail are re-asked on their own.
+STRUCTURED_OUTPUT = os.getenv("SUMMARIZE_STRUCTURED_OUTPUT", "json_schema")
+STRUCTURED_MAX_REASKS = int(os.getenv("SUMMARIZE_STRUCTURED_MAX_REASKS", "1"))
+
+# 'task_first' puts each task's own messages before the bill text; 'shared_prefix' starts every request
+# on a bill with the same system message and bill text and puts the task after it, so the provider's
+# prompt cache serves that prefix to all of the bill's tasks after a first warm-up request
+PROMPT_LAYOUT = os.getenv("SUMMARIZE_PROMPT_LAYOUT", "task_first")
+SHARED_SYSTEM_MESSAGE = (
+    "You are a legal analyst working on Canadian legislative bills. "
+    "The bill comes first; the task to perform on it follows."
+)
+
+# Tasks whose field is taken from the rule-based extraction of the bill text, without a request, whenever
+# the extraction finds something; the other EXTRACTED_TASKS get its findings to confirm and complete
+LOCAL_TASKS = [key.strip() for key in os.getenv("SUMMARIZE_LOCAL_TASKS", "related_bills,amendments").split(',') if key.strip()]
+
+# related_bills also lists the RELATED_TOP_K bills of the corpus most similar to the bill (TF-IDF cosine of
+# title and text, at least RELATED_MIN_SIMILARITY); 0 turns it off. The index is updated incrementally.
+RELATED_TOP_K = int(os.getenv("SUMMARIZE_RELATED_TOP_K", "5"))
+RELATED_MIN_SIMILARITY = float(os.getenv("SUMMARIZE_RELATED_MIN_SIMILARITY", "0.2"))
+TFIDF_INDEX_FILE = 'bill_tfidf_index.npz'
+
+# Part of every model-derived key's input fingerprint; bump it when prompts or parsing change
+# enough that fields derived by earlier versions should be recomputed (2: structured outputs)
+ANALYSIS_VERSION = 2
 
 # Define JSON_STRUCTURE to ensure controlled data handling
 JSON_STRUCTURE = {
@@ -38,6 +140,9 @@ JSON_STRUCTURE = {
     "sponsor": str,
     "bill_type": str,
     "bill_content": str,
+    "bill_content_hash": str,  # Bill text lives in the blob store; records keep its hash and length
+    "bill_content_length": int,
+    "bill_structure_hash": str,  # Summary/part/section offset index of the bill text
     "contact_email": str,
     # Enhanced Keys
     "summary": str,
@@ -52,7 +157,9 @@ JSON_STRUCTURE = {
     "public_engagement": str,
     "stakeholder_analysis": list,
     "future_projections": str,
-    "ai_enhancement_date": str  # Timestamp for last enhancement
+    "ai_enhancement_date": str,  # Timestamp for last enhancement
+    "similar_bills": list,  # Most similar bills of the corpus, from the TF-IDF index
+    "analysis_inputs": dict  # Fingerprint of the inputs each enhanced key was derived from
 }
 
 # Define Essential and Supplementary Keys
@@ -63,6 +170,15 @@ SUPPLEMENTARY_KEYS = [
     'public_engagement', 'stakeholder_analysis', 'future_projections'
 ]
 
+# Listing fields each locally derived key is built from
+BILL_PROGRESS_FIELDS = [
+    'current_status', 'last_major_stage_completed',
+    'senate_first_reading', 'senate_second_reading', 'senate_third_reading',
+    'house_first_reading', 'house_second_reading', 'house_third_reading',
+    'royal_assent'
+]
+SPONSOR_PROFILE_FIELDS = ['sponsor', 'bill_type', 'contact_email']
+
 # ============================================================
 # ==================== HELPER FUNCTIONS =====================
 # ============================================================
@@ -72,7 +188,7 @@ def clean_html_summary(raw_summary):
     Cleans the raw HTML summary by removing any leading text and triple backticks.
 
     Args:
-        raw_summary (str): The raw summary returned by the generate_text function.
+        raw_summary (str): The raw summary returned by the agenerate_text function.
 
     Returns:
         str: Cleaned HTML summary.
@@ -90,11 +206,337 @@ def clean_html_summary(raw_summary):
     # If neither pattern is found, return the raw summary (optional: handle differently)
     return raw_summary.strip()
 
+# ============================================================
+# ==================== TASK STRUCTURES ======================
+# ============================================================
+
+# Shape of each wrapper's result, keyed like WRAPPER_FUNCTIONS
+TASK_STRUCTURES = {
+    'summary': {
+        "content": "",
+        "format": "HTML",
+        "generated_on": ""
+    },
+    'named_entities': {
+        "entities": []
+    },
+    'committees': {
+        "committees": []
+    },
+    'bill_impact': {
+        "social": "",
+        "economic": "",
+        "legal": ""
+    },
+    'amendments': {
+        "amendments": []
+    },
+    'related_bills': {
+        "related_bills": []
+    },
+    'debates': {
+        "summary": "",
+        "key_points": [],
+        "outcomes": []
+    },
+    'public_engagement': {
+        "metrics": {
+            "social_media_mentions": 0,
+            "engagement_rate": "",
+            "public_comments": 0
+        },
+        "sentiments": {
+            "positive": "",
+            "neutral": "",
+            "negative": ""
+        },
+        "media_coverage": {
+            "articles_count": 0,
+            "sentiment_analysis": {
+                "positive": "",
+                "neutral": "",
+                "negative": ""
+            }
+        }
+    },
+    'stakeholder_analysis': {
+        "stakeholders": []
+    },
+    'future_projections': {
+        "potential_amendments": [],
+        "predicted_outcomes": ""
+    }
+}
+
+# ============================================================
+# ==================== STRUCTURED OUTPUTS ===================
+# ============================================================
+
+def matches_structure(value, template):
+    """
+    Checks that a value has the keys and value types of a TASK_STRUCTURES template.
+
+    Args:
+        value: The value returned by the model.
+        template: The matching part of the template.
+
+    Returns:
+        bool: True if the value fits the template.
+    """
+    if isinstance(template, dict):
+        return isinstance(value, dict) and all(
+            key in value and matches_structure(value[key], sub_template)
+            for key, sub_template in template.items()
+        )
+    if isinstance(template, list):
+        return isinstance(value, list) and all(isinstance(item, str) for item in value)
+    if isinstance(template, int):
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, str)
+
+def task_messages(system_message, assistant_message, content_prompt, instructions=""):
+    """
+    Lays out a task's messages as PROMPT_LAYOUT says.
+
+    Args:
+        system_message (str): The task's system message.
+        assistant_message (str): The task's instructions.
+        content_prompt (str): The bill part of the prompt, e.g. "Bill Content: ...".
+        instructions (str): What to return, appended after the content.
+
+    Returns:
+        tuple: (system_message, assistant_message, user_prompt) for agenerate_text.
+    """
+    if PROMPT_LAYOUT == 'shared_prefix':
+        return (
+            f"{SHARED_SYSTEM_MESSAGE}\n\n{content_prompt}",
+            f"{system_message} {assistant_message}",
+            instructions or "Perform the task on the bill above."
+        )
+    user_prompt = f"{content_prompt}\n\n{instructions}" if instructions else content_prompt
+    return system_message, assistant_message, user_prompt
+
+def structure_schema(template):
+    """
+    Builds the strict JSON schema of a TASK_STRUCTURES template: every key required, lists of strings.
+
+    Args:
+        template: A template, or part of one.
+
+    Returns:
+        dict: The JSON schema.
+    """
+    if isinstance(template, dict):
+        return {
+            "type": "object",
+            "properties": {key: structure_schema(sub_template) for key, sub_template in template.items()},
+            "required": list(template),
+            "additionalProperties": False
+        }
+    if isinstance(template, list):
+        return {"type": "array", "items": {"type": "string"}}
+    if isinstance(template, int):
+        return {"type": "integer"}
+    return {"type": "string"}
+
+def structured_response_format(name, template):
+    """
+    Returns the response_format asking for a JSON object shaped like template.
+
+    Args:
+        name (str): Schema name, e.g. the task's key.
+        template (dict): The structure to ask for.
+
+    Returns:
+        dict: A json_schema response format, or plain JSON mode when STRUCTURED_OUTPUT is 'json_object'
+        or PROMPT_LAYOUT is 'shared_prefix'.
+    """
+    # The provider puts a response schema ahead of the messages, so per-task schemas would leave no prefix
+    # shared by a bill's tasks; with a shared prefix every request uses JSON mode and the structure to fill
+    # is only in the trailing user message
+    if STRUCTURED_OUTPUT == 'json_schema' and PROMPT_LAYOUT != 'shared_prefix':
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": name, "strict": True, "schema": structure_schema(template)}
+        }
+    return {"type": "json_object"}
+
+def parse_structured_reply(raw_reply, template, non_empty=()):
+    """
+    Parses a JSON reply and validates each of its top-level fields against the template.
+
+    Args:
+        raw_reply (str): The model's reply.
+        template (dict): The structure that was asked for.
+        non_empty (tuple): String fields that must not be empty.
+
+    Returns:
+        tuple: (valid fields keyed like template, list of fields that are missing or invalid).
+    """
+    try:
+        reply = json.loads(raw_reply) if raw_reply else {}
+    except json.JSONDecodeError:
+        reply = {}
+    if not isinstance(reply, dict):
+        reply = {}
+    valid = {}
+    invalid = []
+    for field, sub_template in template.items():
+        value = reply.get(field)
+        if matches_structure(value, sub_template) and not (field in non_empty and not value.strip()):
+            valid[field] = value
+        else:
+            invalid.append(field)
+    return valid, invalid
+
+async def request_structured(key, system_message, assistant_message, user_prompt, template=None, non_empty=()):
+    """
+    Requests a JSON object shaped like a TASK_STRUCTURES template and validates it field by field.
+
+    Fields that are missing or fail validation are asked for again on their own, up to
+    STRUCTURED_MAX_REASKS times; the valid fields of every reply are kept, also when a re-ask fails.
+
+    Args:
+        key (str): The task's WRAPPER_FUNCTIONS key.
+        system_message (str): The system message.
+        assistant_message (str): The task's instructions.
+        user_prompt (str): The bill content part of the prompt; the structure to fill is added after it.
+        template (dict): The structure to ask for; defaults to TASK_STRUCTURES[key].
+        non_empty (tuple): String fields that must not be empty.
+
+    Returns:
+        dict: A copy of the template filled with the valid fields; fields still invalid keep their empty value.
+
+    Raises:
+        GenerationError: When the first request fails.
+    """
+    template = TASK_STRUCTURES[key] if template is None else template
+    JSONSTRUCTURE = copy.deepcopy(template)
+    pending = dict(template)
+    for attempt in range(STRUCTURED_MAX_REASKS + 1):
+        try:
+            raw_reply = await agenerate_text(
+                *task_messages(
+                    system_message, assistant_message, user_prompt,
+                    f"Return exactly this JSON structure, filled in:\n{json.dumps(pending, indent=4)}"
+                ),
+                response_format=structured_response_format(key, pending)
+            )
+        except GenerationError:
+            # A failed re-ask keeps the fields earlier replies got right; a batch-queued one still propagates
+            if attempt == 0:
+                raise
+            break
+        parse_started = time.process_time()
+        valid, invalid = parse_structured_reply(raw_reply, pending, non_empty)
+        record_parse(len(pending), len(invalid), time.process_time() - parse_started, reask=attempt > 0)
+        JSONSTRUCTURE.update(valid)
+        pending = {field: template[field] for field in invalid}
+        if not pending:
+            break
+    if pending:
+        print(f"⚠️ {key}: no valid {', '.join(pending)} after {attempt} re-asks")
+    return JSONSTRUCTURE
+
+# ============================================================
+# ==================== LOCAL EXTRACTION =====================
+# ============================================================
+
+# Tasks rule-based extraction can answer, with the TASK_STRUCTURES field and the extract_bill_references() list it fills
+EXTRACTED_TASKS = {
+    'related_bills': ('related_bills', 'related_bills'),
+    'amendments': ('amendments', 'amendments'),
+    'named_entities': ('entities', 'entities')
+}
+
+def extract_local_fields(bill, bill_content):
+    """
+    Fills the EXTRACTED_TASKS fields of a bill from what its text states explicitly: bill numbers, the Acts
+    named in its title and amending provisions, the provisions it amends and the bodies it names.
+
+    Args:
+        bill (dict): The bill data.
+        bill_content (str): The bill's text.
+
+    Returns:
+        dict: Results shaped like TASK_STRUCTURES for the tasks the extraction found anything for.
+    """
+    extracted = extract_bill_references(bill_content, bill.get('title', ''), bill.get('bill_number'))
+    extracted['related_bills'] += [
+        f"Bill {match['bill_number']} ({match['parliament_session']}): {match['title']}"
+        for match in bill.get('similar_bills') or []
+    ]
+    return {
+        key: {field: extracted[source]}
+        for key, (field, source) in EXTRACTED_TASKS.items()
+        if extracted[source]
+    }
+
+def update_similar_bills(bills_data):
+    """
+    Brings the TF-IDF index up to date with the corpus and stores each bill's most similar bills in 'similar_bills'.
+
+    Only bills that are new or whose title or text changed are vectorized; neighbours are recomputed for every
+    bill, since new bills can be similar to old ones.
+
+    Args:
+        bills_data (list): Every bill of the corpus; updated in place.
+
+    Returns:
+        int: Number of bills (re)indexed.
+    """
+    if not RELATED_TOP_K:
+        return 0
+    path = os.path.join(STORAGE_DIR, TFIDF_INDEX_FILE)
+    index = TfidfIndex.load(path)
+    indexed = index.update(
+        (
+            bill['href'],
+            bill_fingerprint({'title': bill.get('title'), 'content': bill_content_hash(bill)}, ['title', 'content']),
+            lambda bill=bill: (bill.get('title') or '', load_bill_body(bill))
+        )
+        for bill in bills_data
+    )
+    if indexed:
+        index.save(path)
+    bills_by_href = {bill['href']: bill for bill in bills_data}
+    neighbours = index.most_similar(top_k=RELATED_TOP_K, min_similarity=RELATED_MIN_SIMILARITY)
+    for bill in bills_data:
+        bill['similar_bills'] = [
+            {
+                'href': href,
+                'bill_number': bills_by_href[href].get('bill_number'),
+                'parliament_session': bills_by_href[href].get('parliament_session'),
+                'title': bills_by_href[href].get('title'),
+                'similarity': similarity
+            }
+            for similarity, href in neighbours[bill['href']]
+        ]
+    return indexed
+
+def with_extracted(assistant_message, found):
+    """
+    Adds items found by rule-based extraction to a task's instructions, for the model to confirm and complete.
+
+    Args:
+        assistant_message (str): The task's instructions.
+        found (list): The extracted items, or None.
+
+    Returns:
+        str: The instructions.
+    """
+    if not found:
+        return assistant_message
+    return (
+        f"{assistant_message} These were already found in the text by exact matching; keep the correct ones "
+        f"and add any they miss: {json.dumps(found, ensure_ascii=False)}"
+    )
+
 # ============================================================
 # ==================== WRAPPER FUNCTIONS ====================
 # ============================================================
 
-def generate_summary(bill_content):
+async def generate_summary(bill_content):
     """
     Generates a concise summary of the bill content.
 
@@ -104,59 +546,47 @@ def generate_summary(bill_content):
     Returns:
         dict: A dictionary containing the structured summary.
     """
-    JSONSTRUCTURE = {
-        "content": "",
-        "format": "HTML",
-        "generated_on": ""
-    }
+    JSONSTRUCTURE = copy.deepcopy(TASK_STRUCTURES['summary'])
 
     system_message = "You are a legal assistant generating concise summaries for Canadian bills."
     assistant_message = (
         "Please create a clear and unbiased summary of the following bill. "
-        "The summary should be concise, approximately 200 words, and highlight the key objectives and provisions."
+        "The summary should be concise, approximately 200 words, and highlight the key objectives and provisions. "
+        "Write the content as HTML."
     )
 
-    user_prompt = f"Bill Content: {bill_content}\n\nPlease structure your summary as follows:\n{json.dumps(JSONSTRUCTURE, indent=4)}"
+    user_prompt = f"Bill Content: {bill_content}"
 
-    raw_summary = generate_text(system_message, assistant_message, user_prompt)
-    cleaned_summary = clean_html_summary(raw_summary)
+    # The model only writes the content; format and date are filled in here
+    summary = await request_structured('summary', system_message, assistant_message, user_prompt, {"content": ""}, ('content',))
 
     # Populate the JSONSTRUCTURE
-    JSONSTRUCTURE["content"] = cleaned_summary
+    JSONSTRUCTURE["content"] = clean_html_summary(summary["content"])
     JSONSTRUCTURE["generated_on"] = datetime.now(timezone.utc).isoformat()
 
     return JSONSTRUCTURE
 
-def extract_named_entities(bill_content):
+async def extract_named_entities(bill_content, found=None):
     """
     Extracts named entities from the bill content.
 
     Args:
         bill_content (str): The full content of the bill.
+        found (list): Named entities already found by extract_local_fields(), to confirm and complete.
 
     Returns:
         dict: A dictionary containing the list of named entities.
     """
-    JSONSTRUCTURE = {
-        "entities": []
-    }
-
     system_message = "You are an NLP model tasked with extracting named entities from Canadian legislative bills."
     assistant_message = (
         "Identify and list all named entities such as persons, organizations, locations, and legislative bodies mentioned in the following bill content."
     )
 
-    user_prompt = f"Bill Content: {bill_content}\n\nPlease structure your named entities as follows:\n{json.dumps(JSONSTRUCTURE, indent=4)}"
-
-    raw_entities = generate_text(system_message, assistant_message, user_prompt)
-    entities = [entity.strip() for entity in raw_entities.split(',') if entity.strip()]
+    user_prompt = f"Bill Content: {bill_content}"
 
-    # Populate the JSONSTRUCTURE
-    JSONSTRUCTURE["entities"] = entities
+    return await request_structured('named_entities', system_message, with_extracted(assistant_message, found), user_prompt)
 
-    return JSONSTRUCTURE
-
-def identify_committees(bill_content):
+async def identify_committees(bill_content):
     """
     Identifies parliamentary committees involved with the bill.
 
@@ -166,26 +596,16 @@ def identify_committees(bill_content):
     Returns:
         dict: A dictionary containing the list of committees.
     """
-    JSONSTRUCTURE = {
-        "committees": []
-    }
-
     system_message = "You are an assistant identifying parliamentary committees involved with Canadian bills."
     assistant_message = (
         "From the following bill content, identify all parliamentary committees that have reviewed or are reviewing this bill."
     )
 
-    user_prompt = f"Bill Content: {bill_content}\n\nPlease structure the committees as follows:\n{json.dumps(JSONSTRUCTURE, indent=4)}"
-
-    raw_committees = generate_text(system_message, assistant_message, user_prompt)
-    committees = [committee.strip() for committee in raw_committees.split(',') if committee.strip()]
+    user_prompt = f"Bill Content: {bill_content}"
 
-    # Populate the JSONSTRUCTURE
-    JSONSTRUCTURE["committees"] = committees
+    return await request_structured('committees', system_message, assistant_message, user_prompt)
 
-    return JSONSTRUCTURE
-
-def analyze_bill_impact(bill_content):
+async def analyze_bill_impact(bill_content):
     """
     Analyzes the potential impact of the bill.
 
@@ -195,89 +615,56 @@ def analyze_bill_impact(bill_content):
     Returns:
         dict: A dictionary containing the analysis of social, economic, and legal impacts.
     """
-    JSONSTRUCTURE = {
-        "social": "",
-        "economic": "",
-        "legal": ""
-    }
-
     system_message = "You are an analyst assessing the potential impact of Canadian legislative bills."
     assistant_message = (
         "Provide an analysis of the potential social, economic, and legal impacts of the following bill."
     )
 
-    user_prompt = f"Bill Content: {bill_content}\n\nPlease structure your analysis as follows:\n{json.dumps(JSONSTRUCTURE, indent=4)}"
-
-    raw_impact = generate_text(system_message, assistant_message, user_prompt)
+    user_prompt = f"Bill Content: {bill_content}"
 
-    # Extract the impacts
-    for key in JSONSTRUCTURE.keys():
-        pattern = f"{key.capitalize()}:"
-        match = re.search(rf"{pattern}\s*(.*?)(?={ '|'.join([k.capitalize() for k in JSONSTRUCTURE.keys() if k != key ]) }|$)", raw_impact, re.IGNORECASE | re.DOTALL)
-        if match:
-            JSONSTRUCTURE[key] = match.group(1).strip()
+    return await request_structured('bill_impact', system_message, assistant_message, user_prompt)
 
-    return JSONSTRUCTURE
-
-def extract_amendments(bill_content):
+async def extract_amendments(bill_content, found=None):
     """
     Extracts amendments made to the bill.
 
     Args:
         bill_content (str): The full content of the bill.
+        found (list): Amendments already found by extract_local_fields(), to confirm and complete.
 
     Returns:
         dict: A dictionary containing the list of amendments.
     """
-    JSONSTRUCTURE = {
-        "amendments": []
-    }
-
     system_message = "You are a legal assistant identifying amendments in Canadian bills."
     assistant_message = (
         "List all amendments made to the following bill, specifying the section numbers and nature of each amendment."
     )
 
-    user_prompt = f"Bill Content: {bill_content}\n\nPlease structure your amendments as follows:\n{json.dumps(JSONSTRUCTURE, indent=4)}"
+    user_prompt = f"Bill Content: {bill_content}"
 
-    raw_amendments = generate_text(system_message, assistant_message, user_prompt)
-    amendments = [amendment.strip() for amendment in raw_amendments.split('\n') if amendment.strip()]
-
-    # Populate the JSONSTRUCTURE
-    JSONSTRUCTURE["amendments"] = amendments
+    return await request_structured('amendments', system_message, with_extracted(assistant_message, found), user_prompt)
 
-    return JSONSTRUCTURE
-
-def find_related_bills(bill_content):
+async def find_related_bills(bill_content, found=None):
     """
     Finds related bills referenced in the bill content.
 
     Args:
         bill_content (str): The full content of the bill.
+        found (list): Related bills already found by extract_local_fields(), to confirm and complete.
 
     Returns:
         dict: A dictionary containing the list of related bills.
     """
-    JSONSTRUCTURE = {
-        "related_bills": []
-    }
-
     system_message = "You are an assistant identifying related Canadian legislative bills."
     assistant_message = (
         "Identify and list any other bills or pieces of legislation that are related to or referenced in the following bill content."
     )
 
-    user_prompt = f"Bill Content: {bill_content}\n\nPlease structure the related bills as follows:\n{json.dumps(JSONSTRUCTURE, indent=4)}"
+    user_prompt = f"Bill Content: {bill_content}"
 
-    raw_related = generate_text(system_message, assistant_message, user_prompt)
-    related_bills = [bill.strip() for bill in raw_related.split(',') if bill.strip()]
-
-    # Populate the JSONSTRUCTURE
-    JSONSTRUCTURE["related_bills"] = related_bills
+    return await request_structured('related_bills', system_message, with_extracted(assistant_message, found), user_prompt)
 
-    return JSONSTRUCTURE
-
-def summarize_debates(bill_content):
+async def summarize_debates(bill_content):
     """
     Summarizes parliamentary debates related to the bill.
 
@@ -287,36 +674,16 @@ def summarize_debates(bill_content):
     Returns:
         dict: A dictionary containing the summary, key points, and outcomes of debates.
     """
-    JSONSTRUCTURE = {
-        "summary": "",
-        "key_points": [],
-        "outcomes": []
-    }
-
     system_message = "You are an assistant summarizing parliamentary debates on Canadian bills."
     assistant_message = (
         "Summarize the key points and outcomes of parliamentary debates related to the following bill."
     )
 
-    user_prompt = f"Bill Content: {bill_content}\n\nPlease structure your summary as follows:\n{json.dumps(JSONSTRUCTURE, indent=4)}"
-
-    raw_debates = generate_text(system_message, assistant_message, user_prompt)
-
-    # Extract the summaries
-    for key in JSONSTRUCTURE.keys():
-        pattern = f"{key.capitalize()}:"
-        match = re.search(rf"{pattern}\s*(.*?)(?={ '|'.join([k.capitalize() for k in JSONSTRUCTURE.keys() if k != key ]) }|$)", raw_debates, re.IGNORECASE | re.DOTALL)
-        if match:
-            content = match.group(1).strip()
-            if key in ["key_points", "outcomes"]:
-                # Assuming these are bullet points
-                JSONSTRUCTURE[key] = [point.strip('- ').strip() for point in content.split('\n') if point.strip()]
-            else:
-                JSONSTRUCTURE[key] = content
+    user_prompt = f"Bill Content: {bill_content}"
 
-    return JSONSTRUCTURE
+    return await request_structured('debates', system_message, assistant_message, user_prompt)
 
-def analyze_public_engagement(bill_number):
+async def analyze_public_engagement(bill_number):
     """
     Analyzes public engagement metrics related to the bill.
 
@@ -326,62 +693,16 @@ def analyze_public_engagement(bill_number):
     Returns:
         dict: A dictionary containing metrics and sentiments from public interactions.
     """
-    JSONSTRUCTURE = {
-        "metrics": {
-            "social_media_mentions": 0,
-            "engagement_rate": "",
-            "public_comments": 0
-        },
-        "sentiments": {
-            "positive": "",
-            "neutral": "",
-            "negative": ""
-        },
-        "media_coverage": {
-            "articles_count": 0,
-            "sentiment_analysis": {
-                "positive": "",
-                "neutral": "",
-                "negative": ""
-            }
-        }
-    }
-
     system_message = "You are an assistant analyzing public engagement data related to Canadian bills."
     assistant_message = (
         f"Provide metrics and sentiments based on public interactions, such as social media mentions and public comments, for bill number {bill_number}."
     )
 
-    user_prompt = f"Bill Number: {bill_number}\n\nPlease structure your public engagement data as follows:\n{json.dumps(JSONSTRUCTURE, indent=4)}"
+    user_prompt = f"Bill Number: {bill_number}"
 
-    raw_engagement = generate_text(system_message, assistant_message, user_prompt)
+    return await request_structured('public_engagement', system_message, assistant_message, user_prompt)
 
-    # Extracting metrics and sentiments
-    for key in JSONSTRUCTURE.keys():
-        if key in ["metrics", "sentiments", "media_coverage"]:
-            for sub_key in JSONSTRUCTURE[key].keys():
-                if isinstance(JSONSTRUCTURE[key][sub_key], dict):
-                    for sub_sub_key in JSONSTRUCTURE[key][sub_key].keys():
-                        pattern = f"{sub_sub_key.replace('_', ' ').capitalize()}:"
-                        match = re.search(rf"{pattern}\s*(.*?)(?={ '|'.join([k.replace('_', ' ').capitalize() for k in JSONSTRUCTURE[key][sub_key].keys() ]) }|$)", raw_engagement, re.IGNORECASE | re.DOTALL)
-                        if match:
-                            JSONSTRUCTURE[key][sub_key][sub_sub_key] = match.group(1).strip()
-                else:
-                    pattern = f"{sub_key.replace('_', ' ').capitalize()}:"
-                    match = re.search(rf"{pattern}\s*(.*?)(?={ '|'.join([k.replace('_', ' ').capitalize() for k in JSONSTRUCTURE[key].keys() if k != sub_key ]) }|$)", raw_engagement, re.IGNORECASE | re.DOTALL)
-                    if match:
-                        value = match.group(1).strip()
-                        if sub_key in ["social_media_mentions", "public_comments", "articles_count"]:
-                            try:
-                                JSONSTRUCTURE[key][sub_key] = int(re.findall(r'\d+', value)[0])
-                            except (IndexError, ValueError):
-                                JSONSTRUCTURE[key][sub_key] = 0
-                        else:
-                            JSONSTRUCTURE[key][sub_key] = value
-
-    return JSONSTRUCTURE
-
-def stakeholder_analysis(bill_content):
+async def stakeholder_analysis(bill_content):
     """
     Identifies and categorizes stakeholders affected by the bill.
 
@@ -391,26 +712,16 @@ def stakeholder_analysis(bill_content):
     Returns:
         dict: A dictionary containing the list of stakeholders.
     """
-    JSONSTRUCTURE = {
-        "stakeholders": []
-    }
-
     system_message = "You are an analyst identifying stakeholders affected by Canadian bills."
     assistant_message = (
         "Identify and categorize key stakeholders impacted by the following bill content, including government bodies, private sectors, and public interest groups."
     )
 
-    user_prompt = f"Bill Content: {bill_content}\n\nPlease structure your stakeholder analysis as follows:\n{json.dumps(JSONSTRUCTURE, indent=4)}"
+    user_prompt = f"Bill Content: {bill_content}"
 
-    raw_stakeholders = generate_text(system_message, assistant_message, user_prompt)
-    stakeholders = [stakeholder.strip() for stakeholder in raw_stakeholders.split(',') if stakeholder.strip()]
+    return await request_structured('stakeholder_analysis', system_message, assistant_message, user_prompt)
 
-    # Populate the JSONSTRUCTURE
-    JSONSTRUCTURE["stakeholders"] = stakeholders
-
-    return JSONSTRUCTURE
-
-def future_projections(bill_content):
+async def future_projections(bill_content):
     """
     Predicts potential future amendments or outcomes related to the bill.
 
@@ -420,33 +731,14 @@ def future_projections(bill_content):
     Returns:
         dict: A dictionary containing potential amendments and predicted outcomes.
     """
-    JSONSTRUCTURE = {
-        "potential_amendments": [],
-        "predicted_outcomes": ""
-    }
-
     system_message = "You are an assistant predicting future outcomes of Canadian legislative bills."
     assistant_message = (
         "Based on the following bill content, predict potential future amendments or outcomes related to this bill."
     )
 
-    user_prompt = f"Bill Content: {bill_content}\n\nPlease structure your future projections as follows:\n{json.dumps(JSONSTRUCTURE, indent=4)}"
-
-    raw_projections = generate_text(system_message, assistant_message, user_prompt)
+    user_prompt = f"Bill Content: {bill_content}"
 
-    # Extracting potential amendments and predicted outcomes
-    for key in JSONSTRUCTURE.keys():
-        pattern = f"{key.replace('_', ' ').capitalize()}:"
-        match = re.search(rf"{pattern}\s*(.*?)(?={ '|'.join([k.replace('_', ' ').capitalize() for k in JSONSTRUCTURE.keys() if k != key ]) }|$)", raw_projections, re.IGNORECASE | re.DOTALL)
-        if match:
-            content = match.group(1).strip()
-            if key == "potential_amendments":
-                # Assuming amendments are listed as bullet points
-                JSONSTRUCTURE[key] = [amend.strip('- ').strip() for amend in content.split('\n') if amend.strip()]
-            elif key == "predicted_outcomes":
-                JSONSTRUCTURE[key] = content
-
-    return JSONSTRUCTURE
+    return await request_structured('future_projections', system_message, assistant_message, user_prompt)
 
 # ============================================================
 # ==================== WRAPPER MAPPING ======================
@@ -466,94 +758,853 @@ WRAPPER_FUNCTIONS = {
     'future_projections': future_projections
 }
 
+# ============================================================
+# ==================== FUSED ANALYSIS =======================
+# ============================================================
+
+# What the fused request asks for under each key; every key is also a WRAPPER_FUNCTIONS key
+FUSED_TASKS = {
+    'summary': "A clear and unbiased HTML summary of about 200 words highlighting the key objectives and provisions. Leave generated_on empty.",
+    'named_entities': "All persons, organizations, locations and legislative bodies mentioned.",
+    'committees': "Every parliamentary committee that has reviewed or is reviewing the bill.",
+    'bill_impact': "The potential social, economic and legal impacts.",
+    'amendments': "Every amendment made by the bill, with section numbers and the nature of each amendment.",
+    'related_bills': "Other bills or legislation related to or referenced in the bill.",
+    'debates': "A summary, key points and outcomes of parliamentary debates on the bill.",
+    'stakeholder_analysis': "Key stakeholders impacted, including government bodies, private sectors and public interest groups.",
+    'future_projections': "Potential future amendments and the predicted outcome of the bill."
+}
+
+async def fused_analysis(bill_content, keys=None):
+    """
+    Runs every FUSED_TASKS analysis of a bill in a single JSON-mode request.
+
+    Args:
+        bill_content (str): The full content of the bill.
+        keys (list): FUSED_TASKS keys to ask for; defaults to all of them.
+
+    Returns:
+        tuple: (results keyed like WRAPPER_FUNCTIONS, list of requested keys that failed validation).
+    """
+    keys = list(FUSED_TASKS) if keys is None else keys
+    JSONSTRUCTURE = {key: copy.deepcopy(TASK_STRUCTURES[key]) for key in keys}
+    tasks = "\n".join(f"- {key}: {FUSED_TASKS[key]}" for key in keys)
+
+    system_message = "You are a legal analyst producing structured analyses of Canadian legislative bills."
+    assistant_message = (
+        "Analyze the following bill and answer every task below in a single JSON object. "
+        "Lists must contain plain strings.\n" + tasks
+    )
+
+    user_prompt = f"Bill Content: {bill_content}"
+
+    try:
+        raw_analysis = await agenerate_text(
+            *task_messages(
+                system_message, assistant_message, user_prompt,
+                f"Return exactly this JSON structure, filled in:\n{json.dumps(JSONSTRUCTURE, indent=4)}"
+            ),
+            response_format=structured_response_format('fused_analysis', JSONSTRUCTURE)
+        )
+    except GenerationError:
+        raw_analysis = None
+
+    parse_started = time.process_time()
+    results, failed_keys = parse_structured_reply(raw_analysis, JSONSTRUCTURE)
+    summary = results.get('summary')
+    if summary is not None:
+        if summary['content'].strip():
+            summary['content'] = clean_html_summary(summary['content'])
+            summary['format'] = "HTML"
+            summary['generated_on'] = datetime.now(timezone.utc).isoformat()
+        else:
+            del results['summary']
+            failed_keys.append('summary')
+    record_parse(len(keys), len(failed_keys), time.process_time() - parse_started)
+
+    return results, failed_keys
+
+# ============================================================
+# ==================== LONG BILLS ===========================
+# ============================================================
+
+async def gather_all(coroutines):
+    """
+    Awaits coroutines concurrently and raises the first exception only after all of them finished,
+    so none is left running (e.g. still queueing batch requests) behind the caller's back.
+    """
+    results = await asyncio.gather(*coroutines, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+    return results
+
+async def summarize_bill_part(chunk):
+    """
+    Summarizes one chunk of a long bill, for map_reduce_summary to combine.
+
+    The prompt does not mention the chunk's position, so an unchanged chunk of an amended bill
+    sends an identical request and is answered from the response cache.
+
+    Args:
+        chunk (str): The chunk text.
+
+    Returns:
+        str: Plain-text summary of the chunk.
+    """
+    system_message = "You are a legal assistant summarizing long Canadian bills one part at a time."
+    assistant_message = (
+        "Summarize the key objectives and provisions in the following part of a bill in at most 150 words of plain text. "
+        "Name the Acts it amends."
+    )
+
+    # Same content prompt as the chunked wrappers, so all three share the chunk's prefix under 'shared_prefix'
+    user_prompt = f"Bill Content: {chunk}"
+
+    return (await agenerate_text(*task_messages(system_message, assistant_message, user_prompt)) or "").strip()
+
+async def map_reduce_summary(chunks):
+    """
+    Summarizes a long bill: each chunk is summarized on its own, then the part summaries are summarized.
+
+    Args:
+        chunks (list): Chunk texts from split_bill_text.
+
+    Returns:
+        dict: A dictionary containing the structured summary, as generate_summary returns it.
+    """
+    part_summaries = await gather_all([summarize_bill_part(chunk) for chunk in chunks])
+    return await generate_summary("\n\n".join(part_summaries))
+
+async def map_reduce_amendments(chunks):
+    """
+    Extracts the amendments of every chunk of a long bill and merges them in order.
+
+    Args:
+        chunks (list): Chunk texts from split_bill_text.
+
+    Returns:
+        dict: A dictionary containing the list of amendments, as extract_amendments returns it.
+    """
+    JSONSTRUCTURE = copy.deepcopy(TASK_STRUCTURES['amendments'])
+    for result in await gather_all([extract_amendments(chunk) for chunk in chunks]):
+        for amendment in result["amendments"]:
+            if amendment not in JSONSTRUCTURE["amendments"]:
+                JSONSTRUCTURE["amendments"].append(amendment)
+    return JSONSTRUCTURE
+
+async def map_reduce_named_entities(chunks):
+    """
+    Extracts the named entities of every chunk of a long bill and merges them, ignoring case.
+
+    Args:
+        chunks (list): Chunk texts from split_bill_text.
+
+    Returns:
+        dict: A dictionary containing the list of named entities, as extract_named_entities returns it.
+    """
+    JSONSTRUCTURE = copy.deepcopy(TASK_STRUCTURES['named_entities'])
+    seen = set()
+    for result in await gather_all([extract_named_entities(chunk) for chunk in chunks]):
+        for entity in result["entities"]:
+            if entity.lower() not in seen:
+                seen.add(entity.lower())
+                JSONSTRUCTURE["entities"].append(entity)
+    return JSONSTRUCTURE
+
+# Tasks that need the whole text of a long bill, with the map-reduce function that replaces their wrapper
+CHUNKED_TASKS = {
+    'summary': map_reduce_summary,
+    'amendments': map_reduce_amendments,
+    'named_entities': map_reduce_named_entities
+}
+
+# ============================================================
+# ==================== STALENESS TRACKING ===================
+# ============================================================
+
+# Every key process_single_bill derives, in the order it derives them
+ENHANCED_KEYS = ['bill_progress', 'sponsor_profile'] + list(WRAPPER_FUNCTIONS)
+
+def task_input_fingerprint(key, bill):
+    """
+    Fingerprints the inputs an enhanced key is derived from: the listing fields for bill_progress and
+    sponsor_profile, the bill number for public_engagement, and the bill text for every other task.
+    related_bills also depends on the bill's similar_bills. Model-derived keys also depend on the model
+    and ANALYSIS_VERSION.
+
+    Args:
+        key (str): An ENHANCED_KEYS key.
+        bill (dict): The bill data.
+
+    Returns:
+        str: Hex SHA-256 of the inputs.
+    """
+    if key == 'bill_progress':
+        return bill_fingerprint(bill, BILL_PROGRESS_FIELDS)
+    if key == 'sponsor_profile':
+        return bill_fingerprint(bill, SPONSOR_PROFILE_FIELDS)
+    inputs = {'model': OPENAI_MODEL, 'analysis_version': ANALYSIS_VERSION}
+    if key == 'public_engagement':
+        inputs['bill_number'] = bill.get('bill_number')
+    else:
+        inputs['bill_content_hash'] = bill_content_hash(bill)
+    if key == 'related_bills' and bill.get('similar_bills') is not None:
+        inputs['similar_bills'] = sorted(match['href'] for match in bill['similar_bills'])
+    return bill_fingerprint(inputs, sorted(inputs))
+
+def stale_keys(bill):
+    """
+    Lists the enhanced keys of a bill whose inputs changed since they were derived, or that were never
+    derived successfully. Model-derived keys wait until the bill has more than MIN_BILL_CONTENT_LENGTH
+    characters of text.
+
+    Args:
+        bill (dict): The bill data, with its analysis_inputs.
+
+    Returns:
+        list: The ENHANCED_KEYS keys to recompute.
+    """
+    inputs = bill.get('analysis_inputs') or {}
+    keys = ENHANCED_KEYS
+    if bill_content_length(bill) <= MIN_BILL_CONTENT_LENGTH:
+        keys = [key for key in ENHANCED_KEYS if key not in WRAPPER_FUNCTIONS]
+    return [key for key in keys if inputs.get(key) != task_input_fingerprint(key, bill)]
+
+def unique_bills(bills):
+    """
+    Drops repeated records of the same bill, keeping the last one of each href in first-seen order.
+
+    Args:
+        bills (list): Bill data dictionaries.
+
+    Returns:
+        list: One record per href.
+    """
+    by_href = {}
+    for bill in bills:
+        by_href.pop(bill['href'], None)
+        by_href[bill['href']] = bill
+    return list(by_href.values())
+
+def apply_analysis_record(bill, record):
+    """
+    Applies a checkpointed field to a bill, unless the bill's inputs changed since it was derived.
+
+    Args:
+        bill (dict): The bill data; modified in place.
+        record (dict): Checkpoint record with 'key', 'value', 'input' and 'derived_at'.
+
+    Returns:
+        bool: True if the field was applied.
+    """
+    if record['input'] != task_input_fingerprint(record['key'], bill):
+        return False
+    bill[record['key']] = record['value']
+    bill['analysis_inputs'] = dict(bill.get('analysis_inputs') or {}, **{record['key']: record['input']})
+    bill['ai_enhancement_date'] = record['derived_at']
+    return True
+
+def load_analysis_checkpoint(bills_data):
+    """
+    Applies every field in the analysis checkpoint to the bills it belongs to.
+
+    Args:
+        bills_data (list): Bill data dictionaries; modified in place.
+
+    Returns:
+        int: Number of fields applied.
+    """
+    bills_by_href = {bill['href']: bill for bill in bills_data}
+    applied = 0
+    for record in iter_jsonl(ANALYSIS_CHECKPOINT_FILE):
+        bill = bills_by_href.get(record['href'])
+        if bill is not None and apply_analysis_record(bill, record):
+            applied += 1
+    return applied
+
+def compact_analysis_checkpoint(bills_data):
+    """
+    Folds the analysis checkpoint into OUTPUT_FILE and clears the checkpoint.
+
+    The output is written atomically before the checkpoint is removed, and applying a record twice
+    changes nothing, so a crash at any point loses nothing.
+
+    Args:
+        bills_data (list): Bill data dictionaries, as loaded at the start of the run.
+
+    Returns:
+        int: Number of fields folded in.
+    """
+    applied = load_analysis_checkpoint(bills_data)
+    save_json(OUTPUT_FILE, bills_data)
+    checkpoint_path = os.path.join(STORAGE_DIR, ANALYSIS_CHECKPOINT_FILE)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return applied
+
+# ============================================================
+# ==================== NEAR-DUPLICATES ======================
+# ============================================================
+
+# Keys derived from the bill text alone, which a near-duplicate's analysis can provide; related_bills
+# also depends on the bills around each bill in the corpus
+REUSABLE_KEYS = [key for key in WRAPPER_FUNCTIONS if key not in ('public_engagement', 'related_bills')]
+
+def reusable_fields(bill):
+    """
+    Returns the REUSABLE_KEYS fields of a bill that are up to date with its text.
+
+    Args:
+        bill (dict): The bill data.
+
+    Returns:
+        dict: The fields, keyed like WRAPPER_FUNCTIONS.
+    """
+    analysis_inputs = bill.get('analysis_inputs') or {}
+    return {
+        key: bill[key] for key in REUSABLE_KEYS
+        if key in bill and analysis_inputs.get(key) == task_input_fingerprint(key, bill)
+    }
+
+def load_signatures():
+    """Loads the MinHash signatures of earlier runs, keyed by bill content hash."""
+    path = os.path.join(STORAGE_DIR, SIGNATURES_FILE)
+    return load_json(path) if os.path.exists(path) else {}
+
+def bill_signature(bill, signatures):
+    """
+    Returns the MinHash signature of a bill's text, computing it only if signatures has none for the text.
+
+    Args:
+        bill (dict): The bill data.
+        signatures (dict): Signatures by content hash; updated in place.
+
+    Returns:
+        list: The signature.
+    """
+    content_hash = bill_content_hash(bill)
+    if content_hash not in signatures:
+        signatures[content_hash] = minhash_signature(load_bill_body(bill))
+    return signatures[content_hash]
+
+def bill_text_diff(old_text, new_text):
+    """
+    Returns the line diff of two bill texts, with one line of context around each change.
+
+    Args:
+        old_text (str): The earlier bill's text.
+        new_text (str): The bill's text.
+
+    Returns:
+        str: Unified diff hunks, empty when the texts have the same lines.
+    """
+    lines = difflib.unified_diff(old_text.splitlines(), new_text.splitlines(), lineterm='', n=1)
+    return '\n'.join(line for line in lines if not line.startswith(('---', '+++')))
+
+class DuplicateFinder:
+    """
+    Finds, for each bill a run analyses, the most similar bill with a reusable analysis.
+
+    Donors are bills whose analysis is up to date from earlier runs and bills finished earlier in this run.
+    A bill whose best match is still being analysed waits for it if that bill started first; bills never
+    wait for ones that started after them, so waits cannot form a cycle.
+    """
+
+    def __init__(self, bills_data, bills_to_process, signatures, threshold=DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self.index = SimilarityIndex()
+        self.bills = {}
+        self.donors = {}
+        self.started = {}
+        hrefs_to_process = {bill['href'] for bill in bills_to_process}
+        for bill in bills_data:
+            if bill_content_length(bill) <= MIN_BILL_CONTENT_LENGTH:
+                continue
+            fields = reusable_fields(bill)
+            if fields or bill['href'] in hrefs_to_process:
+                self.index.add(bill['href'], bill_signature(bill, signatures))
+                self.bills[bill['href']] = bill
+            if fields:
+                self.donors[bill['href']] = fields
+
+    def start(self, bill):
+        """Marks a bill as being analysed."""
+        self.started[bill['href']] = (len(self.started), asyncio.Event())
+
+    def finish(self, bill, enhanced_bill):
+        """Makes a finished bill's fields available to the bills after it."""
+        fields = reusable_fields(enhanced_bill) if enhanced_bill else {}
+        if fields:
+            self.donors[bill['href']] = dict(self.donors.get(bill['href'], {}), **fields)
+        self.started[bill['href']][1].set()
+
+    async def find(self, bill):
+        """
+        Finds the most similar donor of a bill, waiting for one still being analysed if it started first.
+
+        Args:
+            bill (dict): A bill passed to start().
+
+        Returns:
+            tuple: (donor bill, its reusable fields, estimated similarity), or None.
+        """
+        signature = self.index.signatures.get(bill['href'])
+        if signature is None:
+            return None
+        order = self.started[bill['href']][0]
+        for similarity, href in self.index.query(signature, self.threshold):
+            if href == bill['href']:
+                continue
+            started = self.started.get(href)
+            if started and started[0] < order:
+                await started[1].wait()
+            if href in self.donors:
+                return self.bills[href], self.donors[href], similarity
+        return None
+
+async def diff_update_analysis(fields, diff):
+    """
+    Updates a near-duplicate bill's analysis to a bill's text from the diff of the two texts, in one request.
+
+    Args:
+        fields (dict): The earlier bill's fields to update, keyed like WRAPPER_FUNCTIONS.
+        diff (str): bill_text_diff() of the earlier bill's text and this bill's.
+
+    Returns:
+        dict: The updated fields that passed validation.
+    """
+    template = {key: TASK_STRUCTURES[key] for key in fields}
+
+    system_message = "You are a legal analyst keeping analyses of Canadian legislative bills up to date."
+    assistant_message = (
+        "The analysis below was written for an earlier bill whose text is nearly identical to this bill's. "
+        "Update it for this bill using the differences between the two texts: change what the differences affect "
+        "and keep everything else as it is. Lists must contain plain strings."
+    )
+
+    user_prompt = (
+        f"Analysis of the earlier bill:\n{json.dumps(fields, indent=4, ensure_ascii=False)}\n\n"
+        f"Differences between the texts (unified diff, earlier bill first):\n{diff}"
+    )
+
+    try:
+        raw_analysis = await agenerate_text(
+            *task_messages(
+                system_message, assistant_message, user_prompt,
+                "Return the updated analysis as a JSON object with exactly the same structure."
+            ),
+            response_format=structured_response_format('diff_update', template)
+        )
+    except GenerationError:
+        raw_analysis = None
+
+    parse_started = time.process_time()
+    results, failed_keys = parse_structured_reply(raw_analysis, template)
+    summary = results.get('summary')
+    if summary is not None:
+        if summary['content'].strip():
+            summary['content'] = clean_html_summary(summary['content'])
+            summary['generated_on'] = datetime.now(timezone.utc).isoformat()
+        else:
+            del results['summary']
+            failed_keys.append('summary')
+    record_parse(len(template), len(failed_keys), time.process_time() - parse_started)
+
+    return results
+
+async def reuse_analysis(bill, bill_content, donor, keys):
+    """
+    Derives a bill's fields from a near-duplicate bill's analysis.
+
+    Identical texts copy the fields without a request; otherwise diff_update_analysis() updates them.
+    Fields that fail validation, and all of them when the diff is longer than DUPLICATE_MAX_DIFF_TOKENS,
+    are left for the usual analysis.
+
+    Args:
+        bill (dict): The bill data.
+        bill_content (str): The bill's text.
+        donor (tuple): (donor bill, its reusable fields, similarity) from DuplicateFinder.find().
+        keys (list): Keys to derive; all of them are in the donor's fields.
+
+    Returns:
+        dict: The reused fields, keyed like WRAPPER_FUNCTIONS.
+    """
+    donor_bill, donor_fields, similarity = donor
+    fields = {key: copy.deepcopy(donor_fields[key]) for key in keys}
+    diff = '' if bill_content_hash(donor_bill) == bill_content_hash(bill) else bill_text_diff(load_bill_body(donor_bill), bill_content)
+    if diff.strip():
+        if count_tokens(diff) > DUPLICATE_MAX_DIFF_TOKENS:
+            return {}
+        fields = await diff_update_analysis(fields, diff)
+    if fields:
+        prompt_tokens, completion_tokens = estimate_bill_tokens(bill, list(fields))
+        record_reuse(donor_bill['href'], len(fields), not diff.strip(), prompt_tokens + completion_tokens)
+        print(
+            f"♻️ Reused {len(fields)} fields of Bill {bill.get('bill_number', 'Unknown')} from {donor_bill.get('bill_number')} "
+            f"({similarity:.0%} similar, {'identical text' if not diff.strip() else 'diff-updated'})"
+        )
+    return fields
+
+# ============================================================
+# ==================== SCHEDULING ===========================
+# ============================================================
+
+# Stages counted towards a bill's progress
+STAGE_FIELDS = [
+    'senate_first_reading', 'senate_second_reading', 'senate_third_reading',
+    'house_first_reading', 'house_second_reading', 'house_third_reading',
+    'royal_assent'
+]
+
+def bill_priority(bill):
+    """
+    Sort key of a bill in the run's queue; higher runs first.
+
+    Args:
+        bill (dict): The bill data.
+
+    Returns:
+        tuple: (priority score, last_updated_at) for sorting in reverse.
+    """
+    score = 0.0
+    if str(bill.get('change_status')).lower() == 'true':
+        score += PRIORITY_CHANGED_WEIGHT
+    bill_type = (bill.get('bill_type') or '').lower().replace('’', "'")
+    score += max(
+        (weight for pattern, weight in PRIORITY_BILL_TYPE_WEIGHTS.items() if pattern.lower() in bill_type),
+        default=0
+    )
+    score += PRIORITY_STAGE_WEIGHT * sum(1 for field in STAGE_FIELDS if bill.get(field) == 'Completed')
+    return score, bill.get('last_updated_at') or ''
+
+def estimate_bill_tokens(bill, keys):
+    """
+    Estimates the tokens a bill's analysis will use, from the length of its text, before running it.
+
+    Responses answered from the response cache cost nothing, so the estimate errs on the high side.
+
+    Args:
+        bill (dict): The bill data.
+        keys (list): ENHANCED_KEYS keys to recompute.
+
+    Returns:
+        tuple: Estimated (prompt tokens, completion tokens).
+    """
+    model_keys = [key for key in WRAPPER_FUNCTIONS if key in keys]
+    content_length = bill_content_length(bill)
+    if not model_keys or content_length <= MIN_BILL_CONTENT_LENGTH:
+        return 0, 0
+    content_tokens = content_length // 4
+    single_call_tokens = min(content_tokens, SINGLE_CALL_MAX_TOKENS)
+    chunked = content_tokens > SINGLE_CALL_MAX_TOKENS
+    if ANALYSIS_MODE == 'fused' and any(key in FUSED_TASKS and not (chunked and key in CHUNKED_TASKS) for key in model_keys):
+        # One request covers every fused task; its fallbacks are not counted
+        model_keys = [key for key in model_keys if key not in FUSED_TASKS or (chunked and key in CHUNKED_TASKS)]
+        calls, prompt_tokens = 1, single_call_tokens
+    else:
+        calls, prompt_tokens = 0, 0
+    for key in model_keys:
+        if key == 'public_engagement':
+            calls += 1
+        elif chunked and key in CHUNKED_TASKS:
+            chunk_count = math.ceil(content_tokens / CHUNK_MAX_TOKENS)
+            calls += chunk_count + (key == 'summary')
+            prompt_tokens += content_tokens
+        else:
+            calls += 1
+            prompt_tokens += single_call_tokens
+    # Instructions and JSON structure of each request
+    prompt_tokens += calls * 300
+    return prompt_tokens, calls * OPENAI_ESTIMATED_COMPLETION_TOKENS
+
+class RunBudget:
+    """
+    Token, cost and time budget of a run.
+
+    A bill fits while the usage of finished bills plus the estimates of bills in flight, plus its own estimate,
+    stays within the budget. A bill that does not fit waits for the bills in flight to settle, and smaller bills
+    behind it go first; when nothing is in flight it may start alone, so a bill estimated over the whole budget
+    does not hold up every run. The budget is exhausted once the time is up or finished bills used the tokens
+    or cost, and no more bills start.
+    """
+
+    def __init__(self, max_tokens=0, max_cost_usd=0.0, max_seconds=0.0):
+        self.max_tokens = max_tokens
+        self.max_cost_usd = max_cost_usd
+        self.max_seconds = max_seconds
+        self.started = time.monotonic()
+        self.spent_tokens = 0
+        self.spent_cost_usd = 0.0
+        self.reserved_prompt_tokens = 0
+        self.reserved_completion_tokens = 0
+        self.in_flight = 0
+        self.exhausted = None  # What ran out, once something did
+
+    def admit(self, estimate, alone=False):
+        """
+        Reserves a bill's estimated tokens if they fit the budget.
+
+        Args:
+            estimate (tuple): (prompt tokens, completion tokens) from estimate_bill_tokens().
+            alone (bool): Admit the bill even if it does not fit, as long as no other bill is in flight.
+
+        Returns:
+            bool: True if the bill may start.
+        """
+        if self.exhausted:
+            return False
+        if self.max_seconds and time.monotonic() - self.started >= self.max_seconds:
+            self.exhausted = f"{self.max_seconds:.0f}s time budget"
+        elif self.max_tokens and self.spent_tokens >= self.max_tokens:
+            self.exhausted = f"{self.max_tokens} token budget"
+        elif self.max_cost_usd and self.spent_cost_usd >= self.max_cost_usd:
+            self.exhausted = f"${self.max_cost_usd:.2f} cost budget"
+        if self.exhausted:
+            return False
+        prompt_tokens = self.reserved_prompt_tokens + estimate[0]
+        completion_tokens = self.reserved_completion_tokens + estimate[1]
+        committed_tokens = self.spent_tokens + prompt_tokens + completion_tokens
+        committed_cost = self.spent_cost_usd + estimate_cost(OPENAI_MODEL, prompt_tokens, completion_tokens)
+        fits = not (self.max_tokens and committed_tokens > self.max_tokens) and \
+            not (self.max_cost_usd and committed_cost > self.max_cost_usd)
+        if not fits and not (alone and self.in_flight == 0):
+            return False
+        self.reserved_prompt_tokens += estimate[0]
+        self.reserved_completion_tokens += estimate[1]
+        self.in_flight += 1
+        return True
+
+    def settle(self, estimate, usage):
+        """
+        Replaces a finished bill's reservation with the usage it actually had.
+
+        Args:
+            estimate (tuple): The estimate admit() reserved.
+            usage (dict): The bill's UsageTotals.as_dict().
+        """
+        self.reserved_prompt_tokens -= estimate[0]
+        self.reserved_completion_tokens -= estimate[1]
+        self.in_flight -= 1
+        self.spent_tokens += usage['prompt_tokens'] + usage['completion_tokens']
+        self.spent_cost_usd += estimate_cost(
+            OPENAI_MODEL, usage['prompt_tokens'], usage['completion_tokens'], usage['cached_tokens']
+        )
+
 # ============================================================
 # ==================== PROCESSING FUNCTION ==================
 # ============================================================
 
-def process_single_bill(bill):
+async def process_single_bill(bill, keys=None, sink=None, donor=None):
     """
-    Processes a single bill to extract and enhance data using concurrent execution of wrapper functions.
+    Processes a single bill to extract and enhance data, running its wrapper functions as concurrent coroutines.
 
     Args:
         bill (dict): The bill data.
+        keys (list): ENHANCED_KEYS keys to recompute; defaults to all of them.
+        sink (JsonlAppender): Checkpoint each derived field is appended to as soon as it is ready.
+        donor (tuple): Near-duplicate bill whose analysis to reuse, from DuplicateFinder.find().
 
     Returns:
-        dict: Enhanced bill data.
+        dict: Enhanced bill data, with analysis_inputs updated for every key derived successfully.
     """
+    keys = ENHANCED_KEYS if keys is None else keys
     enhanced_data = {}
+    analysis_inputs = dict(bill.get('analysis_inputs') or {})
+
+    def record(key, value):
+        enhanced_data[key] = value
+        analysis_inputs[key] = task_input_fingerprint(key, bill)
+        if sink is not None:
+            sink.append({
+                'href': bill['href'],
+                'key': key,
+                'value': value,
+                'input': analysis_inputs[key],
+                'derived_at': datetime.now(timezone.utc).isoformat()
+            })
+
     try:
         bill_number = bill.get('bill_number', 'Unknown')
-        bill_content = bill.get('bill_content', '')
-        bill_content_length = len(bill_content)
-
-        # Filter bills with bill_content greater than 500 characters
-        if bill_content_length <= 500:
-            print(f"⚠️ Skipping Bill: {bill_number} due to insufficient bill content length ({bill_content_length} characters).")
-            return None
+        content_length = bill_content_length(bill)
 
-        print(f"🔍 Processing Bill: {bill_number}...")
+        print(f"🔍 Processing Bill: {bill_number} ({', '.join(keys)})...")
 
         # ------------------- Essential Keys -------------------
         # Extract bill progress information
-        try:
-            enhanced_data['bill_progress'] = {
-                'current_status': bill.get('current_status', ''),
-                'last_major_stage_completed': bill.get('last_major_stage_completed', ''),
-                'senate_readings': {
-                    'first_reading': bill.get('senate_first_reading', ''),
-                    'second_reading': bill.get('senate_second_reading', ''),
-                    'third_reading': bill.get('senate_third_reading', '')
-                },
-                'house_readings': {
-                    'first_reading': bill.get('house_first_reading', ''),
-                    'second_reading': bill.get('house_second_reading', ''),
-                    'third_reading': bill.get('house_third_reading', '')
-                },
-                'royal_assent': bill.get('royal_assent', '')
-            }
-            print(f"✅ Bill progress extracted for Bill: {bill_number}")
-        except Exception as e:
-            print(f"❌ Error extracting bill progress for {bill_number}: {e}")
-            enhanced_data['bill_progress'] = {}
+        if 'bill_progress' in keys:
+            try:
+                record('bill_progress', {
+                    'current_status': bill.get('current_status', ''),
+                    'last_major_stage_completed': bill.get('last_major_stage_completed', ''),
+                    'senate_readings': {
+                        'first_reading': bill.get('senate_first_reading', ''),
+                        'second_reading': bill.get('senate_second_reading', ''),
+                        'third_reading': bill.get('senate_third_reading', '')
+                    },
+                    'house_readings': {
+                        'first_reading': bill.get('house_first_reading', ''),
+                        'second_reading': bill.get('house_second_reading', ''),
+                        'third_reading': bill.get('house_third_reading', '')
+                    },
+                    'royal_assent': bill.get('royal_assent', '')
+                })
+                print(f"✅ Bill progress extracted for Bill: {bill_number}")
+            except Exception as e:
+                print(f"❌ Error extracting bill progress for {bill_number}: {e}")
+                enhanced_data['bill_progress'] = {}
 
         # Extract sponsor profile information
-        try:
-            enhanced_data['sponsor_profile'] = {
-                'name': bill.get('sponsor', ''),
-                'bill_type': bill.get('bill_type', ''),
-                'contact_email': bill.get('contact_email', '')
-            }
-            print(f"✅ Sponsor profile extracted for Bill: {bill_number}")
-        except Exception as e:
-            print(f"❌ Error extracting sponsor profile for {bill_number}: {e}")
-            enhanced_data['sponsor_profile'] = {}
-
-        # ------------------- Concurrent Wrapper Execution -------------------
-        with ThreadPoolExecutor(max_workers=len(WRAPPER_FUNCTIONS)) as executor:
-            future_to_key = {}
-            for key, func in WRAPPER_FUNCTIONS.items():
+        if 'sponsor_profile' in keys:
+            try:
+                record('sponsor_profile', {
+                    'name': bill.get('sponsor', ''),
+                    'bill_type': bill.get('bill_type', ''),
+                    'contact_email': bill.get('contact_email', '')
+                })
+                print(f"✅ Sponsor profile extracted for Bill: {bill_number}")
+            except Exception as e:
+                print(f"❌ Error extracting sponsor profile for {bill_number}: {e}")
+                enhanced_data['sponsor_profile'] = {}
+
+        model_keys = [key for key in WRAPPER_FUNCTIONS if key in keys]
+
+        # Filter bills with bill_content greater than MIN_BILL_CONTENT_LENGTH characters
+        if model_keys and content_length <= MIN_BILL_CONTENT_LENGTH:
+            print(f"⚠️ Skipping model analysis of Bill: {bill_number} due to insufficient bill content length ({content_length} characters).")
+            model_keys = []
+
+        if not model_keys:
+            enhanced_bill = bill.copy()
+            enhanced_bill.update(enhanced_data)
+            enhanced_bill['analysis_inputs'] = analysis_inputs
+            return enhanced_bill
+
+        # The text is only read from the blob store once the bill is known to need it,
+        # and without the page navigation and footer the publication page wraps it in
+        bill_content = load_bill_body(bill)
+
+        # ------------------- Long Bills -------------------
+        # Long bills are chunked: CHUNKED_TASKS map-reduce over every chunk, the other tasks read the opening chunks
+        content_tokens = count_tokens(bill_content)
+        chunks = None
+        task_content = bill_content
+        if content_tokens > SINGLE_CALL_MAX_TOKENS:
+            chunks = split_bill_text(bill_content, CHUNK_MAX_TOKENS)
+            task_content = leading_chunks(chunks, SINGLE_CALL_MAX_TOKENS)
+            print(f"✂️ Bill {bill_number} has {content_tokens} tokens: map-reducing {', '.join(CHUNKED_TASKS)} over {len(chunks)} chunks")
+
+        async def run_task(key):
+            with telemetry_labels(task=key):
                 if key == 'public_engagement':
-                    future = executor.submit(func, bill_number)
+                    result = await WRAPPER_FUNCTIONS[key](bill_number)
+                elif chunks and key in CHUNKED_TASKS:
+                    result = await CHUNKED_TASKS[key](chunks)
+                elif key in extracted:
+                    result = await WRAPPER_FUNCTIONS[key](task_content, extracted[key][EXTRACTED_TASKS[key][0]])
                 else:
-                    future = executor.submit(func, bill_content)
-                future_to_key[future] = key
-
-            for future in as_completed(future_to_key):
-                key = future_to_key[future]
+                    result = await WRAPPER_FUNCTIONS[key](task_content)
+            record(key, result)
+            print(f"✅ {key.replace('_', ' ').title()} processed for Bill: {bill_number}")
+            return result
+
+        # ------------------- Model Calls -------------------
+        started = time.monotonic()
+        with track_usage() as usage, telemetry_labels(bill=bill['href']):
+            # ------------------- Local Extraction -------------------
+            # Rule-based extraction over the whole text; LOCAL_TASKS it answers need no request
+            # and the other extracted tasks get its findings as hints
+            extracted = {}
+            if any(key in EXTRACTED_TASKS for key in model_keys):
+                extract_started = time.process_time()
+                extracted = {
+                    key: value for key, value in extract_local_fields(bill, bill_content).items() if key in model_keys
+                }
+                local_keys = [key for key in extracted if key in LOCAL_TASKS]
+                for key in local_keys:
+                    record(key, extracted.pop(key))
+                model_keys = [key for key in model_keys if key not in local_keys]
+                extract_seconds = time.process_time() - extract_started
+                record_local(len(local_keys), len(extracted), extract_seconds)
+                if local_keys:
+                    print(f"🧮 Extracted {', '.join(local_keys)} locally for Bill: {bill_number} in {extract_seconds * 1000:.0f} ms")
+
+            # ------------------- Near-Duplicate Reuse -------------------
+            if donor is not None:
+                reuse_keys = [key for key in model_keys if key in donor[1]]
+                if reuse_keys:
+                    with telemetry_labels(task='reuse'):
+                        reused = await reuse_analysis(bill, bill_content, donor, reuse_keys)
+                    for key, value in reused.items():
+                        record(key, value)
+                    model_keys = [key for key in model_keys if key not in reused]
+
+            # ------------------- Fused Analysis -------------------
+            wrapper_keys = model_keys
+            queued = 0  # Requests queued for a batch job instead of answered
+            fused_keys = [key for key in FUSED_TASKS if key in model_keys and not (chunks and key in CHUNKED_TASKS)]
+            if ANALYSIS_MODE == 'fused' and fused_keys:
                 try:
-                    result = future.result()
-                    enhanced_data[key] = result
-                    print(f"✅ {key.replace('_', ' ').title()} processed for Bill: {bill_number}")
-                except Exception as e:
-                    print(f"❌ Error processing {key} for Bill {bill_number}: {e}")
+                    with telemetry_labels(task='fused'):
+                        fused_results, failed_keys = await fused_analysis(task_content, fused_keys)
+                except BatchRequestQueued:
+                    # Which fields need the per-task fallback is only known once the batch has answered
+                    queued += 1
+                    wrapper_keys = [key for key in model_keys if key not in fused_keys]
+                else:
+                    for key, value in fused_results.items():
+                        record(key, value)
+                    wrapper_keys = [key for key in model_keys if key not in fused_results]
+                    print(f"✅ Fused analysis returned {len(fused_results)}/{len(fused_keys)} fields for Bill: {bill_number}")
+                    if failed_keys:
+                        print(f"🔁 Falling back to per-task calls for Bill {bill_number}: {', '.join(failed_keys)}")
+
+            # ------------------- Concurrent Wrapper Execution -------------------
+            # With a shared prefix, one task on the bill text runs first so the provider has cached
+            # the prefix before the others fan out (concurrent requests would all miss the cache)
+            warm_up_keys = []
+            if PROMPT_LAYOUT == 'shared_prefix' and len(wrapper_keys) > 1:
+                warm_up_keys = [
+                    key for key in wrapper_keys
+                    if key != 'public_engagement' and not (chunks and key in CHUNKED_TASKS)
+                ][:1]
+            wrapper_keys = warm_up_keys + [key for key in wrapper_keys if key not in warm_up_keys]
+
+            # Tasks copy the current context, so their calls count towards the bill's usage;
+            # each one records its field as soon as it finishes
+            results = await asyncio.gather(*[run_task(key) for key in warm_up_keys], return_exceptions=True)
+            results += await asyncio.gather(
+                *[run_task(key) for key in wrapper_keys[len(warm_up_keys):]], return_exceptions=True
+            )
+
+            for key, result in zip(wrapper_keys, results):
+                if isinstance(result, BatchRequestQueued):
+                    queued += 1
+                elif isinstance(result, Exception):
+                    print(f"❌ Error processing {key} for Bill {bill_number}: {result}")
                     enhanced_data[key] = {}
 
+            if not queued:
+                record_bill(time.monotonic() - started)
+
+        if queued:
+            print(f"⏳ Queued {queued} requests of Bill {bill_number} for the batch job\n")
+            return None
+
+        totals = usage.as_dict()
+        print(
+            f"📊 Bill {bill_number} ({ANALYSIS_MODE}): {totals['calls']} calls, {totals['cache_hits']} cache hits, "
+            f"{totals['prompt_tokens']} prompt ({totals['cached_ratio']:.0%} cached) + {totals['completion_tokens']} completion tokens, "
+            f"{time.monotonic() - started:.1f}s"
+        )
+
         # Add ai_enhancement_date
         enhanced_data['ai_enhancement_date'] = datetime.now(timezone.utc).isoformat()
 
         # ------------------- Prepare Enhanced Bill -------------------
         enhanced_bill = bill.copy()
         enhanced_bill.update(enhanced_data)
+        enhanced_bill['analysis_inputs'] = analysis_inputs
 
         print(f"🎉 Completed processing Bill: {bill_number}\n")
         return enhanced_bill
@@ -566,64 +1617,288 @@ def process_single_bill(bill):
 # ==================== MAIN PROCESSING ======================
 # ============================================================
 
-def process_bills():
+async def process_bills():
     """
     Processes all bills in the ENHANCED_BILLS_FILE to extract additional data and enhance the JSON file.
-    Utilizes multithreading for efficient processing.
+    Runs bills as coroutines on one event loop; their requests share one connection pool and rate limiter.
+    Bills start in bill_priority() order, skipping those that do not fit the run's budget beside the bills
+    in flight, until the budget is used up. Each derived field is appended to ANALYSIS_CHECKPOINT_FILE as soon as it is ready, so results are not
+    held in memory and a restarted run skips the fields an interrupted one already derived.
     """
     try:
-        # Load existing bills data
-        bills_data = load_json(os.path.join(STORAGE_DIR, ENHANCED_BILLS_FILE))
+        # Load existing bills data; earlier runs appended instead of updating, so drop repeated records
+        bills_data = unique_bills(load_json(os.path.join(STORAGE_DIR, ENHANCED_BILLS_FILE)))
         print(f"📂 Loaded {len(bills_data)} bills from {ENHANCED_BILLS_FILE}.")
 
-        # Load existing enhanced bills or initialize an empty list
-        if os.path.exists(os.path.join(STORAGE_DIR, OUTPUT_FILE)):
-            enhanced_bills = load_json(os.path.join(STORAGE_DIR, OUTPUT_FILE))
-            print(f"📂 Loaded {len(enhanced_bills)} enhanced bills from {OUTPUT_FILE}.")
-        else:
-            enhanced_bills = []
-            print(f"📂 No existing {OUTPUT_FILE} found. Initializing new enhanced bills list.")
+        # Neighbours first: they are part of related_bills' input fingerprint
+        if RELATED_TOP_K:
+            indexed_started = time.perf_counter()
+            indexed = update_similar_bills(bills_data)
+            print(f"🔗 Found similar bills among {len(bills_data)} bills in {time.perf_counter() - indexed_started:.2f}s ({indexed} newly indexed).")
+
+        resumed = load_analysis_checkpoint(bills_data)
+        if resumed:
+            print(f"♻️ Resumed {resumed} fields from {ANALYSIS_CHECKPOINT_FILE}.")
 
-        # Filter bills that are not yet processed
-        bills_to_process = [bill for bill in bills_data]
+        # Only the keys whose inputs changed are recomputed
+        keys_to_process = {bill['href']: stale_keys(bill) for bill in bills_data}
+        bills_to_process = [bill for bill in bills_data if keys_to_process[bill['href']]]
+        stale_count = sum(len(keys) for keys in keys_to_process.values())
 
-        print(f"🔍 Found {len(bills_to_process)} bills to process.\n")
+        print(f"🔍 Found {len(bills_to_process)} bills with {stale_count} outdated fields to process.\n")
 
         if not bills_to_process:
+            if resumed:
+                compact_analysis_checkpoint(bills_data)
+                print(f"💾 {OUTPUT_FILE} saved with the resumed fields.")
             print("✅ No new bills to process. Enhancement up-to-date.")
             return
 
-        # Determine the number of workers based on CPU cores
-        cpu_cores = multiprocessing.cpu_count()
-        max_workers = cpu_cores * 2  # Adjust multiplier based on I/O vs CPU-bound tasks
-        print(f"⚙️ Starting processing with {max_workers} threads...\n")
+        print(f"⚙️ Starting processing of up to {BILL_CONCURRENCY} bills at a time in {ANALYSIS_MODE} mode...\n")
 
-        # Initialize a ThreadPoolExecutor for processing bills
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all bills for processing
-            future_to_bill = {executor.submit(process_single_bill, bill): bill for bill in bills_to_process}
+        queue = deque(sorted(bills_to_process, key=bill_priority, reverse=True))
+        budget = RunBudget(RUN_MAX_TOKENS, RUN_MAX_COST_USD, RUN_MAX_SECONDS)
 
-            for future in as_completed(future_to_bill):
-                bill = future_to_bill[future]
-                try:
-                    enhanced_bill = future.result()
-                    if enhanced_bill:
-                        with lock:
-                            enhanced_bills.append(enhanced_bill)
-                except Exception as exc:
-                    print(f"🚨 {bill.get('bill_number', 'Unknown')} generated an exception: {exc}")
-
-        # Save all enhanced bills at once to reduce I/O operations
-        save_json(OUTPUT_FILE, enhanced_bills)
-        print(f"\n💾 {OUTPUT_FILE} saved successfully.")
+        duplicates = None
+        if DUPLICATE_THRESHOLD:
+            signatures = load_signatures()
+            duplicates = DuplicateFinder(bills_data, bills_to_process, signatures)
+            save_json(SIGNATURES_FILE, signatures)
+
+        estimates = {bill['href']: estimate_bill_tokens(bill, keys_to_process[bill['href']]) for bill in bills_to_process}
+        settled = asyncio.Condition()
+
+        def next_bill():
+            # The highest-priority bill that fits the budget; when none does, the first one if it can start alone
+            for index, bill in enumerate(queue):
+                if budget.admit(estimates[bill['href']]):
+                    break
+                if budget.exhausted:
+                    return None
+            else:
+                if not queue or not budget.admit(estimates[queue[0]['href']], alone=True):
+                    return None
+                index = 0
+            bill = queue[index]
+            del queue[index]
+            return bill
+
+        async def process_queue(sink):
+            # Each worker takes the next bill next_bill() admits; results go to the checkpoint, not to a list
+            while queue and not budget.exhausted:
+                async with settled:
+                    bill = next_bill()
+                    if bill is None:
+                        if budget.exhausted or not queue:
+                            return
+                        # Nothing fits beside the bills in flight; look again when one of them settles
+                        await settled.wait()
+                        continue
+                keys = keys_to_process[bill['href']]
+                enhanced_bill = None
+                if duplicates:
+                    duplicates.start(bill)
+                with track_usage() as bill_usage:
+                    try:
+                        donor = await duplicates.find(bill) if duplicates else None
+                        enhanced_bill = await process_single_bill(bill, keys, sink, donor)
+                    except Exception as e:
+                        print(f"🚨 {bill.get('bill_number', 'Unknown')} generated an exception: {e}")
+                    finally:
+                        if duplicates:
+                            duplicates.finish(bill, enhanced_bill)
+                async with settled:
+                    budget.settle(estimates[bill['href']], bill_usage.as_dict())
+                    settled.notify_all()
+
+        started = time.monotonic()
+        with collect_telemetry(OPENAI_MODEL) as telemetry, track_usage() as usage, \
+                JsonlAppender(ANALYSIS_CHECKPOINT_FILE, ANALYSIS_CHECKPOINT_FSYNC_EVERY) as sink:
+            # Each worker's task copies this context, so its usage adds to the run totals
+            await asyncio.gather(*[process_queue(sink) for _ in range(BILL_CONCURRENCY)])
+            concurrency = concurrency_metrics()
+            await close_async_client()
+
+        if queue:
+            print(f"\n⏸️ Stopped at the {budget.exhausted}: {len(queue)} bills left outdated for the next run.")
+
+        totals = usage.as_dict()
+        print(
+            f"\n📊 Run totals ({ANALYSIS_MODE}): {totals['calls']} calls, {totals['cache_hits']} cache hits, "
+            f"{totals['prompt_tokens']} prompt ({totals['cached_ratio']:.0%} cached) + {totals['completion_tokens']} completion tokens, "
+            f"{time.monotonic() - started:.1f}s"
+        )
+        if concurrency:
+            print(
+                f"🚦 LLM concurrency window: {concurrency['window']} "
+                f"({concurrency['succeeded']} ok, {concurrency['throttled']} throttled, {concurrency['failed']} failed)"
+            )
+        stats = cache_stats()
+        if stats:
+            print(
+                f"🗄️ Response cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%}), "
+                f"{stats['evictions']} evictions, {stats['entries']} entries / {stats['bytes'] / 1048576:.1f} MB"
+            )
+
+        # Tasks by estimated cost, with their latency quantiles
+        report = telemetry.report()
+        print(f"💵 Estimated cost: ${report['totals']['cost_usd']:.4f} ({OPENAI_MODEL})")
+        if report['reuse']['bills']:
+            print(
+                f"♻️ Near-duplicates: {report['reuse']['bills']} bills reused {report['reuse']['fields']} fields "
+                f"({report['reuse']['identical']} with identical text), about {report['reuse']['estimated_tokens_avoided']} tokens avoided"
+            )
+        for task, counters in report['tasks'].items():
+            latency = counters['latency_seconds'] or {}
+            quantiles = '/'.join(f"{latency[q]:.2f}" if latency.get(q) is not None else '-' for q in ('p50', 'p95', 'p99'))
+            print(
+                f"   {task:<22} ${counters['cost_usd']:.4f}  {counters['calls']} calls  {counters['retries']} retries  "
+                f"{counters['prompt_tokens']}+{counters['completion_tokens']} tokens ({counters['cached_ratio']:.0%} cached)  "
+                f"p50/p95/p99 {quantiles}s"
+            )
+        telemetry.write(os.path.join(STORAGE_DIR, RUN_REPORT_FILE), os.path.join(STORAGE_DIR, METRICS_FILE))
+        print(f"📈 Telemetry written to {RUN_REPORT_FILE} and {METRICS_FILE}.")
+
+        # Fold the checkpoint into the output in one write, then start the next run with an empty checkpoint
+        applied = compact_analysis_checkpoint(bills_data)
+        print(f"\n💾 {OUTPUT_FILE} saved with {applied} derived fields.")
         print("\n🎉 All bills processed and enhanced successfully.")
 
     except Exception as e:
         print(f"🚨 Error in processing bills: {e}")
 
+async def process_bills_batch():
+    """
+    Processes all bills in the ENHANCED_BILLS_FILE through Batch API jobs instead of live requests.
+
+    Each round replays every bill's analysis with uncached requests queued instead of sent, submits the
+    queue as one batch job, waits for it and appends its responses to BATCH_RESPONSES_FILE. Once a round
+    queues nothing, every answer comes from that file or the response cache, parsed by the usual wrapper
+    functions, the enhanced bills are saved and the file is removed. Derived fields go through ANALYSIS_CHECKPOINT_FILE as in process_bills. The job in flight is kept in BATCH_STATE_FILE, so a restarted run resumes
+    waiting for it instead of resubmitting; requests the job failed or did not finish are queued again.
+    """
+    try:
+        if OPENAI_CACHE_BYPASS:
+            print("⚠️ OPENAI_CACHE_BYPASS is ignored in batch mode: cached responses are read instead of queued again.")
+
+        os.makedirs(os.path.join(STORAGE_DIR, BATCH_DIR), exist_ok=True)
+        bills_data = unique_bills(load_json(os.path.join(STORAGE_DIR, ENHANCED_BILLS_FILE)))
+        print(f"📂 Loaded {len(bills_data)} bills from {ENHANCED_BILLS_FILE}.")
+        update_similar_bills(bills_data)
+        resumed = load_analysis_checkpoint(bills_data)
+        if resumed:
+            print(f"♻️ Resumed {resumed} fields from {ANALYSIS_CHECKPOINT_FILE}.")
+        keys_to_process = {bill['href']: stale_keys(bill) for bill in bills_data}
+        bills_to_process = [bill for bill in bills_data if keys_to_process[bill['href']]]
+        print(f"🔍 Found {len(bills_to_process)} bills with outdated fields to process.\n")
+
+        for round_number in range(1, BATCH_MAX_ROUNDS + 1):
+            state_path = os.path.join(STORAGE_DIR, BATCH_STATE_FILE)
+            responses_path = os.path.join(STORAGE_DIR, BATCH_RESPONSES_FILE)
+            state = load_json(state_path) if os.path.exists(state_path) else {}
+            if state.get('batch_id'):
+                print(f"⏳ Waiting for batch {state['batch_id']} ({state['requests']} requests)...")
+                batch = await wait_for_batch(state['batch_id'])
+                ingested = await ingest_batch_output(batch, responses_path)
+                print(f"📥 Batch {batch.id} {batch.status}: stored {ingested}/{state['requests']} responses.")
+                save_json(BATCH_STATE_FILE, {})
+
+            with collect_batch_requests(load_batch_responses(responses_path)) as collector, \
+                    JsonlAppender(ANALYSIS_CHECKPOINT_FILE, ANALYSIS_CHECKPOINT_FSYNC_EVERY) as sink:
+                await asyncio.gather(
+                    *[process_single_bill(bill, keys_to_process[bill['href']], sink) for bill in bills_to_process],
+                    return_exceptions=True
+                )
+            lines = collector.lines()
+
+            if not lines:
+                applied = compact_analysis_checkpoint(bills_data)
+                if os.path.exists(responses_path):
+                    os.remove(responses_path)
+                print(f"\n💾 {OUTPUT_FILE} saved with {applied} derived fields.")
+                print("\n🎉 All bills processed and enhanced successfully.")
+                return
+
+            submitted_at = datetime.now(timezone.utc)
+            batch_file = os.path.join(STORAGE_DIR, BATCH_DIR, f"batch_{submitted_at:%Y%m%dT%H%M%S}.jsonl")
+            batch_id = await submit_batch(batch_file, lines)
+            save_json(BATCH_STATE_FILE, {
+                'batch_id': batch_id,
+                'input_file': batch_file,
+                'requests': len(lines),
+                'round': round_number,
+                'submitted_at': submitted_at.isoformat()
+            })
+            print(f"📤 Round {round_number}: submitted batch {batch_id} with {len(lines)} requests.")
+
+        print(f"🚨 Requests still unanswered after {BATCH_MAX_ROUNDS} batch rounds; run batch mode again to resume.")
+
+    except Exception as e:
+        print(f"🚨 Error in batch processing of bills: {e}")
+    finally:
+        await close_async_client()
+
+def report_near_duplicates():
+    """
+    Reports the near-duplicate bills of the corpus and the tokens reusing their analyses would avoid.
+
+    Bills are visited in bill_priority() order, and each is matched against the bills before it, as a run from
+    scratch would. Identical texts avoid the bill's whole estimate; others are charged a diff update, whose
+    prompt is the diff and the analysis being updated.
+    """
+    bills_data = [
+        bill for bill in unique_bills(load_json(os.path.join(STORAGE_DIR, ENHANCED_BILLS_FILE)))
+        if bill_content_length(bill) > MIN_BILL_CONTENT_LENGTH
+    ]
+    signatures = load_signatures()
+    index = SimilarityIndex()
+    by_href = {}
+    clusters = {}
+    total_tokens = avoided_tokens = identical = diff_updated = 0
+    for bill in sorted(bills_data, key=bill_priority, reverse=True):
+        signature = bill_signature(bill, signatures)
+        prompt_tokens, completion_tokens = estimate_bill_tokens(bill, ENHANCED_KEYS)
+        total_tokens += prompt_tokens + completion_tokens
+        matches = index.query(signature, DUPLICATE_THRESHOLD) if DUPLICATE_THRESHOLD else []
+        index.add(bill['href'], signature)
+        by_href[bill['href']] = bill
+        if not matches:
+            continue
+        donor = by_href[matches[0][1]]
+        reuse_tokens = sum(estimate_bill_tokens(bill, REUSABLE_KEYS))
+        if bill_content_hash(donor) == bill_content_hash(bill):
+            identical += 1
+        else:
+            diff_tokens = count_tokens(bill_text_diff(load_bill_body(donor), load_bill_body(bill)))
+            if diff_tokens > DUPLICATE_MAX_DIFF_TOKENS:
+                continue
+            analysis_tokens = len(REUSABLE_KEYS) * OPENAI_ESTIMATED_COMPLETION_TOKENS
+            reuse_tokens -= diff_tokens + 300 + 2 * analysis_tokens
+            diff_updated += 1
+        avoided_tokens += max(reuse_tokens, 0)
+        root = clusters.get(donor['href'], donor['href'])
+        clusters[bill['href']] = root
+    save_json(SIGNATURES_FILE, signatures)
+
+    members = {}
+    for href, root in clusters.items():
+        members.setdefault(root, [by_href[root].get('bill_number')]).append(by_href[href].get('bill_number'))
+    print(f"🔍 {len(bills_data)} bills with text; {identical + diff_updated} near-duplicates at {DUPLICATE_THRESHOLD:.0%} similarity "
+          f"({identical} identical, {diff_updated} diff-updated) in {len(members)} clusters.")
+    for numbers in sorted(members.values(), key=len, reverse=True):
+        print(f"   {', '.join(str(number) for number in numbers)}")
+    share = avoided_tokens / total_tokens if total_tokens else 0.0
+    print(f"♻️ Reuse would avoid about {avoided_tokens} of {total_tokens} estimated tokens ({share:.0%}).")
+
 # ============================================================
 # ==================== ENTRY POINT ==========================
 # ============================================================
 
 if __name__ == "__main__":
-    process_bills()
+    import sys
+    if sys.argv[1:] == ['batch']:
+        asyncio.run(process_bills_batch())
+    elif sys.argv[1:] == ['duplicates']:
+        report_near_duplicates()
+    else:
+        asyncio.run(process_bills())
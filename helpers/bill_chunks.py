@@ -0,0 +1,103 @@
+# helpers/bill_chunks.py
+
+import hashlib
+from helpers.bill_structure import parse_bill_text
+from openaiconfig.openaiservice import count_tokens
+
+# Segment types a chunk may start at; subsections stay with their section
+CHUNK_BOUNDARY_TYPES = ('summary', 'part', 'division', 'section')
+
+
+def _units(text):
+    """
+    Splits a bill text into the smallest pieces a chunk is built from: its provisions when the
+    structure is recognised, otherwise its paragraphs.
+    """
+    structure = parse_bill_text(text)
+    starts = sorted({
+        segment['start'] for segment in structure['segments']
+        if segment['type'] in CHUNK_BOUNDARY_TYPES
+    })
+    if not starts:
+        pieces = text.split('\n\n')
+        return [piece + '\n\n' for piece in pieces[:-1]] + [pieces[-1]]
+    bounds = [0] + [start for start in starts if start > 0] + [len(text)]
+    return [text[start:end] for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def _split_oversized(unit, max_tokens):
+    """Splits a single provision longer than max_tokens at line breaks."""
+    pieces = []
+    current = ''
+    for line in unit.splitlines(keepends=True):
+        if current and count_tokens(current + line) > max_tokens:
+            pieces.append(current)
+            current = ''
+        current += line
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_bill_text(text, max_tokens=4000, min_tokens=1000, cut_divisor=8):
+    """
+    Splits a bill text into chunks of whole provisions, each at most max_tokens long.
+
+    Chunk ends are content-defined: past min_tokens, a chunk ends after a provision whose hash is
+    divisible by cut_divisor. An amendment therefore only changes the chunks around the provisions
+    it touches, and the other chunks keep their exact text (and their cached responses).
+
+    Args:
+        text (str): The bill text.
+        max_tokens (int): Largest chunk, in tokens.
+        min_tokens (int): Smallest chunk that may end at a content-defined cut.
+        cut_divisor (int): About one provision in cut_divisor is a cut point.
+
+    Returns:
+        list: The chunk texts, in order; joined they give back the text.
+    """
+    chunks = []
+    current = ''
+    current_tokens = 0
+    for unit in _units(text):
+        unit_tokens = count_tokens(unit)
+        if unit_tokens > max_tokens:
+            if current:
+                chunks.append(current)
+                current, current_tokens = '', 0
+            chunks.extend(_split_oversized(unit, max_tokens))
+            continue
+        if current and current_tokens + unit_tokens > max_tokens:
+            chunks.append(current)
+            current, current_tokens = '', 0
+        current += unit
+        current_tokens += unit_tokens
+        digest = int(hashlib.sha1(unit.encode('utf-8')).hexdigest()[:8], 16)
+        if current_tokens >= min_tokens and digest % cut_divisor == 0:
+            chunks.append(current)
+            current, current_tokens = '', 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def leading_chunks(chunks, max_tokens):
+    """
+    Joins the first chunks that fit within max_tokens (at least the first one).
+
+    Args:
+        chunks (list): Chunk texts from split_bill_text.
+        max_tokens (int): Token budget.
+
+    Returns:
+        str: The opening of the bill, cut at a chunk boundary.
+    """
+    text = ''
+    total = 0
+    for chunk in chunks:
+        chunk_tokens = count_tokens(chunk)
+        if text and total + chunk_tokens > max_tokens:
+            break
+        text += chunk
+        total += chunk_tokens
+    return text
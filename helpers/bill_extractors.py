@@ -0,0 +1,192 @@
+# helpers/bill_extractors.py
+
+import bisect
+import re
+from helpers.bill_structure import parse_bill_text
+
+# Words an Act's name may contain between its capitalised words
+_ACT_NAME_WORD = r"(?:[A-Z][\w'’.-]*|of|and|the|for|to|on|in|respecting|with|des?|du|la)"
+
+# Last words of an Act's name, and the year and number some names end with
+_ACT_NAME_END = r"(?:Act|Code|Tariff|Plan|Bill of Rights)\b(?:,\s*\d{4}(?:,\s*No\.\s*\d+)?)?"
+
+# "Criminal Code", "Income Tax Act", "Budget Implementation Act, 2023, No. 1"
+ACT_NAME = r"[A-Z][\w'’.-]*(?:\s+" + _ACT_NAME_WORD + r"){0,12}?\s+" + _ACT_NAME_END
+
+# Bill numbers such as C-21 or S-5; chapter citations (R.S., c. C-46) are not bills
+BILL_REFERENCE = re.compile(r"(?<![\w.-])(?<!c\. )(?<!ch\. )([CS])-(\d{1,4})(?![\w-])")
+
+# "An Act to amend the Criminal Code, the Sex Offender Information Registration Act and the ..."
+AMENDING_TITLE = re.compile(
+    r"\bto amend (?:the )?(?P<acts>.+?)"
+    r"(?=,?\s+(?:and\s+)?to\s+(?:make|enact|repeal|provide|establish|amend)\b|\s+and\s+(?:other|related|certain)\b"
+    r"|\s+in\s+(?:order|relation)\b|\s*\(|$)"
+)
+# Act names themselves contain "and" ("Immigration and Refugee Protection Act"), so only "and the" separates them
+TITLE_ACT_SEPARATOR = re.compile(r",?\s+and\s+the\s+|,\s+the\s+")
+TITLE_ACT_NAME = re.compile(r"[A-Z].*?\s" + _ACT_NAME_END)
+
+# Citation line under the heading naming the Act the following provisions amend
+CITATION_LINE = re.compile(r"^(?:R\.S\.(?:C\.)?|S\.C\.)[\s,]*(?:\d{4}[\s,]*)?c\.\s*[\w.-]+", re.MULTILINE)
+
+# "Subsection 5(2) of the Criminal Code is replaced by the following:"
+AMENDING_PROVISION = re.compile(
+    r"\b(?P<provision>(?:(?:Sub)?[Ss]ections?|(?:Sub)?[Pp]aragraphs?|Clauses?|Schedules?|Parts?|Divisions?"
+    r"|[Tt]he definitions?|[Tt]he portion)\s[^\n]{0,100}?)"
+    r"\s+of\s+the\s+(?P<act>Act|" + ACT_NAME + r")"
+    r"(?:\s+(?:before|after)\s[^\n]{0,60}?)?\s+(?:is|are)\s+(?P<action>amended|replaced|repealed|renumbered)\b"
+)
+
+# "The Criminal Code is amended by adding the following after section 3:"
+AMENDED_BY = re.compile(
+    r"\bThe\s+(?P<act>Act|" + ACT_NAME + r")\s+is\s+amended\s+by\s+(?P<how>(?:adding|replacing|repealing|striking out)\b(?:[^\n:.]|\.(?=\d)){0,100})"
+)
+
+# What an amending provision does to the provision it names
+AMENDING_VERBS = {'amended': 'amends', 'replaced': 'replaces', 'repealed': 'repeals', 'renumbered': 'renumbers'}
+
+# Legislative and government bodies a bill names
+LEGISLATIVE_BODY = re.compile(
+    r"\b(?:House of Commons|Senate(?: of Canada)?|Parliament(?: of Canada)?|Governor in Council|Governor General"
+    r"|Attorney General of Canada|Treasury Board|Queen's Privy Council for Canada|King's Privy Council for Canada"
+    r"|Supreme Court of Canada|Federal Court(?: of Appeal)?"
+    r"|(?:Minister|Department) of (?:the )?[A-Z][\w'’-]*(?:\s+(?:and\s+)?(?!Minister\b)[A-Z][\w'’-]*)*)"
+)
+
+
+def _unique(items):
+    """Drops repeated items, keeping the first occurrence of each."""
+    return list(dict.fromkeys(items))
+
+
+def _strip_article(name):
+    """Removes a leading article from an Act name matched mid-sentence."""
+    return re.sub(r"^(?:The|An|A)\s+", '', name)
+
+
+def find_bill_references(text, own_number=None):
+    """
+    Finds the bills a text refers to by number.
+
+    Args:
+        text (str): The bill text.
+        own_number (str): The bill's own number (e.g. 'S-12'), which is left out.
+
+    Returns:
+        list: 'Bill C-21' style references, in order of first appearance.
+    """
+    own_number = (own_number or '').upper()
+    return _unique(
+        f"Bill {chamber}-{number}" for chamber, number in BILL_REFERENCE.findall(text)
+        if f"{chamber}-{number}" != own_number
+    )
+
+
+def acts_in_title(title):
+    """
+    Lists the Acts an amending bill's title names.
+
+    Args:
+        title (str): The bill's long title, e.g. 'An Act to amend the Criminal Code and the Firearms Act'.
+
+    Returns:
+        list: The Act names, in title order; empty for titles that do not amend named Acts.
+    """
+    match = AMENDING_TITLE.search(title or '')
+    if not match:
+        return []
+    names = []
+    for piece in TITLE_ACT_SEPARATOR.split(match.group('acts')):
+        name = TITLE_ACT_NAME.match(piece.strip())
+        if name:
+            names.append(name.group(0))
+    return names
+
+
+def _act_headings(text):
+    """
+    Finds the Act headings of a bill's amending provisions: an Act name on the line above a citation line.
+
+    Returns:
+        tuple: (offsets, names) of the headings, in document order.
+    """
+    offsets, names = [], []
+    for citation in CITATION_LINE.finditer(text):
+        previous_lines = text[:citation.start()].rstrip().rsplit('\n', 1)
+        heading = previous_lines[-1].strip()
+        if re.fullmatch(ACT_NAME, heading):
+            offsets.append(citation.start())
+            names.append(heading)
+    return offsets, names
+
+
+def find_amending_provisions(text):
+    """
+    Lists the provisions of other Acts a bill amends, replaces or repeals.
+
+    "The Act" is resolved to the Act named in the heading above the provision.
+
+    Args:
+        text (str): The bill text.
+
+    Returns:
+        list: (bill section or None, Act name or None, description) tuples in document order, e.g.
+        ('3', 'Criminal Code', 'replaces subsection 5(2) of the Criminal Code').
+    """
+    sections = [segment for segment in parse_bill_text(text)['segments'] if segment['type'] == 'section']
+    section_starts = [segment['start'] for segment in sections]
+    heading_offsets, heading_names = _act_headings(text)
+
+    def locate(offset, act):
+        position = bisect.bisect_right(section_starts, offset) - 1
+        section = sections[position]['label'] if position >= 0 else None
+        if act == 'Act':
+            heading = bisect.bisect_right(heading_offsets, offset) - 1
+            act = heading_names[heading] if heading >= 0 else None
+        return section, act and _strip_article(act)
+
+    provisions = []
+    for match in AMENDING_PROVISION.finditer(text):
+        section, act = locate(match.start(), match.group('act'))
+        provision = match.group('provision')
+        description = f"{AMENDING_VERBS[match.group('action')]} {provision[0].lower()}{provision[1:]}"
+        if act:
+            description += f" of the {act}"
+        provisions.append((match.start(), section, act, description))
+    for match in AMENDED_BY.finditer(text):
+        section, act = locate(match.start(), match.group('act'))
+        description = f"amends the {act or 'Act'} by {match.group('how').strip()}"
+        provisions.append((match.start(), section, act, description))
+    return [provision[1:] for provision in sorted(provisions)]
+
+
+def extract_bill_references(text, title='', own_number=None):
+    """
+    Extracts, without a model, what a bill's text states explicitly: the bills it refers to, the Acts it
+    amends, its amending provisions and the legislative bodies it names.
+
+    Args:
+        text (str): The bill text.
+        title (str): The bill's long title.
+        own_number (str): The bill's own number, left out of the references.
+
+    Returns:
+        dict: 'related_bills', 'amended_acts', 'amendments' and 'entities', each a list of strings
+        shaped like the corresponding analysis fields.
+    """
+    provisions = find_amending_provisions(text)
+    heading_names = _act_headings(text)[1]
+    amended_acts = _unique(
+        acts_in_title(title) + heading_names + [act for _, act, _ in provisions if act]
+    )
+    amendments = [
+        f"Section {section}: {description}" if section else description[0].upper() + description[1:]
+        for section, _, description in provisions
+    ]
+    entities = _unique(amended_acts + LEGISLATIVE_BODY.findall(text))
+    return {
+        'related_bills': find_bill_references(text, own_number) + amended_acts,
+        'amended_acts': amended_acts,
+        'amendments': _unique(amendments),
+        'entities': entities
+    }
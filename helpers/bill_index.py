@@ -0,0 +1,188 @@
+# helpers/bill_index.py
+
+import hashlib
+import json
+import os
+
+# Listing fields whose values make up a bill's state
+FIELDS_TO_COMPARE = [
+    'bill_number',
+    'title',
+    'current_status',
+    'last_major_stage_completed',
+    'parliament_session',
+    'senate_first_reading',
+    'senate_second_reading',
+    'senate_third_reading',
+    'house_first_reading',
+    'house_second_reading',
+    'house_third_reading',
+    'royal_assent'
+]
+
+
+def bill_fingerprint(bill, fields=FIELDS_TO_COMPARE):
+    """
+    Computes a stable fingerprint of a bill's tracked fields.
+
+    Args:
+        bill (dict): Bill information.
+        fields (list): Fields included in the fingerprint.
+
+    Returns:
+        str: Hex SHA-256 of the field values, in field order.
+    """
+    values = json.dumps([bill.get(field) for field in fields], ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(values.encode('utf-8')).hexdigest()
+
+
+def index_paths(bills_file_path):
+    """
+    Returns the index and changelog paths kept next to a bills file.
+
+    Args:
+        bills_file_path (str): Path of the bills JSON file, e.g. storage/CanadaBills.json.
+
+    Returns:
+        tuple: (index path, changelog path), e.g. CanadaBillsIndex.json and CanadaBillsChangelog.jsonl.
+    """
+    base = os.path.splitext(bills_file_path)[0]
+    return base + 'Index.json', base + 'Changelog.jsonl'
+
+
+def build_index(bills, indexed_at=None):
+    """
+    Builds a fingerprint index from stored bills.
+
+    Args:
+        bills (iterable): Bill information dictionaries.
+        indexed_at (str): Timestamp recorded as each bill's last change when the bill carries none.
+
+    Returns:
+        dict: Index entries keyed by 'href'.
+    """
+    return {
+        bill['href']: {
+            'fingerprint': bill_fingerprint(bill),
+            'bill_number': bill.get('bill_number'),
+            'last_changed_at': bill.get('last_updated_at') or indexed_at
+        }
+        for bill in bills
+    }
+
+
+def load_index(index_path):
+    """
+    Loads a fingerprint index.
+
+    Args:
+        index_path (str): Path of the index file.
+
+    Returns:
+        dict: Index entries keyed by 'href', or None when the file is missing or unreadable.
+    """
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path, 'r') as file:
+        try:
+            return json.load(file)
+        except json.JSONDecodeError:
+            print(f"Index {index_path} is corrupted. Rebuilding it.")
+            return None
+
+
+def save_index(index_path, index):
+    """
+    Writes a fingerprint index atomically, so a crash never leaves a half-written file.
+
+    Args:
+        index_path (str): Path of the index file.
+        index (dict): Index entries keyed by 'href'.
+    """
+    temp_path = index_path + '.tmp'
+    with open(temp_path, 'w') as file:
+        json.dump(index, file, separators=(',', ':'))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, index_path)
+
+
+def field_transitions(old_bill, new_bill, changed_at, fields=FIELDS_TO_COMPARE):
+    """
+    Lists the field-level changes between two versions of a bill.
+
+    Args:
+        old_bill (dict): Stored bill information, or None for a new bill.
+        new_bill (dict): Freshly scraped bill information.
+        changed_at (str): Timestamp of the change.
+        fields (list): Fields to compare.
+
+    Returns:
+        list: One changelog entry per changed field.
+    """
+    old_bill = old_bill or {}
+    return [
+        {
+            'changed_at': changed_at,
+            'href': new_bill['href'],
+            'bill_number': new_bill.get('bill_number'),
+            'field': field,
+            'old': old_bill.get(field),
+            'new': new_bill.get(field)
+        }
+        for field in fields
+        if old_bill.get(field) != new_bill.get(field)
+    ]
+
+
+def append_changelog(changelog_path, entries):
+    """
+    Appends changelog entries as JSON lines and syncs them to disk.
+
+    Args:
+        changelog_path (str): Path of the changelog file.
+        entries (list): Changelog entries.
+    """
+    if not entries:
+        return
+    with open(changelog_path, 'a') as file:
+        for entry in entries:
+            file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def iter_changelog(changelog_path, since=None):
+    """
+    Streams changelog entries, optionally only those recorded at or after a timestamp.
+
+    Args:
+        changelog_path (str): Path of the changelog file.
+        since (str): ISO timestamp; older entries are skipped.
+
+    Yields:
+        dict: Changelog entries in the order they were recorded.
+    """
+    if not os.path.exists(changelog_path):
+        return
+    with open(changelog_path, 'r') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if since is None or entry['changed_at'] >= since:
+                yield entry
+
+
+def changed_since(index, since):
+    """
+    Looks up the bills whose tracked fields changed at or after a timestamp.
+
+    Args:
+        index (dict): Index entries keyed by 'href'.
+        since (str): ISO timestamp.
+
+    Returns:
+        list: The 'href' of every bill changed since the timestamp.
+    """
+    return [href for href, entry in index.items() if (entry.get('last_changed_at') or '') >= since]
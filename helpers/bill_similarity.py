@@ -0,0 +1,147 @@
+# helpers/bill_similarity.py
+
+import hashlib
+import random
+import re
+import numpy as np
+
+# MinHash signature length, and the LSH bands it is cut into (SIGNATURE_SIZE / LSH_BANDS rows each).
+# With 16 bands of 8 rows, pairs above ~0.7 similarity almost always share a band.
+SIGNATURE_SIZE = 128
+LSH_BANDS = 16
+# Words per shingle
+SHINGLE_WORDS = 5
+
+_MERSENNE_PRIME = (1 << 61) - 1
+# Fixed seed: signatures are stored and must stay comparable between runs
+_random = random.Random(1867)
+_PERMUTATIONS = [
+    (_random.randrange(1, _MERSENNE_PRIME), _random.randrange(0, _MERSENNE_PRIME))
+    for _ in range(SIGNATURE_SIZE)
+]
+# The permutations as uint64 rows, applied to SHINGLE_BLOCK shingles at a time to bound memory
+_PRIME = np.uint64(_MERSENNE_PRIME)
+_A = np.array([a for a, _ in _PERMUTATIONS], dtype=np.uint64)
+_B = np.array([b for _, b in _PERMUTATIONS], dtype=np.uint64)
+_LOW_32 = np.uint64((1 << 32) - 1)
+_LOW_29 = np.uint64((1 << 29) - 1)
+SHINGLE_BLOCK = 4096
+
+
+def shingle_hashes(text, size=SHINGLE_WORDS):
+    """
+    Hashes the overlapping word n-grams of a text, ignoring case and punctuation.
+
+    Args:
+        text (str): The text.
+        size (int): Words per shingle.
+
+    Returns:
+        set: 64-bit hashes of the shingles.
+    """
+    words = re.findall(r'\w+', text.lower())
+    if len(words) < size:
+        words = words + [''] * (size - len(words))
+    return {
+        int.from_bytes(hashlib.blake2b(' '.join(words[i:i + size]).encode('utf-8'), digest_size=8).digest(), 'big')
+        for i in range(len(words) - size + 1)
+    }
+
+
+def _mod_prime(values):
+    """Reduces uint64 values below 2**63 modulo the Mersenne prime 2**61 - 1."""
+    values = (values & _PRIME) + (values >> np.uint64(61))
+    return np.where(values >= _PRIME, values - _PRIME, values)
+
+
+def _mul_mod_prime(x, a):
+    """
+    Multiplies values below 2**61 modulo 2**61 - 1 without overflowing uint64.
+
+    The factors are split into 32-bit halves; 2**64 folds to 8 and 2**61 to 1 modulo the prime.
+    """
+    x_high, x_low = x >> np.uint64(32), x & _LOW_32
+    a_high, a_low = a >> np.uint64(32), a & _LOW_32
+    high = (x_high * a_high) << np.uint64(3)
+    middle = x_high * a_low + x_low * a_high
+    middle = (middle >> np.uint64(29)) + ((middle & _LOW_29) << np.uint64(32))
+    low = x_low * a_low
+    low = (low & _PRIME) + (low >> np.uint64(61))
+    return _mod_prime(high + middle + low)
+
+
+def minhash_signature(text):
+    """
+    Computes the MinHash signature of a text's shingles.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        list: SIGNATURE_SIZE integers; two signatures agree at a position with probability equal to the
+        Jaccard similarity of the texts' shingle sets.
+    """
+    hashes = shingle_hashes(text)
+    values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes)) % _PRIME
+    signature = np.full(SIGNATURE_SIZE, _PRIME, dtype=np.uint64)
+    for start in range(0, len(values), SHINGLE_BLOCK):
+        block = values[start:start + SHINGLE_BLOCK, None]
+        permuted = _mod_prime(_mul_mod_prime(block, _A) + _B)
+        signature = np.minimum(signature, permuted.min(axis=0))
+    return signature.tolist()
+
+
+def signature_similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / len(signature_a)
+
+
+class SimilarityIndex:
+    """
+    Locality-sensitive hashing index of MinHash signatures.
+
+    Each signature is cut into bands; texts sharing any band are candidates, and candidates are
+    ranked by their estimated similarity.
+    """
+
+    def __init__(self, bands=LSH_BANDS):
+        self.bands = bands
+        self.rows = SIGNATURE_SIZE // bands
+        self.buckets = [{} for _ in range(bands)]
+        self.signatures = {}
+
+    def _band_keys(self, signature):
+        return [tuple(signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def add(self, key, signature):
+        """
+        Adds a signature to the index.
+
+        Args:
+            key: Identifier of the text, e.g. a bill's href.
+            signature (list): Its minhash_signature().
+        """
+        self.signatures[key] = signature
+        for buckets, band_key in zip(self.buckets, self._band_keys(signature)):
+            buckets.setdefault(band_key, set()).add(key)
+
+    def query(self, signature, threshold):
+        """
+        Finds the indexed texts at least threshold similar to a signature.
+
+        Args:
+            signature (list): The minhash_signature() to look up.
+            threshold (float): Smallest estimated Jaccard similarity returned.
+
+        Returns:
+            list: (similarity, key) pairs, most similar first.
+        """
+        candidates = set()
+        for buckets, band_key in zip(self.buckets, self._band_keys(signature)):
+            candidates.update(buckets.get(band_key, ()))
+        matches = []
+        for key in candidates:
+            similarity = signature_similarity(signature, self.signatures[key])
+            if similarity >= threshold:
+                matches.append((similarity, key))
+        return sorted(matches, key=lambda match: (-match[0], str(match[1])))
@@ -0,0 +1,245 @@
+# helpers/bill_structure.py
+
+import json
+import re
+from helpers.blob_store import bill_content_hash, get_blob_store, load_bill_content
+
+# Line that opens the bill itself; everything above it is page navigation
+BILL_HEADING = re.compile(r'^BILL [CS]-\d+\S*$', re.MULTILINE)
+
+# Lines that close the bill text and open the page footer
+FOOTER_MARKERS = re.compile(
+    r'^(Published under the authority of the Speaker|Date modified:|Top of page|Report a problem)',
+    re.MULTILINE
+)
+
+SUMMARY_HEADING = re.compile(r'^SUMMARY$', re.MULTILINE)
+
+# Lines that end the summary block
+SUMMARY_END = re.compile(
+    r'^(Available on the (House of Commons|Senate of Canada) website|TABLE OF PROVISIONS|Preamble|Whereas\b'
+    r'|.*enacts as follows:$)',
+    re.MULTILINE
+)
+
+# Enacting formula after which the numbered provisions start
+ENACTING_FORMULA = re.compile(r'enacts as follows:$', re.MULTILINE)
+
+PART_HEADING = re.compile(r'^PART (\d+(?:\.\d+)?|[IVXLC]+)$')
+DIVISION_HEADING = re.compile(r'^DIVISION (\d+(?:\.\d+)?)$')
+SECTION_START = re.compile(r'^(\d+)\s+(?=\S)')
+SUBSECTION_START = re.compile(r'^(?:\d+\s+)?\((\d+)\)\s')
+
+
+def _iter_lines(text, start, end):
+    """Yields (offset, line) for each line of text between start and end."""
+    position = start
+    while position < end:
+        line_end = text.find('\n', position, end)
+        if line_end == -1:
+            line_end = end
+        yield position, text[position:line_end]
+        position = line_end + 1
+
+
+def _next_heading_title(text, offset, end):
+    """Returns the first non-empty line after the heading line at offset."""
+    lines = _iter_lines(text, offset, end)
+    next(lines, None)
+    for _, line in lines:
+        if line.strip():
+            return line.strip()
+    return ''
+
+
+def parse_bill_text(text):
+    """
+    Segments a bill's publication text into its summary, parts, divisions, sections and subsections.
+
+    Sections and subsections are only recognised when they continue the running numbering
+    (1, 2, 3...; (1), (2)...), so provisions quoted from amended Acts are not mistaken for them.
+
+    Args:
+        text (str): The publication text, as stored in bill_content.
+
+    Returns:
+        dict: 'body' ({'start', 'end'} of the bill without page chrome) and 'segments', a list of
+        {'type', 'label', 'title', 'start', 'end', 'part', 'division', 'section'} in document order.
+        Offsets index into text.
+    """
+    heading = BILL_HEADING.search(text)
+    body_start = heading.start() if heading else 0
+    footer = FOOTER_MARKERS.search(text, body_start)
+    body_end = footer.start() if footer else len(text)
+    while body_end > body_start and text[body_end - 1].isspace():
+        body_end -= 1
+
+    segments = []
+
+    summary = SUMMARY_HEADING.search(text, body_start, body_end)
+    provisions_start = body_start
+    if summary:
+        summary_end = SUMMARY_END.search(text, summary.end(), body_end)
+        segments.append({
+            'type': 'summary', 'label': 'SUMMARY', 'title': 'SUMMARY',
+            'start': summary.start(), 'end': summary_end.start() if summary_end else body_end,
+            'part': None, 'division': None, 'section': None
+        })
+        provisions_start = segments[-1]['end']
+    enacting = ENACTING_FORMULA.search(text, provisions_start, body_end)
+    if enacting:
+        provisions_start = enacting.end()
+
+    part = division = section = None
+    last_section_number = 0
+    last_subsection_number = 0
+    for offset, line in _iter_lines(text, provisions_start, body_end):
+        stripped = line.strip()
+        part_match = PART_HEADING.match(stripped)
+        division_match = DIVISION_HEADING.match(stripped)
+        section_match = SECTION_START.match(stripped)
+        subsection_match = SUBSECTION_START.match(stripped)
+
+        if part_match:
+            part = 'PART ' + part_match.group(1)
+            division = None
+            segments.append({'type': 'part', 'label': part, 'title': _next_heading_title(text, offset, body_end),
+                             'start': offset, 'part': part, 'division': None, 'section': None})
+        elif division_match:
+            division = 'DIVISION ' + division_match.group(1)
+            segments.append({'type': 'division', 'label': division, 'title': _next_heading_title(text, offset, body_end),
+                             'start': offset, 'part': part, 'division': division, 'section': None})
+        elif section_match and int(section_match.group(1)) == last_section_number + 1:
+            last_section_number += 1
+            last_subsection_number = 0
+            section = section_match.group(1)
+            segments.append({'type': 'section', 'label': section, 'title': '',
+                             'start': offset, 'part': part, 'division': division, 'section': section})
+            if subsection_match and subsection_match.group(1) == '1':
+                last_subsection_number = 1
+                segments.append({'type': 'subsection', 'label': f'{section}(1)', 'title': '',
+                                 'start': offset, 'part': part, 'division': division, 'section': section})
+        elif subsection_match and section and int(subsection_match.group(1)) == last_subsection_number + 1:
+            last_subsection_number += 1
+            segments.append({'type': 'subsection', 'label': f'{section}({last_subsection_number})', 'title': '',
+                             'start': offset, 'part': part, 'division': division, 'section': section})
+
+    # Each segment ends where the next segment of the same or an enclosing level starts
+    enclosing = {
+        'part': ('part',),
+        'division': ('part', 'division'),
+        'section': ('part', 'division', 'section'),
+        'subsection': ('part', 'division', 'section', 'subsection')
+    }
+    for position, segment in enumerate(segments):
+        if segment['type'] != 'summary':
+            segment['end'] = body_end
+            for following in segments[position + 1:]:
+                if following['type'] in enclosing[segment['type']]:
+                    segment['end'] = following['start']
+                    break
+        while segment['end'] > segment['start'] and text[segment['end'] - 1].isspace():
+            segment['end'] -= 1
+
+    return {'body': {'start': body_start, 'end': body_end}, 'segments': segments}
+
+
+def index_bill_structure(bill, store=None):
+    """
+    Parses a bill's text and stores its segment index in the blob store.
+
+    The index holds only offsets into the bill text, which is stored once under 'bill_content_hash';
+    segments are sliced out of that text when read. The bill keeps only 'bill_structure_hash'.
+
+    Args:
+        bill (dict): The bill; modified in place.
+        store (BlobStore): Store to use; defaults to the shared store.
+
+    Returns:
+        dict: The bill.
+    """
+    store = store or get_blob_store()
+    text = load_bill_content(bill, store)
+    structure = parse_bill_text(text)
+    if not structure['segments']:
+        bill.pop('bill_structure_hash', None)
+        return bill
+    # Ties the offsets to the text they index, so they are never applied to another version of it
+    structure['content_hash'] = bill_content_hash(bill)
+    bill['bill_structure_hash'] = store.put(json.dumps(structure, separators=(',', ':')))
+    return bill
+
+
+def load_bill_structure(bill, store=None):
+    """
+    Returns a bill's segment index without reading its text.
+
+    Args:
+        bill (dict): The bill.
+        store (BlobStore): Store to use; defaults to the shared store.
+
+    Returns:
+        dict: The structure produced by parse_bill_text, or None when the bill has none for its current text.
+    """
+    if not bill.get('bill_structure_hash'):
+        return None
+    structure = json.loads((store or get_blob_store()).get(bill['bill_structure_hash']))
+    if structure.get('content_hash', bill_content_hash(bill)) != bill_content_hash(bill):
+        return None
+    return structure
+
+
+def load_bill_segment(bill, label, segment_type='section', store=None):
+    """
+    Reads a single segment of a bill, e.g. section '12', subsection '12(3)', 'PART 2' or 'SUMMARY'.
+
+    Args:
+        bill (dict): The bill.
+        label (str): The segment label.
+        segment_type (str): 'summary', 'part', 'division', 'section' or 'subsection'.
+        store (BlobStore): Store to use; defaults to the shared store.
+
+    Returns:
+        str: The segment text, or None if the bill has no such segment.
+    """
+    store = store or get_blob_store()
+    structure = load_bill_structure(bill, store)
+    if structure is None:
+        return None
+    for segment in structure['segments']:
+        if segment['type'] == segment_type and segment['label'] == label:
+            return load_bill_content(bill, store)[segment['start']:segment['end']]
+    return None
+
+
+def load_bill_summary(bill, store=None):
+    """
+    Reads the SUMMARY block of a bill.
+
+    Args:
+        bill (dict): The bill.
+        store (BlobStore): Store to use; defaults to the shared store.
+
+    Returns:
+        str: The summary text, or None if the bill has none.
+    """
+    return load_bill_segment(bill, 'SUMMARY', 'summary', store)
+
+
+def load_bill_body(bill, store=None):
+    """
+    Reads a bill's text without the page navigation and footer around it.
+
+    Args:
+        bill (dict): The bill.
+        store (BlobStore): Store to use; defaults to the shared store.
+
+    Returns:
+        str: The bill body, or the full text when the bill has not been indexed.
+    """
+    store = store or get_blob_store()
+    structure = load_bill_structure(bill, store)
+    text = load_bill_content(bill, store)
+    if structure is None:
+        return text
+    return text[structure['body']['start']:structure['body']['end']]
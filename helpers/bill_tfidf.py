@@ -0,0 +1,249 @@
+# helpers/bill_tfidf.py
+
+import os
+import re
+import zlib
+from collections import Counter
+import numpy as np
+
+# Word unigrams and bigrams are hashed into 2**FEATURE_BITS columns, so the index keeps no vocabulary
+# and a bill can be added or replaced without touching the others
+FEATURE_BITS = 20
+# A bill's title counts this many times as much as the same words in its text
+TITLE_WEIGHT = 3
+# Largest number of query-term x posting products scored at once
+SCORE_BATCH_SIZE = 1 << 23
+
+# Function words, and words nearly every bill uses, which say nothing about a bill's subject
+STOP_WORDS = frozenset('''
+a about after all also an and any are as at be been before being by can for from has have he her his if in into
+is it its may more must no not of on or other such than that the their them then there these they this those to
+under was were which who will with within without would act acts bill section sections subsection subsections
+paragraph paragraphs following amended amend amending replaced repealed enactment enacts coming force day
+'''.split())
+
+WORD = re.compile(r"[a-z][a-z'’-]+")
+
+
+def term_counts(text):
+    """
+    Counts the unigram and bigram terms of a text, ignoring case, numbers and STOP_WORDS.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        Counter: Term counts; bigrams join their two words with a space.
+    """
+    words = [word for word in WORD.findall(text.lower()) if word not in STOP_WORDS]
+    counts = Counter(words)
+    counts.update(f"{first} {second}" for first, second in zip(words, words[1:]))
+    return counts
+
+
+def vectorize(title, text):
+    """
+    Computes the hashed term counts of a bill.
+
+    Args:
+        title (str): The bill's title.
+        text (str): The bill's text.
+
+    Returns:
+        tuple: (columns, counts) as sorted int32 and float32 arrays.
+    """
+    counts = term_counts(text)
+    for term, count in term_counts(title).items():
+        counts[term] += TITLE_WEIGHT * count
+    if not counts:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+    mask = (1 << FEATURE_BITS) - 1
+    columns = np.fromiter((zlib.crc32(term.encode('utf-8')) & mask for term in counts), dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    # Terms hashed to the same column add up
+    columns, inverse = np.unique(columns, return_inverse=True)
+    return columns.astype(np.int32), np.bincount(inverse, weights=values).astype(np.float32)
+
+
+class TfidfIndex:
+    """
+    TF-IDF index of bill texts and titles for finding the bills most similar to each other.
+
+    Rows keep raw hashed term counts; weights (sublinear term frequency times inverse document frequency,
+    L2-normalised) are computed over the whole corpus when the index is queried, so adding bills also
+    updates the weights of the bills already indexed.
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self._matrix = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def update(self, documents, prune=True):
+        """
+        Adds documents that are new or whose version changed.
+
+        Args:
+            documents (iterable): (key, version, load) tuples, where load() returns the (title, text) to index;
+                it is only called for documents that need indexing.
+            prune (bool): Drop indexed documents missing from documents.
+
+        Returns:
+            int: Number of documents (re)vectorized.
+        """
+        seen = set()
+        vectorized = 0
+        for key, version, load in documents:
+            seen.add(key)
+            if key in self.rows and self.rows[key][0] == version:
+                continue
+            self.rows[key] = (version, *vectorize(*load()))
+            vectorized += 1
+        removed = [key for key in self.rows if key not in seen] if prune else []
+        for key in removed:
+            del self.rows[key]
+        if vectorized or removed:
+            self._matrix = None
+        return vectorized
+
+    def matrix(self):
+        """
+        Builds the weighted matrix of the indexed documents, in both row- and column-compressed form.
+
+        Returns:
+            dict: 'keys', and 'indptr', 'columns', 'weights' (rows) and 'col_indptr', 'col_rows', 'col_weights' (columns).
+        """
+        if self._matrix is not None:
+            return self._matrix
+        keys = list(self.rows)
+        lengths = np.array([len(self.rows[key][1]) for key in keys], dtype=np.int64)
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        columns = np.concatenate([self.rows[key][1] for key in keys] or [np.zeros(0, dtype=np.int32)])
+        counts = np.concatenate([self.rows[key][2] for key in keys] or [np.zeros(0, dtype=np.float32)])
+        row_of = np.repeat(np.arange(len(keys)), lengths)
+
+        document_frequency = np.bincount(columns, minlength=1 << FEATURE_BITS)
+        idf = np.log((1 + len(keys)) / (1 + document_frequency)) + 1
+        weights = ((1 + np.log(counts)) * idf[columns]).astype(np.float32)
+        norms = np.sqrt(np.bincount(row_of, weights=weights * weights, minlength=len(keys)))
+        weights /= np.maximum(norms, 1e-12)[row_of].astype(np.float32)
+
+        order = np.argsort(columns, kind='stable')
+        col_indptr = np.searchsorted(columns[order], np.arange((1 << FEATURE_BITS) + 1))
+        self._matrix = {
+            'keys': keys, 'indptr': indptr, 'columns': columns, 'weights': weights,
+            'col_indptr': col_indptr, 'col_rows': row_of[order], 'col_weights': weights[order]
+        }
+        return self._matrix
+
+    def most_similar(self, keys=None, top_k=5, min_similarity=0.0):
+        """
+        Finds each document's most similar other documents by cosine similarity.
+
+        Queries are scored in batches as sparse products: every query term is multiplied with the postings
+        of its column, and the products are summed per (query, document) pair.
+
+        Args:
+            keys (list): Documents to find neighbours for; defaults to all of them.
+            top_k (int): Neighbours per document.
+            min_similarity (float): Smallest similarity returned.
+
+        Returns:
+            dict: For each key, a list of (similarity, key) pairs, most similar first.
+        """
+        matrix = self.matrix()
+        all_keys = matrix['keys']
+        position = {key: row for row, key in enumerate(all_keys)}
+        rows = [position[key] for key in (all_keys if keys is None else keys)]
+        document_count = len(all_keys)
+        indptr, columns, weights = matrix['indptr'], matrix['columns'], matrix['weights']
+        col_indptr, col_rows, col_weights = matrix['col_indptr'], matrix['col_rows'], matrix['col_weights']
+        postings = col_indptr[columns + 1] - col_indptr[columns]
+        posting_totals = np.concatenate(([0], np.cumsum(postings)))
+
+        results = {}
+        start = 0
+        while start < len(rows):
+            # Take queries while their products fit in SCORE_BATCH_SIZE (always at least one)
+            end = start + 1
+            size = posting_totals[indptr[rows[start] + 1]] - posting_totals[indptr[rows[start]]]
+            while end < len(rows):
+                row_size = posting_totals[indptr[rows[end] + 1]] - posting_totals[indptr[rows[end]]]
+                if size + row_size > SCORE_BATCH_SIZE:
+                    break
+                size += row_size
+                end += 1
+            batch = rows[start:end]
+
+            entries = np.concatenate([np.arange(indptr[row], indptr[row + 1]) for row in batch])
+            query_of = np.repeat(np.arange(len(batch)), [indptr[row + 1] - indptr[row] for row in batch])
+            counts = postings[entries]
+            # Positions of every posting of every query term, without a Python loop over terms
+            firsts = col_indptr[columns[entries]]
+            offsets = np.repeat(firsts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+            posting_positions = offsets + np.arange(offsets.size)
+            products = np.repeat(weights[entries], counts) * col_weights[posting_positions]
+            pairs = np.repeat(query_of, counts) * document_count + col_rows[posting_positions]
+            scores = np.bincount(pairs, weights=products, minlength=len(batch) * document_count)
+            scores = scores.reshape(len(batch), document_count)
+            scores[np.arange(len(batch)), batch] = -1
+
+            k = min(top_k, document_count - 1)
+            for query, row in enumerate(batch):
+                if k <= 0:
+                    results[all_keys[row]] = []
+                    continue
+                best = np.argpartition(-scores[query], k - 1)[:k]
+                best = best[np.argsort(-scores[query][best], kind='stable')]
+                results[all_keys[row]] = [
+                    (round(float(scores[query][other]), 4), all_keys[other])
+                    for other in best if scores[query][other] >= min_similarity and scores[query][other] > 0
+                ]
+            start = end
+        return results
+
+    def save(self, path):
+        """
+        Writes the index's rows to a NumPy archive, atomically.
+
+        Args:
+            path (str): Path of the .npz file.
+        """
+        keys = list(self.rows)
+        temp_path = path + '.tmp.npz'
+        np.savez_compressed(
+            temp_path,
+            keys=np.array(keys, dtype=str),
+            versions=np.array([self.rows[key][0] for key in keys], dtype=str),
+            lengths=np.array([len(self.rows[key][1]) for key in keys], dtype=np.int64),
+            columns=np.concatenate([self.rows[key][1] for key in keys] or [np.zeros(0, dtype=np.int32)]),
+            counts=np.concatenate([self.rows[key][2] for key in keys] or [np.zeros(0, dtype=np.float32)])
+        )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads an index written by save(); an empty index when the file is missing or unreadable.
+
+        Args:
+            path (str): Path of the .npz file.
+
+        Returns:
+            TfidfIndex: The index.
+        """
+        index = cls()
+        if not os.path.exists(path):
+            return index
+        try:
+            with np.load(path) as archive:
+                bounds = np.concatenate(([0], np.cumsum(archive['lengths'])))
+                columns, counts = archive['columns'], archive['counts']
+                for row, (key, version) in enumerate(zip(archive['keys'].tolist(), archive['versions'].tolist())):
+                    index.rows[key] = (version, columns[bounds[row]:bounds[row + 1]], counts[bounds[row]:bounds[row + 1]])
+        except (OSError, ValueError, KeyError) as e:
+            print(f"TF-IDF index {path} is unreadable ({e}). Rebuilding it.")
+            index.rows = {}
+        return index
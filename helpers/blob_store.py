@@ -0,0 +1,219 @@
+# helpers/blob_store.py
+
+import hashlib
+import json
+import mmap
+import os
+import zlib
+from threading import Lock
+from config import STORAGE_DIR
+
+# Directory holding the bill text pack and its index
+BLOB_STORE_DIR = os.path.join(STORAGE_DIR, 'bill_content')
+
+# zlib level used for new blobs
+COMPRESSION_LEVEL = 6
+
+
+class BlobStore:
+    """
+    Content-addressed store of compressed texts.
+
+    Texts are keyed by the SHA-256 of their UTF-8 bytes, so identical texts are stored once.
+    Compressed blobs are appended to a single pack file and read back through a memory map;
+    their offsets live in an append-only JSON Lines index. Safe to share between threads.
+    """
+
+    def __init__(self, directory=BLOB_STORE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.pack_path = os.path.join(directory, 'blobs.pack')
+        self.index_path = os.path.join(directory, 'blobs.index.jsonl')
+        self.lock = Lock()
+        self.index = {}
+        # Bytes of the index file already read into self.index
+        self.index_position = 0
+        self._load_index_tail()
+        self.pack_map = None
+
+    def _load_index_tail(self):
+        """
+        Reads the index lines appended since the last read, including those written by other processes.
+
+        A last line without its newline is still being written and is left for the next read.
+
+        Returns:
+            int: Number of entries read.
+        """
+        if not os.path.exists(self.index_path):
+            return 0
+        loaded = 0
+        with open(self.index_path, 'rb') as index_file:
+            index_file.seek(self.index_position)
+            for line in index_file:
+                if not line.endswith(b'\n'):
+                    break
+                self.index_position += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Skipping unreadable line of {self.index_path}")
+                    continue
+                self.index[entry['hash']] = entry
+                loaded += 1
+        return loaded
+
+    def __contains__(self, digest):
+        return digest in self.index
+
+    def put(self, text):
+        """
+        Stores a text unless an identical one is already stored.
+
+        Args:
+            text (str): The text to store.
+
+        Returns:
+            str: The text's hash.
+        """
+        data = text.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        with self.lock:
+            if digest in self.index:
+                return digest
+            compressed = zlib.compress(data, COMPRESSION_LEVEL)
+            with open(self.pack_path, 'ab') as pack:
+                offset = pack.seek(0, os.SEEK_END)
+                pack.write(compressed)
+                pack.flush()
+                os.fsync(pack.fileno())
+            # The index line is only written once the blob is safely on disk
+            entry = {'hash': digest, 'offset': offset, 'size': len(compressed), 'length': len(text)}
+            with open(self.index_path, 'a') as index_file:
+                index_file.write(json.dumps(entry) + '\n')
+                index_file.flush()
+                os.fsync(index_file.fileno())
+            self.index[digest] = entry
+        return digest
+
+    def get(self, digest):
+        """
+        Reads a stored text.
+
+        Args:
+            digest (str): The text's hash.
+
+        Returns:
+            str: The text.
+
+        Raises:
+            KeyError: The text is not stored, even after rereading the index for entries other processes added.
+        """
+        entry = self.index.get(digest)
+        if entry is None:
+            with self.lock:
+                self._load_index_tail()
+            entry = self.index.get(digest)
+            if entry is None:
+                raise KeyError(digest)
+        end = entry['offset'] + entry['size']
+        with self.lock:
+            # Remap when the pack has grown past the current mapping
+            if self.pack_map is None or len(self.pack_map) < end:
+                if self.pack_map is not None:
+                    self.pack_map.close()
+                with open(self.pack_path, 'rb') as pack:
+                    self.pack_map = mmap.mmap(pack.fileno(), 0, access=mmap.ACCESS_READ)
+            compressed = self.pack_map[entry['offset']:end]
+        return zlib.decompress(compressed).decode('utf-8')
+
+    def close(self):
+        with self.lock:
+            if self.pack_map is not None:
+                self.pack_map.close()
+                self.pack_map = None
+
+
+_default_store = None
+_default_store_lock = Lock()
+
+
+def get_blob_store():
+    """
+    Returns the shared store under storage/bill_content, opening it on first use.
+
+    Returns:
+        BlobStore: The shared store.
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = BlobStore()
+        return _default_store
+
+
+def store_bill_content(bill, store=None):
+    """
+    Moves a bill's inline 'bill_content' into the store, keeping only its hash and length.
+
+    Args:
+        bill (dict): The bill; modified in place.
+        store (BlobStore): Store to use; defaults to the shared store.
+
+    Returns:
+        dict: The bill.
+    """
+    if 'bill_content' in bill:
+        bill_content = bill.pop('bill_content')
+        bill['bill_content_hash'] = (store or get_blob_store()).put(bill_content)
+        bill['bill_content_length'] = len(bill_content)
+    return bill
+
+
+def load_bill_content(bill, store=None):
+    """
+    Returns a bill's text, from the record itself or lazily from the store.
+
+    Args:
+        bill (dict): The bill.
+        store (BlobStore): Store to use; defaults to the shared store.
+
+    Returns:
+        str: The bill text, or '' when the bill has none.
+    """
+    if 'bill_content' in bill:
+        return bill['bill_content']
+    if bill.get('bill_content_hash'):
+        return (store or get_blob_store()).get(bill['bill_content_hash'])
+    return ''
+
+
+def bill_content_length(bill):
+    """
+    Returns the length of a bill's text without loading it.
+
+    Args:
+        bill (dict): The bill.
+
+    Returns:
+        int: Number of characters in the bill text.
+    """
+    if 'bill_content' in bill:
+        return len(bill['bill_content'])
+    return bill.get('bill_content_length', 0)
+
+
+def bill_content_hash(bill):
+    """
+    Returns the hash of a bill's text without loading it from the store.
+
+    Args:
+        bill (dict): The bill.
+
+    Returns:
+        str: SHA-256 of the bill text, as the store keys it, or None when the bill has no text.
+    """
+    if 'bill_content' in bill:
+        return hashlib.sha256(bill['bill_content'].encode('utf-8')).hexdigest()
+    return bill.get('bill_content_hash')
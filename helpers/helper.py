@@ -8,6 +8,9 @@ from threading import Lock
 # Lock to prevent race conditions during file writes
 write_lock = Lock()
 
+# Size of each read when streaming a file
+CHUNK_SIZE = 64 * 1024
+
 # Helper to load data from a JSON file
 def load_json(filename):
     filepath = os.path.join(STORAGE_DIR, filename)
@@ -15,8 +18,109 @@ def load_json(filename):
         return json.load(file)
 
 # Helper to save data to a JSON file with thread-safe access
+# The data goes to a temporary file first, so a crash never leaves a half-written file behind
 def save_json(filename, data):
     filepath = os.path.join(STORAGE_DIR, filename)
+    temp_path = filepath + '.tmp'
     with write_lock:
-        with open(filepath, 'w') as file:
+        with open(temp_path, 'w') as file:
             json.dump(data, file, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, filepath)
+
+# Helper to read a text file in chunks
+def iter_text_chunks(filepath, chunk_size=CHUNK_SIZE):
+    with open(filepath, 'r', encoding='utf-8-sig') as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+# Helper to decode the items of a top-level JSON list one at a time, as its text arrives in chunks
+def iter_json_array(text_chunks):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    for chunk in text_chunks:
+        buffer += chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position >= len(buffer):
+                break
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError("JSON document is not a list")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                element, position_after = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The element is cut off at the end of this chunk; wait for the next one
+                break
+            yield element
+            position = position_after
+        buffer = buffer[position:]
+    if buffer.strip():
+        raise ValueError("JSON document ended in the middle of an item")
+
+# Helper to stream the items of a JSON list file without loading the whole file
+def iter_json_file(filename):
+    filepath = os.path.join(STORAGE_DIR, filename)
+    return iter_json_array(iter_text_chunks(filepath))
+
+# Helper to stream records from a JSON Lines file
+# A line cut off by a crash mid-append is skipped rather than failing the whole read
+def iter_jsonl(filename):
+    filepath = os.path.join(STORAGE_DIR, filename)
+    if not os.path.exists(filepath):
+        return
+    with open(filepath, 'r') as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Skipping unreadable line {line_number} of {filepath}")
+
+
+class JsonlAppender:
+    """
+    Appends records to a JSON Lines file, syncing them to disk every fsync_every records.
+
+    Use as a context manager; pending records are synced on exit.
+    """
+
+    def __init__(self, filename, fsync_every=10):
+        self.filepath = os.path.join(STORAGE_DIR, filename)
+        self.fsync_every = max(1, fsync_every)
+        self.pending = 0
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.filepath, 'a')
+        return self
+
+    def append(self, record):
+        with write_lock:
+            self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self.pending += 1
+            if self.pending >= self.fsync_every:
+                self.sync()
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.sync()
+        self.file.close()
+        self.file = None
@@ -0,0 +1,155 @@
+# helpers/legisinfo_export.py
+
+import codecs
+from datetime import datetime
+import requests
+from lxml import etree
+from helpers.helper import CHUNK_SIZE, iter_json_array, iter_text_chunks
+
+# LegisInfo bulk exports of the bill list
+EXPORT_JSON_URL = "https://www.parl.ca/legisinfo/en/bills/json"
+EXPORT_XML_URL = "https://www.parl.ca/legisinfo/en/bills/xml"
+
+# Same link the listing cards point to, so exported bills merge with scraped ones by 'href'
+BILL_URL_TEMPLATE = "https://www.parl.ca/LegisInfo/en/bill/{parliament}-{session}/{number}"
+
+# Export field names read for each bill
+EXPORT_FIELDS = {
+    'bill_number': 'BillNumberFormatted',
+    'title': 'LongTitleEn',
+    'current_status': 'CurrentStatusEn',
+    'last_major_stage_completed': 'LatestCompletedMajorStageEn',
+    'parliament': 'ParliamentNumber',
+    'session': 'SessionNumber'
+}
+
+# Reading stages are 'Completed' when the export carries a date for them, 'Not Completed' when the field
+# is empty, and 'Not Applicable' when the record has no such field
+EXPORT_STAGE_FIELDS = {
+    'senate_first_reading': 'PassedSenateFirstReadingDateTime',
+    'senate_second_reading': 'PassedSenateSecondReadingDateTime',
+    'senate_third_reading': 'PassedSenateThirdReadingDateTime',
+    'house_first_reading': 'PassedHouseFirstReadingDateTime',
+    'house_second_reading': 'PassedHouseSecondReadingDateTime',
+    'house_third_reading': 'PassedHouseThirdReadingDateTime',
+    'royal_assent': 'ReceivedRoyalAssentDateTime'
+}
+
+
+def ordinal(number):
+    """
+    Formats a number as an English ordinal (1st, 2nd, 44th...).
+
+    Args:
+        number (int): The number to format.
+
+    Returns:
+        str: The ordinal.
+    """
+    if 10 <= number % 100 <= 20:
+        suffix = 'th'
+    else:
+        suffix = {1: 'st', 2: 'nd', 3: 'rd'}.get(number % 10, 'th')
+    return f"{number}{suffix}"
+
+
+def export_record_to_bill(record, last_updated_at=None):
+    """
+    Maps one export record to the CanadaBills.json schema.
+
+    Args:
+        record (dict): A bill from the JSON or XML export.
+        last_updated_at (str): Timestamp to stamp on the bill; defaults to now.
+
+    Returns:
+        dict: The bill information, with the same keys the listing scraper produces.
+    """
+    parliament = int(record[EXPORT_FIELDS['parliament']])
+    session = int(record[EXPORT_FIELDS['session']])
+    bill_number = (record.get(EXPORT_FIELDS['bill_number']) or '').strip()
+
+    bill_info = {
+        'href': BILL_URL_TEMPLATE.format(parliament=parliament, session=session, number=bill_number.lower()),
+        'bill_number': bill_number,
+        'title': (record.get(EXPORT_FIELDS['title']) or '').strip(),
+        'current_status': (record.get(EXPORT_FIELDS['current_status']) or '').strip(),
+        'last_major_stage_completed': (record.get(EXPORT_FIELDS['last_major_stage_completed']) or '').strip(),
+        'parliament_session': f"{ordinal(parliament)} Parliament, {ordinal(session)} session"
+    }
+    # The export leaves out the stages of a chamber a bill does not go through, just as the listing card
+    # leaves out that chamber's progress bar, so a missing field maps the way a missing stage div does
+    for key, field in EXPORT_STAGE_FIELDS.items():
+        if field not in record:
+            bill_info[key] = 'Not Applicable'
+        else:
+            bill_info[key] = 'Completed' if record[field] else 'Not Completed'
+    bill_info['last_updated_at'] = last_updated_at or datetime.now().isoformat()
+    return bill_info
+
+
+def iter_xml_bills(source):
+    """
+    Yields each <Bill> of an XML export as a dictionary, freeing elements once read.
+
+    Args:
+        source: A file path or a binary file-like object.
+
+    Yields:
+        dict: Child element names mapped to their text.
+    """
+    for _, element in etree.iterparse(source, events=('end',), tag='Bill'):
+        yield {child.tag: child.text for child in element}
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+
+def _is_url(source):
+    return source.startswith('http://') or source.startswith('https://')
+
+
+def _detect_format(source):
+    return 'xml' if source.rstrip('/').lower().endswith('xml') else 'json'
+
+
+def _iter_text_chunks(source):
+    if _is_url(source):
+        with requests.get(source, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            decoder = codecs.getincrementaldecoder('utf-8-sig')()
+            for chunk in response.iter_content(CHUNK_SIZE):
+                yield decoder.decode(chunk)
+            yield decoder.decode(b'', final=True)
+    else:
+        yield from iter_text_chunks(source)
+
+
+def _iter_export_records(source, export_format):
+    if export_format == 'json':
+        yield from iter_json_array(_iter_text_chunks(source))
+    elif _is_url(source):
+        with requests.get(source, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            yield from iter_xml_bills(response.raw)
+    else:
+        yield from iter_xml_bills(source)
+
+
+def iter_export_bills(source=EXPORT_JSON_URL, export_format=None):
+    """
+    Streams a LegisInfo bulk export and yields bills in the CanadaBills.json schema.
+
+    The export is read incrementally, so memory use does not grow with the size of the file.
+
+    Args:
+        source (str): Path or URL of the export.
+        export_format (str): 'json' or 'xml'; inferred from the source when omitted.
+
+    Yields:
+        dict: Bill information, one bill at a time.
+    """
+    export_format = export_format or _detect_format(source)
+    last_updated_at = datetime.now().isoformat()
+    for record in _iter_export_records(source, export_format):
+        yield export_record_to_bill(record, last_updated_at)
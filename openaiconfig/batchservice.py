@@ -0,0 +1,133 @@
+# openaiconfig/batchservice.py
+
+import asyncio
+import json
+import os
+from openaiconfig.openaiservice import get_async_client, get_response_cache
+
+# Completion window requested for batch jobs; the Batch API only offers 24h
+OPENAI_BATCH_COMPLETION_WINDOW = os.getenv("OPENAI_BATCH_COMPLETION_WINDOW", "24h")
+# Seconds between status checks of a batch job
+OPENAI_BATCH_POLL_SECONDS = float(os.getenv("OPENAI_BATCH_POLL_SECONDS", "60"))
+
+# Statuses after which a batch job no longer changes
+TERMINAL_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}
+
+
+def write_batch_file(path, lines):
+    """
+    Writes Batch API input lines as JSON Lines, atomically.
+
+    Args:
+        path (str): Path of the batch input file.
+        lines (list): Request lines from BatchCollector.lines().
+    """
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as file:
+        for line in lines:
+            file.write(json.dumps(line, ensure_ascii=False) + '\n')
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+async def submit_batch(path, lines):
+    """
+    Writes a batch input file, uploads it and creates a chat completions batch job from it.
+
+    Args:
+        path (str): Where to keep the batch input file.
+        lines (list): Request lines from BatchCollector.lines().
+
+    Returns:
+        str: The batch job's id.
+    """
+    write_batch_file(path, lines)
+    client = get_async_client()[0]
+    with open(path, 'rb') as file:
+        input_file = await client.files.create(file=(os.path.basename(path), file.read()), purpose='batch')
+    batch = await client.batches.create(
+        input_file_id=input_file.id,
+        endpoint='/v1/chat/completions',
+        completion_window=OPENAI_BATCH_COMPLETION_WINDOW
+    )
+    return batch.id
+
+
+async def wait_for_batch(batch_id, poll_seconds=None):
+    """
+    Polls a batch job until it reaches a terminal status.
+
+    Args:
+        batch_id (str): The batch job's id.
+        poll_seconds (float): Seconds between checks; defaults to OPENAI_BATCH_POLL_SECONDS.
+
+    Returns:
+        Batch: The finished batch job.
+    """
+    client = get_async_client()[0]
+    while True:
+        batch = await client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        if counts:
+            print(f"⏳ Batch {batch_id}: {batch.status}, {counts.completed}/{counts.total} done, {counts.failed} failed")
+        if batch.status in TERMINAL_STATUSES:
+            return batch
+        await asyncio.sleep(OPENAI_BATCH_POLL_SECONDS if poll_seconds is None else poll_seconds)
+
+
+async def ingest_batch_output(batch, responses_path):
+    """
+    Appends every successful response of a finished batch job to a responses file, and stores it in the
+    response cache for later runs.
+
+    Responses are keyed by the request's custom_id, which is its response cache key, so replaying the
+    requests with load_batch_responses() as answers answers them. The cache alone would not do: it may
+    evict or expire a response before the replay. Failed requests are left out and are queued again.
+
+    Args:
+        batch (Batch): The finished batch job.
+        responses_path (str): JSON Lines file the run's batch responses are kept in until it has replayed them.
+
+    Returns:
+        int: Number of responses stored.
+    """
+    if not batch.output_file_id:
+        return 0
+    client = get_async_client()[0]
+    cache = get_response_cache()
+    output = await client.files.content(batch.output_file_id)
+    ingested = 0
+    with open(responses_path, 'a') as file:
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            response = result.get('response') or {}
+            if response.get('status_code') != 200:
+                continue
+            content = response['body']['choices'][0]['message']['content']
+            if content is not None:
+                file.write(json.dumps({'custom_id': result['custom_id'], 'content': content}, ensure_ascii=False) + '\n')
+                if cache is not None:
+                    cache.put(result['custom_id'], content)
+                ingested += 1
+        file.flush()
+        os.fsync(file.fileno())
+    return ingested
+
+
+def load_batch_responses(responses_path):
+    """
+    Reads the responses ingest_batch_output() kept.
+
+    Args:
+        responses_path (str): The responses file.
+
+    Returns:
+        dict: Response contents by custom_id; empty when the file is missing.
+    """
+    if not os.path.exists(responses_path):
+        return {}
+    with open(responses_path, 'r') as file:
+        return {record['custom_id']: record['content'] for record in map(json.loads, filter(str.strip, file))}
@@ -1,8 +1,22 @@
 # openaiconfig/openaiservice.py
 
+import asyncio
 import openai
 import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
 from dotenv import load_dotenv
+try:
+    import tiktoken  # Exact token counts; without it counts are estimated from the text length
+except ImportError:
+    tiktoken = None
+from config import STORAGE_DIR
+from openaiconfig.rate_limiter import AdaptiveConcurrency, RateLimiter
+from openaiconfig.response_cache import ResponseCache, response_cache_key
+from openaiconfig.telemetry import record_cache_hit, record_call
 
 # Load environment variables
 load_dotenv()
@@ -10,33 +24,461 @@ load_dotenv()
 # Retrieve OpenAI API key from .env
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Model used for every completion
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+# Response cache: identical requests are answered from disk instead of the API.
+# OPENAI_CACHE_BYPASS skips lookups but still stores the fresh responses.
+OPENAI_CACHE_ENABLED = os.getenv("OPENAI_CACHE_ENABLED", "true").lower() == "true"
+OPENAI_CACHE_BYPASS = os.getenv("OPENAI_CACHE_BYPASS", "false").lower() == "true"
+OPENAI_CACHE_PATH = os.getenv("OPENAI_CACHE_PATH", os.path.join(STORAGE_DIR, 'openai_cache.sqlite3'))
+OPENAI_CACHE_MAX_MB = int(os.getenv("OPENAI_CACHE_MAX_MB", "512"))
+OPENAI_CACHE_MAX_AGE_DAYS = int(os.getenv("OPENAI_CACHE_MAX_AGE_DAYS", "30"))
+
 # Initialize OpenAI with API key
 openai.api_key = OPENAI_API_KEY
 
-def generate_text(system_message, assistant_message, user_prompt):
+_encoding = None
+
+
+def count_tokens(text):
+    """
+    Counts the tokens of a text for OPENAI_MODEL.
+
+    Uses tiktoken when it is installed, otherwise estimates about four characters per token.
+
+    Parameters:
+    text (str): The text.
+
+    Returns:
+    int: Number of tokens.
+    """
+    global _encoding
+    if tiktoken is not None and _encoding is None:
+        try:
+            _encoding = tiktoken.encoding_for_model(OPENAI_MODEL)
+        except KeyError:
+            _encoding = tiktoken.get_encoding('o200k_base')
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4
+
+
+class UsageTotals:
+    """
+    Thread-safe running totals of the calls and tokens spent inside a track_usage() block.
+    Totals of a nested block are also added to the enclosing block's totals.
+    """
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.lock = Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.cache_hits = 0
+
+    def add(self, usage):
+        details = getattr(usage, 'prompt_tokens_details', None) if usage else None
+        with self.lock:
+            self.calls += 1
+            if usage:
+                self.prompt_tokens += usage.prompt_tokens or 0
+                self.completion_tokens += usage.completion_tokens or 0
+                self.cached_tokens += (getattr(details, 'cached_tokens', 0) or 0) if details else 0
+        if self.parent is not None:
+            self.parent.add(usage)
+
+    def add_cache_hit(self):
+        with self.lock:
+            self.cache_hits += 1
+        if self.parent is not None:
+            self.parent.add_cache_hit()
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                'calls': self.calls,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+                'cached_tokens': self.cached_tokens,
+                'cached_ratio': self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0,
+                'cache_hits': self.cache_hits
+            }
+
+
+# Totals that generate_text adds to, when the caller is inside track_usage()
+_current_usage = ContextVar('current_usage', default=None)
+
+
+@contextmanager
+def track_usage():
+    """
+    Collects the calls and tokens of every generate_text call made in this context.
+
+    Work handed to other threads only counts when it runs in a copy of this context
+    (contextvars.copy_context().run).
+
+    Yields:
+        UsageTotals: The running totals.
+    """
+    totals = UsageTotals(parent=_current_usage.get())
+    token = _current_usage.set(totals)
+    try:
+        yield totals
+    finally:
+        _current_usage.reset(token)
+
+
+_response_cache = None
+_response_cache_lock = Lock()
+
+
+def get_response_cache():
+    """
+    Returns the shared response cache, opening it on first use.
+
+    Returns:
+    ResponseCache: The cache, or None when OPENAI_CACHE_ENABLED is false.
+    """
+    global _response_cache
+    if not OPENAI_CACHE_ENABLED:
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                OPENAI_CACHE_PATH,
+                max_bytes=OPENAI_CACHE_MAX_MB * 1024 * 1024,
+                max_age_days=OPENAI_CACHE_MAX_AGE_DAYS
+            )
+        return _response_cache
+
+
+def cache_stats():
+    """
+    Returns the response cache's hit/miss statistics for this process.
+
+    Returns:
+    dict: The statistics, or None when the cache is disabled.
+    """
+    cache = get_response_cache()
+    return cache.stats() if cache else None
+
+
+def _cached_response(cache, cache_key, bypass_cache):
+    """Returns the cached response for a request and counts the hit, or None."""
+    if cache is None or bypass_cache:
+        return None
+    cached = cache.get(cache_key)
+    if cached is not None:
+        totals = _current_usage.get()
+        if totals is not None:
+            totals.add_cache_hit()
+        record_cache_hit()
+    return cached
+
+
+def _record_response(response, cache, cache_key):
+    """Counts a response's usage, caches its text and returns it."""
+    totals = _current_usage.get()
+    if totals is not None:
+        totals.add(response.usage)
+    content = response.choices[0].message.content
+    if cache is not None and content is not None:
+        cache.put(cache_key, content)
+    return content
+
+
+def _request_options(system_message, assistant_message, user_prompt, response_format):
+    options = {
+        'model': OPENAI_MODEL,
+        'messages': [
+            {"role": "system", "content": system_message},
+            {"role": "assistant", "content": assistant_message},
+            {"role": "user", "content": user_prompt}
+        ]
+    }
+    if response_format:
+        options['response_format'] = response_format
+    return options
+
+
+class GenerationError(Exception):
+    """Raised by generate_text and agenerate_text when a request still fails after its retries."""
+
+
+def generate_text(system_message, assistant_message, user_prompt, response_format=None, bypass_cache=None):
     """
     Generate text using OpenAI API with custom system, assistant, and prompt messages.
 
+    Identical requests are answered from the response cache without calling the API.
+
     Parameters:
     system_message (str): The system message guiding the assistant's behavior.
     assistant_message (str): The initial message to simulate the assistant's behavior.
     user_prompt (str): The user's input for generating a response.
+    response_format (dict): Optional response format, e.g. {"type": "json_object"} for JSON mode.
+    bypass_cache (bool): Skip the cache lookup and refresh the entry; defaults to OPENAI_CACHE_BYPASS.
 
     Returns:
     str: The response generated by the OpenAI API.
+
+    Raises:
+    GenerationError: When the request fails after the client's own retries.
     """
+    if bypass_cache is None:
+        bypass_cache = OPENAI_CACHE_BYPASS
+    cache = get_response_cache()
+    cache_key = response_cache_key(OPENAI_MODEL, system_message, assistant_message, user_prompt, response_format)
+    cached = _cached_response(cache, cache_key, bypass_cache)
+    if cached is not None:
+        return cached
+
     try:
+        started_at = time.monotonic()
         response = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "assistant", "content": assistant_message},
-                {"role": "user", "content": user_prompt}
-            ]
+            **_request_options(system_message, assistant_message, user_prompt, response_format)
         )
-        return response.choices[0].message.content
-
+        record_call(response.usage, time.monotonic() - started_at)
+        return _record_response(response, cache, cache_key)
 
     except Exception as e:
+        record_call(None, None, failed=True)
         print(f"Error generating text: {e}")
+        raise GenerationError(str(e)) from e
+
+
+# ============================================================
+# ==================== ASYNC CLIENT =========================
+# ============================================================
+
+# Quotas of the account; every agenerate_text call of a run shares one limiter
+OPENAI_RPM_LIMIT = int(os.getenv("OPENAI_RPM_LIMIT", "500"))
+OPENAI_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT", "200000"))
+# How many seconds of quota may be spent in one burst
+OPENAI_RATE_BURST_SECONDS = float(os.getenv("OPENAI_RATE_BURST_SECONDS", "10"))
+# Completion tokens reserved per request until the response reports the real count
+OPENAI_ESTIMATED_COMPLETION_TOKENS = int(os.getenv("OPENAI_ESTIMATED_COMPLETION_TOKENS", "500"))
+
+# AIMD window on requests in flight: grows while responses arrive within the latency target, halves on 429/5xx
+OPENAI_INITIAL_CONCURRENCY = int(os.getenv("OPENAI_INITIAL_CONCURRENCY", "8"))
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "64"))
+OPENAI_LATENCY_TARGET_SECONDS = float(os.getenv("OPENAI_LATENCY_TARGET_SECONDS", "20"))
+
+# Retries of throttled or failed requests, with jittered exponential backoff that never undercuts Retry-After
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "6"))
+OPENAI_RETRY_BASE_DELAY = float(os.getenv("OPENAI_RETRY_BASE_DELAY", "1"))
+OPENAI_RETRY_MAX_DELAY = float(os.getenv("OPENAI_RETRY_MAX_DELAY", "60"))
+
+_async_client = None
+_rate_limiter = None
+_concurrency = None
+
+
+class BatchRequestQueued(Exception):
+    """Raised by agenerate_text inside collect_batch_requests() once an uncached request has been queued."""
+
+
+class BatchCollector:
+    """
+    Requests queued for a batch job, as Batch API input lines keyed by their response cache key,
+    and the responses of the run's earlier batch jobs, by the same key.
+    """
+
+    def __init__(self, answers=None):
+        self.lock = Lock()
+        self.requests = {}
+        self.answers = dict(answers or {})
+
+    def add(self, cache_key, options):
+        with self.lock:
+            self.requests.setdefault(cache_key, {
+                'custom_id': cache_key,
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': options
+            })
+
+    def lines(self):
+        with self.lock:
+            return list(self.requests.values())
+
+
+# Collector that agenerate_text queues uncached requests on, when the caller is inside collect_batch_requests()
+_current_batch = ContextVar('current_batch', default=None)
+
+
+@contextmanager
+def collect_batch_requests(answers=None):
+    """
+    Queues every unanswered agenerate_text request made in this context instead of sending it.
+
+    Requests in answers, then cached requests (even with OPENAI_CACHE_BYPASS), are answered as usual; any
+    other is added to the collector and raises BatchRequestQueued. Once the batch's responses are passed
+    in answers, running the same code again answers every request.
+
+    Parameters:
+    answers (dict): Responses of earlier batch jobs by custom_id (the request's response cache key).
+
+    Yields:
+    BatchCollector: The queued requests.
+    """
+    collector = BatchCollector(answers)
+    token = _current_batch.set(collector)
+    try:
+        yield collector
+    finally:
+        _current_batch.reset(token)
+
+
+def get_async_client():
+    """
+    Returns the shared async client, rate limiter and concurrency controller, creating them on first use.
+
+    The client keeps one HTTP connection pool for every request until close_async_client().
+    Retries are handled by agenerate_text, so the client's own are turned off.
+
+    Returns:
+    tuple: (openai.AsyncOpenAI, RateLimiter, AdaptiveConcurrency)
+    """
+    global _async_client, _rate_limiter, _concurrency
+    if _async_client is None:
+        _async_client = openai.AsyncOpenAI(api_key=OPENAI_API_KEY, max_retries=0)
+        _rate_limiter = RateLimiter(OPENAI_RPM_LIMIT, OPENAI_TPM_LIMIT, OPENAI_RATE_BURST_SECONDS)
+        _concurrency = AdaptiveConcurrency(
+            initial=OPENAI_INITIAL_CONCURRENCY,
+            maximum=OPENAI_MAX_CONCURRENCY,
+            latency_target=OPENAI_LATENCY_TARGET_SECONDS
+        )
+    return _async_client, _rate_limiter, _concurrency
+
+
+async def close_async_client():
+    """Closes the async client's connection pool; the next agenerate_text call opens a new one."""
+    global _async_client, _rate_limiter, _concurrency
+    if _async_client is not None:
+        await _async_client.close()
+    _async_client = None
+    _rate_limiter = None
+    _concurrency = None
+
+
+def concurrency_metrics():
+    """
+    Returns the concurrency controller's current window, requests in flight and outcome counts.
+
+    Returns:
+    dict: The metrics, or None before the first agenerate_text call.
+    """
+    return _concurrency.metrics() if _concurrency else None
+
+
+def estimate_tokens(*texts):
+    """Token count of some texts, as counted by count_tokens."""
+    return sum(count_tokens(text) for text in texts if text)
+
+
+def _is_throttle(error):
+    """True for errors that signal an overloaded or rate-limited service and are worth retrying."""
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def _retry_after(error):
+    """Seconds the service asked us to wait (Retry-After / retry-after-ms), or None."""
+    response = getattr(error, 'response', None)
+    if response is None:
         return None
+    for header, scale in (('retry-after-ms', 1000.0), ('retry-after', 1.0)):
+        value = response.headers.get(header)
+        if value:
+            try:
+                return float(value) / scale
+            except ValueError:
+                pass  # HTTP-date form; fall back to backoff
+    return None
+
+
+def retry_delay(attempt, retry_after=None):
+    """
+    Jittered exponential backoff for a retry, never shorter than the service's Retry-After.
+
+    Parameters:
+    attempt (int): Number of attempts made so far, starting at 0.
+    retry_after (float): Seconds requested by the service, if any.
+
+    Returns:
+    float: Seconds to wait.
+    """
+    backoff = min(OPENAI_RETRY_MAX_DELAY, OPENAI_RETRY_BASE_DELAY * 2 ** attempt)
+    return max(retry_after or 0.0, backoff * random.uniform(0.5, 1.0))
+
+
+async def agenerate_text(system_message, assistant_message, user_prompt, response_format=None, bypass_cache=None):
+    """
+    Async variant of generate_text that waits for the shared RPM/TPM budget and a concurrency slot
+    before each request, and retries throttled or failed requests.
+
+    Parameters:
+    system_message (str): The system message guiding the assistant's behavior.
+    assistant_message (str): The initial message to simulate the assistant's behavior.
+    user_prompt (str): The user's input for generating a response.
+    response_format (dict): Optional response format, e.g. {"type": "json_object"} for JSON mode.
+    bypass_cache (bool): Skip the cache lookup and refresh the entry; defaults to OPENAI_CACHE_BYPASS.
+        Ignored inside collect_batch_requests(), which answers from the cache what earlier batches did not.
+
+    Returns:
+    str: The response generated by the OpenAI API.
+
+    Raises:
+    GenerationError: When the request fails with a non-retryable error or runs out of retries.
+    BatchRequestQueued: Inside collect_batch_requests(), when the request was queued instead of sent.
+    """
+    if bypass_cache is None:
+        bypass_cache = OPENAI_CACHE_BYPASS
+    collector = _current_batch.get()
+    cache_key = response_cache_key(OPENAI_MODEL, system_message, assistant_message, user_prompt, response_format)
+    if collector is not None:
+        answer = collector.answers.get(cache_key)
+        if answer is not None:
+            return answer
+        # Skipping lookups would queue requests whose answers are already cached again
+        bypass_cache = False
+    cache = get_response_cache()
+    # SQLite calls block, so they run in a worker thread (with this context, for the usage and telemetry counters)
+    if cache is not None and not bypass_cache:
+        cached = await asyncio.to_thread(_cached_response, cache, cache_key, bypass_cache)
+        if cached is not None:
+            return cached
+
+    options = _request_options(system_message, assistant_message, user_prompt, response_format)
+    if collector is not None:
+        collector.add(cache_key, options)
+        raise BatchRequestQueued(cache_key)
+
+    client, limiter, concurrency = get_async_client()
+    estimated = estimate_tokens(system_message, assistant_message, user_prompt) + OPENAI_ESTIMATED_COMPLETION_TOKENS
+    for attempt in range(OPENAI_MAX_RETRIES + 1):
+        await limiter.acquire(estimated)
+        started_at = await concurrency.acquire()
+        try:
+            response = await client.chat.completions.create(**options)
+        except Exception as e:
+            throttled = _is_throttle(e)
+            await concurrency.release(started_at, 'throttled' if throttled else 'error')
+            limiter.settle(estimated, 0)
+            if not throttled or attempt == OPENAI_MAX_RETRIES:
+                record_call(None, None, retries=attempt, failed=True)
+                print(f"Error generating text: {e}")
+                raise GenerationError(str(e)) from e
+            await asyncio.sleep(retry_delay(attempt, _retry_after(e)))
+            continue
+        await concurrency.release(started_at, 'ok')
+        record_call(response.usage, time.monotonic() - started_at, retries=attempt)
+        if response.usage:
+            limiter.settle(estimated, response.usage.total_tokens)
+        if cache is not None:
+            return await asyncio.to_thread(_record_response, response, cache, cache_key)
+        return _record_response(response, cache, cache_key)
@@ -0,0 +1,142 @@
+# openaiconfig/rate_limiter.py
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a per-minute rate.
+
+    The bucket holds at most burst_seconds worth of its rate, so a quota is spread over the minute
+    instead of being spent in one burst. A single request larger than the bucket waits for a full
+    bucket and leaves it in debt, which the refill pays back before the next request.
+    """
+
+    def __init__(self, per_minute, burst_seconds=10):
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount):
+        """Seconds until amount (capped at the bucket's capacity) is available."""
+        missing = min(amount, self.capacity) - self.tokens
+        return max(missing / self.rate, 0.0)
+
+    def take(self, amount):
+        self.tokens -= amount
+
+
+class RateLimiter:
+    """
+    Global requests-per-minute and tokens-per-minute limiter shared by every coroutine of a run.
+
+    Requests reserve their estimated tokens up front with acquire(); settle() corrects the
+    reservation once the response reports the tokens actually used.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute, burst_seconds=10):
+        self.requests = TokenBucket(requests_per_minute, burst_seconds)
+        self.tokens = TokenBucket(tokens_per_minute, burst_seconds)
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, tokens):
+        """
+        Waits until one request and the given number of tokens fit within both budgets.
+
+        Args:
+            tokens (int): Estimated prompt plus completion tokens of the request.
+        """
+        while True:
+            async with self.lock:
+                now = time.monotonic()
+                self.requests.refill(now)
+                self.tokens.refill(now)
+                wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                if wait == 0:
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    return
+            await asyncio.sleep(wait)
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """
+        Corrects a reservation: refunds an overestimate or charges an underestimate.
+
+        Args:
+            estimated_tokens (int): Tokens reserved by acquire().
+            actual_tokens (int): Tokens the response reported.
+        """
+        self.tokens.tokens = min(self.tokens.capacity, self.tokens.tokens + estimated_tokens - actual_tokens)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD window on the number of requests in flight.
+
+    Every request that succeeds within latency_target widens the window by 1/window (about one
+    slot per window of successes); a 429 or server error halves it. Throttles from requests sent
+    before the last decrease belong to the same burst and do not halve it again.
+    """
+
+    def __init__(self, initial=8, minimum=1, maximum=64, latency_target=20.0):
+        self.window = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self.decreased_at = 0.0
+        self.succeeded = 0
+        self.throttled = 0
+        self.failed = 0
+        self.condition = asyncio.Condition()
+
+    async def acquire(self):
+        """
+        Waits for a free slot in the window.
+
+        Returns:
+            float: Monotonic time the request started, to pass back to release().
+        """
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < int(self.window))
+            self.in_flight += 1
+        return time.monotonic()
+
+    async def release(self, started_at, outcome):
+        """
+        Frees a slot and adjusts the window.
+
+        Args:
+            started_at (float): Value returned by acquire().
+            outcome (str): 'ok', 'throttled' (429, 5xx, timeouts) or 'error' (anything else).
+        """
+        now = time.monotonic()
+        async with self.condition:
+            self.in_flight -= 1
+            if outcome == 'throttled':
+                self.throttled += 1
+                if started_at >= self.decreased_at:
+                    self.window = max(self.minimum, self.window / 2)
+                    self.decreased_at = now
+            elif outcome == 'ok':
+                self.succeeded += 1
+                if now - started_at <= self.latency_target:
+                    self.window = min(self.maximum, self.window + 1 / self.window)
+            else:
+                self.failed += 1
+            self.condition.notify_all()
+
+    def metrics(self):
+        return {
+            'window': round(self.window, 2),
+            'in_flight': self.in_flight,
+            'succeeded': self.succeeded,
+            'throttled': self.throttled,
+            'failed': self.failed
+        }
@@ -0,0 +1,185 @@
+# openaiconfig/response_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from threading import Lock, local
+
+
+def response_cache_key(model, system_message, assistant_message, user_prompt, response_format=None):
+    """
+    Computes the cache key of a completion request.
+
+    Args:
+        model (str): The model name.
+        system_message (str): The system message.
+        assistant_message (str): The assistant message.
+        user_prompt (str): The user prompt.
+        response_format (dict): The requested response format, if any.
+
+    Returns:
+        str: Hex SHA-256 of the request.
+    """
+    request = json.dumps(
+        [model, system_message, assistant_message, user_prompt, response_format],
+        ensure_ascii=False, separators=(',', ':'), sort_keys=True
+    )
+    return hashlib.sha256(request.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Disk-backed cache of model responses in a SQLite database.
+
+    Entries older than max_age_days are dropped on read and at each eviction. A running total of the bytes stored is kept,
+    and once it exceeds max_bytes the least recently used entries are evicted down to EVICT_TO_RATIO of
+    max_bytes, so puts do not scan the table until the cache has grown by a tenth again. SQLite's locking
+    makes the cache safe to share between threads (one connection each) and between processes using the
+    same file; entries other processes add are counted at the next eviction.
+    """
+
+    # Share of max_bytes an eviction brings the cache down to
+    EVICT_TO_RATIO = 0.9
+
+    def __init__(self, path, max_bytes=512 * 1024 * 1024, max_age_days=30):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 86400 if max_age_days else None
+        self.connections = local()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, last_used_at REAL NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used_at)")
+        connection.execute("CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at)")
+        connection.commit()
+        self.total_bytes = 0
+        self.evict()
+
+    def _connection(self):
+        connection = getattr(self.connections, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            # WAL lets readers in other processes carry on while one process writes
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.connections.connection = connection
+        return connection
+
+    def _count(self, counter, amount=1):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, key):
+        """
+        Looks up a response and marks it as recently used.
+
+        Args:
+            key (str): The request's cache key.
+
+        Returns:
+            str: The cached response, or None on a miss.
+        """
+        connection = self._connection()
+        now = time.time()
+        row = connection.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._count('misses')
+            return None
+        response, created_at = row
+        if self.max_age_seconds and created_at < now - self.max_age_seconds:
+            with connection:
+                connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._count('evictions')
+            self._count('misses')
+            return None
+        with connection:
+            connection.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (now, key))
+        self._count('hits')
+        return response
+
+    def put(self, key, response):
+        """
+        Stores a response, evicting least recently used entries once the cache is over max_bytes.
+
+        Args:
+            key (str): The request's cache key.
+            response (str): The model's response.
+        """
+        connection = self._connection()
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created_at, last_used_at) VALUES (?, ?, ?, ?, ?)",
+                (key, response, size, now, now)
+            )
+        with self.lock:
+            self.writes += 1
+            # A replaced entry is counted twice until the next eviction recounts the table
+            self.total_bytes += size
+            over = self.max_bytes and self.total_bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self):
+        """
+        Drops expired entries, then, when the cache is over max_bytes, the least recently used ones until
+        it fits EVICT_TO_RATIO of max_bytes, each in a single DELETE, and recounts the bytes stored.
+
+        Returns:
+            int: Number of entries evicted.
+        """
+        connection = self._connection()
+        evicted = 0
+        with connection:
+            if self.max_age_seconds:
+                evicted += connection.execute(
+                    "DELETE FROM responses WHERE created_at < ?", (time.time() - self.max_age_seconds,)
+                ).rowcount
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if self.max_bytes and total > self.max_bytes:
+                # Oldest first, an entry goes while the bytes evicted before it are short of the excess
+                excess = total - int(self.max_bytes * self.EVICT_TO_RATIO)
+                evicted += connection.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY last_used_at, key) - size AS evicted_before "
+                    "FROM responses) WHERE evicted_before < ?)", (excess,)
+                ).rowcount
+                total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        with self.lock:
+            self.total_bytes = total
+            self.evictions += evicted
+        return evicted
+
+    def stats(self):
+        """
+        Returns this process's hit/miss counters and the cache's current size.
+
+        Returns:
+            dict: hits, misses, writes, evictions, hit_rate, entries and bytes.
+        """
+        entries, total = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'writes': self.writes,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': entries,
+                'bytes': total
+            }
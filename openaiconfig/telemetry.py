@@ -0,0 +1,476 @@
+# openaiconfig/telemetry.py
+
+import json
+import math
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+BILL_DURATION_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600)
+
+# USD per million tokens: (input, cached input, output). OPENAI_PRICE_* override the entry of the model in use.
+MODEL_PRICES = {
+    'gpt-4o-mini': (0.15, 0.075, 0.60),
+    'gpt-4o': (2.50, 1.25, 10.00),
+    'gpt-4.1-mini': (0.40, 0.10, 1.60),
+    'gpt-4.1': (2.00, 0.50, 8.00),
+}
+
+# Label of calls made outside telemetry_labels(task=...)
+UNLABELLED = 'other'
+
+
+def model_prices(model):
+    """
+    Returns the per-million-token prices of a model, with the OPENAI_PRICE_* overrides applied.
+
+    Args:
+        model (str): The model name.
+
+    Returns:
+        tuple: (input, cached input, output) USD per million tokens; zeros for unknown models.
+    """
+    defaults = MODEL_PRICES.get(model)
+    if defaults is None:
+        # Dated snapshots (gpt-4o-mini-2024-07-18) cost the same as their alias
+        defaults = next(
+            (prices for name, prices in sorted(MODEL_PRICES.items(), key=lambda item: -len(item[0]))
+             if model.startswith(name + '-')),
+            (0.0, 0.0, 0.0)
+        )
+    overrides = (
+        os.getenv("OPENAI_PRICE_INPUT_PER_1M"),
+        os.getenv("OPENAI_PRICE_CACHED_INPUT_PER_1M"),
+        os.getenv("OPENAI_PRICE_OUTPUT_PER_1M")
+    )
+    return tuple(float(override) if override else default for override, default in zip(overrides, defaults))
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens=0):
+    """
+    Estimates the USD cost of a completion; cached prompt tokens are billed at the cached rate.
+
+    Args:
+        model (str): The model name.
+        prompt_tokens (int): Prompt tokens, including the cached ones.
+        completion_tokens (int): Completion tokens.
+        cached_tokens (int): Prompt tokens served from the prompt cache.
+
+    Returns:
+        float: Estimated cost in USD.
+    """
+    input_price, cached_price, output_price = model_prices(model)
+    return (
+        (prompt_tokens - cached_tokens) * input_price
+        + cached_tokens * cached_price
+        + completion_tokens * output_price
+    ) / 1_000_000
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram that also keeps its observations for exact quantiles.
+
+    A run makes at most a few thousand calls, so keeping every observation is cheap.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.values = []
+
+    def observe(self, value):
+        self.values.append(value)
+
+    def quantile(self, q):
+        """Nearest-rank quantile of the observations, or None when there are none."""
+        if not self.values:
+            return None
+        ordered = sorted(self.values)
+        return round(ordered[max(0, math.ceil(q * len(ordered)) - 1)], 4)
+
+    def bucket_counts(self):
+        """Cumulative counts per upper bound, ending with +Inf."""
+        counts = [sum(1 for value in self.values if value <= bound) for bound in self.buckets]
+        return list(zip(self.buckets, counts)) + [(math.inf, len(self.values))]
+
+    def summary(self):
+        return {
+            'count': len(self.values),
+            'sum': round(sum(self.values), 4),
+            'p50': self.quantile(0.50),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'max': round(max(self.values), 4) if self.values else None
+        }
+
+
+def _new_counters():
+    return {
+        'calls': 0,
+        'errors': 0,
+        'retries': 0,
+        'cache_hits': 0,
+        'prompt_tokens': 0,
+        'completion_tokens': 0,
+        'cached_tokens': 0,
+        'cost_usd': 0.0,
+        'parses': 0,
+        'reasks': 0,
+        'invalid_fields': 0,
+        'parse_seconds': 0.0
+    }
+
+
+class Telemetry:
+    """
+    Thread-safe per-task and per-bill accounting of the LLM calls made inside a collect_telemetry() block.
+
+    Tasks get counters and a latency histogram; bills get counters and their processing time.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.lock = Lock()
+        self.tasks = {}
+        self.latency = {}
+        self.bills = {}
+        self.bill_duration = Histogram(BILL_DURATION_BUCKETS)
+        self.reuse = {'bills': 0, 'identical': 0, 'fields': 0, 'estimated_tokens_avoided': 0}
+        self.local = {'bills': 0, 'fields': 0, 'hinted_tasks': 0, 'seconds': 0.0}
+
+    def _counters(self, task, bill):
+        """Counter dicts the current call adds to: its task's and, if known, its bill's."""
+        counters = [self.tasks.setdefault(task, _new_counters())]
+        if bill is not None:
+            counters.append(self.bills.setdefault(bill, dict(_new_counters(), seconds=None)))
+        return counters
+
+    def record_call(self, task, bill, usage, latency, retries=0, failed=False):
+        """
+        Records one API call (all of its attempts).
+
+        Args:
+            task (str): Task label.
+            bill (str): Bill label, or None.
+            usage: The response's usage object, or None.
+            latency (float): Seconds the successful attempt took, or None for a failed call.
+            retries (int): Attempts made before the last one.
+            failed (bool): Whether the call ran out of retries or hit a non-retryable error.
+        """
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = (getattr(details, 'cached_tokens', 0) or 0) if details else 0
+        cost = estimate_cost(self.model, prompt_tokens, completion_tokens, cached_tokens)
+        with self.lock:
+            for counters in self._counters(task, bill):
+                counters['calls'] += 1
+                counters['errors'] += int(failed)
+                counters['retries'] += retries
+                counters['prompt_tokens'] += prompt_tokens
+                counters['completion_tokens'] += completion_tokens
+                counters['cached_tokens'] += cached_tokens
+                counters['cost_usd'] += cost
+            if latency is not None:
+                self.latency.setdefault(task, Histogram(LATENCY_BUCKETS)).observe(latency)
+
+    def record_cache_hit(self, task, bill):
+        with self.lock:
+            for counters in self._counters(task, bill):
+                counters['cache_hits'] += 1
+
+    def record_parse(self, task, bill, fields, invalid_fields, seconds, reask=False):
+        """
+        Records the parsing and validation of one structured reply.
+
+        Args:
+            task (str): Task label.
+            bill (str): Bill label, or None.
+            fields (int): Fields the reply was asked for.
+            invalid_fields (int): Fields missing or failing validation.
+            seconds (float): CPU seconds spent parsing and validating.
+            reask (bool): Whether the request re-asked for fields an earlier reply got wrong.
+        """
+        with self.lock:
+            for counters in self._counters(task, bill):
+                counters['parses'] += 1
+                counters['reasks'] += int(reask)
+                counters['invalid_fields'] += invalid_fields
+                counters['parse_seconds'] += seconds
+
+    def record_reuse(self, bill, donor, fields, identical, tokens_avoided):
+        """
+        Records fields a bill took over from a near-duplicate bill's analysis.
+
+        Args:
+            bill (str): Bill label, or None.
+            donor (str): Label of the bill the fields came from.
+            fields (int): Number of fields reused.
+            identical (bool): Whether the texts were identical (fields copied without a request).
+            tokens_avoided (int): Estimated tokens the reused fields would have cost to derive.
+        """
+        with self.lock:
+            self.reuse['bills'] += 1
+            self.reuse['identical'] += int(identical)
+            self.reuse['fields'] += fields
+            self.reuse['estimated_tokens_avoided'] += tokens_avoided
+            if bill is not None:
+                self.bills.setdefault(bill, dict(_new_counters(), seconds=None))['reused_from'] = donor
+
+    def record_local(self, bill, fields, hinted_tasks, seconds):
+        """
+        Records a bill's rule-based extraction.
+
+        Args:
+            bill (str): Bill label, or None.
+            fields (int): Number of fields taken from the extraction without a request.
+            hinted_tasks (int): Number of tasks given the extraction to confirm and complete.
+            seconds (float): CPU time of the extraction.
+        """
+        with self.lock:
+            self.local['bills'] += 1
+            self.local['fields'] += fields
+            self.local['hinted_tasks'] += hinted_tasks
+            self.local['seconds'] += seconds
+            if bill is not None:
+                self.bills.setdefault(bill, dict(_new_counters(), seconds=None))['local_fields'] = fields
+
+    def record_bill(self, bill, seconds):
+        """Records how long a bill took to process."""
+        with self.lock:
+            self.bills.setdefault(bill, dict(_new_counters(), seconds=None))['seconds'] = round(seconds, 3)
+            self.bill_duration.observe(seconds)
+
+    def report(self):
+        """
+        Returns the run report: totals, then per-task and per-bill counters and latency quantiles.
+
+        Returns:
+            dict: JSON-serialisable report.
+        """
+        with self.lock:
+            totals = _new_counters()
+            for counters in self.tasks.values():
+                for name in totals:
+                    totals[name] += counters[name]
+            tasks = {
+                task: dict(
+                    counters,
+                    cost_usd=round(counters['cost_usd'], 6),
+                    parse_seconds=round(counters['parse_seconds'], 6),
+                    reask_rate=_reask_rate(counters),
+                    cached_ratio=_cached_ratio(counters),
+                    latency_seconds=self.latency[task].summary() if task in self.latency else None
+                )
+                for task, counters in sorted(self.tasks.items(), key=lambda item: -item[1]['cost_usd'])
+            }
+            bills = {
+                bill: dict(counters, cost_usd=round(counters['cost_usd'], 6), parse_seconds=round(counters['parse_seconds'], 6))
+                for bill, counters in self.bills.items()
+            }
+            return {
+                'model': self.model,
+                'prices_per_1m_tokens': dict(zip(('input', 'cached_input', 'output'), model_prices(self.model))),
+                'totals': dict(
+                    totals,
+                    cost_usd=round(totals['cost_usd'], 6),
+                    parse_seconds=round(totals['parse_seconds'], 6),
+                    reask_rate=_reask_rate(totals),
+                    cached_ratio=_cached_ratio(totals)
+                ),
+                'tasks': tasks,
+                'reuse': dict(self.reuse),
+                'local': dict(self.local, seconds=round(self.local['seconds'], 6)),
+                'bill_duration_seconds': self.bill_duration.summary(),
+                'bills': bills
+            }
+
+    def prometheus(self, prefix='bill_analyzer'):
+        """
+        Renders the per-task metrics in the Prometheus text exposition format.
+
+        Per-bill numbers stay in the JSON report; a label per bill would give one series per bill.
+
+        Args:
+            prefix (str): Metric name prefix.
+
+        Returns:
+            str: The metrics.
+        """
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                lines.append(f"{prefix}_{name}{suffix}{{{label_text}}} {_format(value)}" if label_text
+                             else f"{prefix}_{name}{suffix} {_format(value)}")
+
+        def histogram_samples(histogram, labels):
+            samples = [('_bucket', dict(labels, le=_format(bound)), count) for bound, count in histogram.bucket_counts()]
+            samples.append(('_sum', labels, sum(histogram.values)))
+            samples.append(('_count', labels, len(histogram.values)))
+            return samples
+
+        with self.lock:
+            tasks = sorted(self.tasks.items())
+            metric('llm_requests_total', 'counter', 'LLM API calls by task and outcome.', [
+                ('', {'task': task, 'outcome': outcome}, value)
+                for task, counters in tasks
+                for outcome, value in (('ok', counters['calls'] - counters['errors']), ('error', counters['errors']))
+            ])
+            metric('llm_retries_total', 'counter', 'Retried LLM API attempts by task.', [
+                ('', {'task': task}, counters['retries']) for task, counters in tasks
+            ])
+            metric('llm_cache_hits_total', 'counter', 'LLM requests answered from the response cache by task.', [
+                ('', {'task': task}, counters['cache_hits']) for task, counters in tasks
+            ])
+            metric('llm_tokens_total', 'counter', 'LLM tokens by task and kind; cached is part of prompt.', [
+                ('', {'task': task, 'kind': kind}, counters[f'{kind}_tokens'])
+                for task, counters in tasks for kind in ('prompt', 'completion', 'cached')
+            ])
+            metric('llm_cost_usd_total', 'counter', f'Estimated LLM cost in USD by task ({self.model}).', [
+                ('', {'task': task}, round(counters['cost_usd'], 6)) for task, counters in tasks
+            ])
+            metric('llm_reasks_total', 'counter', 'Structured requests re-asking for fields that failed validation, by task.', [
+                ('', {'task': task}, counters['reasks']) for task, counters in tasks
+            ])
+            metric('llm_invalid_fields_total', 'counter', 'Structured reply fields that failed validation, by task.', [
+                ('', {'task': task}, counters['invalid_fields']) for task, counters in tasks
+            ])
+            metric('llm_parse_cpu_seconds_total', 'counter', 'CPU time spent parsing and validating replies, by task.', [
+                ('', {'task': task}, round(counters['parse_seconds'], 6)) for task, counters in tasks
+            ])
+            metric('llm_request_duration_seconds', 'histogram', 'Latency of successful LLM API requests by task.', [
+                sample for task, histogram in sorted(self.latency.items())
+                for sample in histogram_samples(histogram, {'task': task})
+            ])
+            metric('bill_processing_duration_seconds', 'histogram', 'Time to analyse one bill.',
+                   histogram_samples(self.bill_duration, {}))
+        return '\n'.join(lines) + '\n'
+
+    def write(self, report_path, metrics_path):
+        """
+        Writes the JSON run report and the Prometheus metrics, each atomically.
+
+        Args:
+            report_path (str): Path of the JSON report.
+            metrics_path (str): Path of the Prometheus text file (e.g. for node_exporter's textfile collector).
+        """
+        for path, text in ((report_path, json.dumps(self.report(), indent=4)), (metrics_path, self.prometheus())):
+            temp_path = path + '.tmp'
+            with open(temp_path, 'w') as file:
+                file.write(text)
+            os.replace(temp_path, path)
+
+
+def _reask_rate(counters):
+    """Re-asks per first structured reply."""
+    first_replies = counters['parses'] - counters['reasks']
+    return round(counters['reasks'] / first_replies, 4) if first_replies else None
+
+
+def _cached_ratio(counters):
+    """Share of prompt tokens served from the provider's prompt cache."""
+    return round(counters['cached_tokens'] / counters['prompt_tokens'], 4) if counters['prompt_tokens'] else 0.0
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Collector the LLM calls report to, and the task/bill they are made for
+_current_telemetry = ContextVar('current_telemetry', default=None)
+_current_labels = ContextVar('current_labels', default=(UNLABELLED, None))
+
+
+@contextmanager
+def collect_telemetry(model):
+    """
+    Records every LLM call made in this context (and in tasks started from it).
+
+    Args:
+        model (str): Model the calls use, for cost estimates.
+
+    Yields:
+        Telemetry: The collector.
+    """
+    telemetry = Telemetry(model)
+    token = _current_telemetry.set(telemetry)
+    try:
+        yield telemetry
+    finally:
+        _current_telemetry.reset(token)
+
+
+@contextmanager
+def telemetry_labels(task=None, bill=None):
+    """
+    Attributes the LLM calls made in this context to a task and/or bill; unset labels are inherited.
+
+    Args:
+        task (str): Task name, e.g. a WRAPPER_FUNCTIONS key.
+        bill (str): Bill identifier.
+    """
+    current_task, current_bill = _current_labels.get()
+    token = _current_labels.set((task or current_task, bill or current_bill))
+    try:
+        yield
+    finally:
+        _current_labels.reset(token)
+
+
+def record_call(usage, latency, retries=0, failed=False):
+    """Records an API call under the current labels; a no-op outside collect_telemetry()."""
+    telemetry = _current_telemetry.get()
+    if telemetry is not None:
+        task, bill = _current_labels.get()
+        telemetry.record_call(task, bill, usage, latency, retries, failed)
+
+
+def record_cache_hit():
+    """Records a response cache hit under the current labels; a no-op outside collect_telemetry()."""
+    telemetry = _current_telemetry.get()
+    if telemetry is not None:
+        task, bill = _current_labels.get()
+        telemetry.record_cache_hit(task, bill)
+
+
+def record_parse(fields, invalid_fields, seconds, reask=False):
+    """Records a structured reply's validation under the current labels; a no-op outside collect_telemetry()."""
+    telemetry = _current_telemetry.get()
+    if telemetry is not None:
+        task, bill = _current_labels.get()
+        telemetry.record_parse(task, bill, fields, invalid_fields, seconds, reask)
+
+
+def record_reuse(donor, fields, identical, tokens_avoided):
+    """Records reused fields for the current bill; a no-op outside collect_telemetry()."""
+    telemetry = _current_telemetry.get()
+    if telemetry is not None:
+        telemetry.record_reuse(_current_labels.get()[1], donor, fields, identical, tokens_avoided)
+
+
+def record_local(fields, hinted_tasks, seconds):
+    """Records the current bill's rule-based extraction; a no-op outside collect_telemetry()."""
+    telemetry = _current_telemetry.get()
+    if telemetry is not None:
+        telemetry.record_local(_current_labels.get()[1], fields, hinted_tasks, seconds)
+
+
+def record_bill(seconds):
+    """Records the current bill's processing time; a no-op outside collect_telemetry() or without a bill label."""
+    telemetry = _current_telemetry.get()
+    bill = _current_labels.get()[1]
+    if telemetry is not None and bill is not None:
+        telemetry.record_bill(bill, seconds)
@@ -0,0 +1,54 @@
+# tests/benchmark_parsers.py
+#
+# Times the listing page parsers on saved listing pages:
+#     python tests/benchmark_parsers.py [page.html ...] [--repeat N]
+# Without page arguments the pages under tests/fixtures/listing are used.
+
+import argparse
+import glob
+import os
+import time
+from conftest import FIXTURES_DIR, load_tool
+
+
+def time_parser(parse_page, page_sources, repeat):
+    """
+    Parses every page repeat times and keeps the fastest round.
+
+    Returns:
+        float: Milliseconds per page of the fastest round.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        for page_source in page_sources:
+            parse_page(page_source)
+        best = min(best, time.perf_counter() - started_at)
+    return best * 1000 / len(page_sources)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the listing page parsers.")
+    parser.add_argument('pages', nargs='*', help="Saved listing pages (default: the test fixtures).")
+    parser.add_argument('--repeat', type=int, default=50, help="Rounds per parser; the fastest is reported.")
+    args = parser.parse_args()
+
+    paths = args.pages or sorted(glob.glob(os.path.join(FIXTURES_DIR, 'listing', '*.html')))
+    page_sources = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            page_sources.append(f.read())
+
+    scraper = load_tool('A Scrape Bills.py')
+    cards = sum(len(scraper.parse_bills_page_lxml(page_source)) for page_source in page_sources)
+    print(f"{len(page_sources)} pages, {cards} bill cards, best of {args.repeat} rounds")
+    timings = {}
+    for engine, parse_page in scraper.PAGE_PARSERS.items():
+        timings[engine] = time_parser(parse_page, page_sources, args.repeat)
+        print(f"{engine:>5}: {timings[engine]:.3f}ms/page")
+    if timings.get('lxml'):
+        print(f"lxml is {timings['bs4'] / timings['lxml']:.1f}x faster than bs4")
+
+
+if __name__ == '__main__':
+    main()
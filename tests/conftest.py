@@ -0,0 +1,159 @@
+# tests/conftest.py
+
+import http.server
+import importlib.util
+import os
+import sys
+import threading
+from urllib.parse import urlparse, parse_qs
+import pytest
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+TOOLS_DIR = os.path.join(REPO_DIR, 'Agents', 'Bill_Analyzer', 'tools')
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+
+def load_tool(file_name):
+    """
+    Imports one of the pipeline scripts, whose file names are not valid module names.
+
+    Args:
+        file_name (str): File name under Agents/Bill_Analyzer/tools, e.g. 'A Scrape Bills.py'.
+
+    Returns:
+        module: The freshly executed module.
+    """
+    module_name = 'tool_' + file_name.split('.')[0].replace(' ', '_').lower()
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(TOOLS_DIR, file_name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FixtureServer:
+    """
+    Threaded HTTP server running in the test process, answering GET and POST requests with a handler function.
+
+    The handler receives (method, path, query, request body) and returns (status, content type, body bytes).
+    Every request is recorded in self.requests as (method, path).
+    """
+
+    def __init__(self, handler):
+        self.requests = []
+        server = self
+
+        class RequestHandler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _respond(self, method):
+                parts = urlparse(self.path)
+                server.requests.append((method, self.path))
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                status, content_type, payload = handler(method, parts.path, parse_qs(parts.query), body)
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._respond('GET')
+
+            def do_POST(self):
+                self._respond('POST')
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), RequestHandler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def fixture_server():
+    """Starts a FixtureServer for the given handler; stopped when the test ends."""
+    servers = []
+
+    def start(handler):
+        server = FixtureServer(handler).__enter__()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.__exit__(None, None, None)
+
+
+def read_fixture(*parts, mode='r'):
+    """Reads a file under tests/fixtures."""
+    with open(os.path.join(FIXTURES_DIR, *parts), mode) as f:
+        return f.read()
+
+
+@pytest.fixture
+def stub_llm(fixture_server, monkeypatch):
+    """
+    Starts a StubLLM, or the stub_class given (see stub_llm.py), and points openaiservice's async client at it;
+    returns the stub.
+
+    The response cache is off, the rate limits out of the way and retries immediate; openaiservice's
+    client and settings are restored when the test ends.
+    """
+    from openaiconfig import openaiservice
+    from stub_llm import StubLLM
+
+    def start(*args, stub_class=StubLLM, **kwargs):
+        stub = stub_class(*args, **kwargs)
+        server = fixture_server(stub)
+        monkeypatch.setenv('OPENAI_BASE_URL', server.url + '/v1')
+        for name, value in {
+            'OPENAI_API_KEY': 'test', 'OPENAI_CACHE_ENABLED': False, 'OPENAI_CACHE_BYPASS': False,
+            'OPENAI_RPM_LIMIT': 100000, 'OPENAI_TPM_LIMIT': 1000000000,
+            'OPENAI_RETRY_BASE_DELAY': 0.01, 'OPENAI_RETRY_MAX_DELAY': 0.05,
+            '_response_cache': None, '_async_client': None, '_rate_limiter': None, '_concurrency': None
+        }.items():
+            monkeypatch.setattr(openaiservice, name, value)
+        return stub
+
+    return start
+
+
+@pytest.fixture
+def summarizer(monkeypatch, tmp_path):
+    """Loads 'C summarize_all_bills.py' with its storage, blob store and corpus indexes under tmp_path."""
+    from helpers import blob_store, helper
+    from helpers.blob_store import BlobStore
+
+    module = load_tool('C summarize_all_bills.py')
+    monkeypatch.setattr(helper, 'STORAGE_DIR', str(tmp_path))
+    monkeypatch.setattr(module, 'STORAGE_DIR', str(tmp_path))
+    monkeypatch.setattr(blob_store, '_default_store', BlobStore(str(tmp_path / 'bill_content')))
+    return module
+
+
+def run_llm(coroutine):
+    """Runs a coroutine making agenerate_text calls, closing the async client before its event loop ends."""
+    import asyncio
+    from openaiconfig.openaiservice import close_async_client
+
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await close_async_client()
+
+    return asyncio.run(main())
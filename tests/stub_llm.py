@@ -0,0 +1,235 @@
+# tests/stub_llm.py
+
+import json
+import threading
+import time
+
+# Replies of the stub, keyed by the json_schema name of the request (the task's WRAPPER_FUNCTIONS key,
+# or 'fused_analysis'); each request gets the fields its schema asks for that the reply has
+TASK_REPLIES = {
+    'summary': {'content': '<p>Reforms the firearms regime and the sex offender registry.</p>'},
+    'named_entities': {'entities': ['Parliament of Canada', 'Royal Canadian Mounted Police']},
+    'committees': {'committees': ['Standing Committee on Public Safety and National Security']},
+    'bill_impact': {'social': 'Fewer handguns in circulation.', 'economic': 'Buyback costs.',
+                    'legal': 'New Criminal Code offences.'},
+    'amendments': {'amendments': ['Subsection 161(1) of the Criminal Code is replaced.']},
+    'related_bills': {'related_bills': ['Bill C-71']},
+    'debates': {'summary': 'Debated at second reading.', 'key_points': ['Buyback program'],
+                'outcomes': ['Referred to committee']},
+    'public_engagement': {
+        'metrics': {'social_media_mentions': 120, 'engagement_rate': 'low', 'public_comments': 4},
+        'sentiments': {'positive': 'some', 'neutral': 'most', 'negative': 'some'},
+        'media_coverage': {'articles_count': 3,
+                           'sentiment_analysis': {'positive': 'few', 'neutral': 'most', 'negative': 'few'}}
+    },
+    'stakeholder_analysis': {'stakeholders': ['Firearms owners', 'Police services']},
+    'future_projections': {'potential_amendments': ['Exemptions for sport shooters'],
+                           'predicted_outcomes': 'Likely to pass.'}
+}
+
+FUSED_REPLY = {key: value for key, value in TASK_REPLIES.items() if key != 'public_engagement'}
+FUSED_REPLY['summary'] = dict(TASK_REPLIES['summary'], format='HTML', generated_on='')
+
+STUB_REPLIES = dict(TASK_REPLIES, fused_analysis=FUSED_REPLY)
+
+# A bill long enough for model analysis (over MIN_BILL_CONTENT_LENGTH characters)
+BILL_TEXT = """BILL C-21
+An Act to amend certain Acts and to make certain consequential amendments (firearms)
+SUMMARY
+This enactment amends the Criminal Code and the Firearms Act to reform the regulation of handguns,
+to create new offences and to strengthen the powers of the Royal Canadian Mounted Police.
+His Majesty, by and with the advice and consent of the Senate and House of Commons of Canada, enacts as follows:
+PART 1
+Criminal Code
+1 (1) Subsection 84(1) of the Criminal Code is amended by adding the following in alphabetical order:
+handgun means a firearm that is designed, altered or intended to be aimed and fired by the action of one hand.
+(2) Section 84 of the Act is amended by adding the following after subsection (3):
+(3.1) For the purposes of this Part, a handgun transferred after the coming into force of this subsection
+is a prohibited firearm.
+PART 2
+Firearms Act
+2 Section 5 of the Firearms Act is amended by adding the following after subsection (2):
+(2.1) A chief firearms officer may refuse to issue a licence to a person who is subject to a protection order.
+PART 3
+Coming into Force
+3 This Act comes into force on the day on which it receives royal assent.
+"""
+
+
+def stub_bill(bill_number='C-21', text=BILL_TEXT):
+    """A bill record of CanadaBillsEnhanced.json with its text inline."""
+    return {
+        'href': f'https://www.parl.ca/LegisInfo/en/bill/44-1/{bill_number.lower()}',
+        'bill_number': bill_number,
+        'title': 'An Act to amend certain Acts and to make certain consequential amendments (firearms)',
+        'current_status': 'At second reading in the House of Commons',
+        'last_major_stage_completed': 'First reading',
+        'bill_content': text
+    }
+
+
+# The provider caches prompt prefixes in blocks of this many tokens
+CACHE_BLOCK_TOKENS = 128
+
+
+def prompt_text(request):
+    """A request's prompt as the provider reads it: the response format's schema first, then the messages."""
+    return json.dumps(request.get('response_format'), sort_keys=True) + ''.join(
+        message['content'] for message in request['messages'])
+
+
+def common_prefix_length(a, b):
+    length = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        length += 1
+    return length
+
+
+def completion(model, content, prompt_tokens, cached_tokens=0):
+    """A chat.completion response body."""
+    completion_tokens = len(content) // 4
+    return {
+        'id': 'chatcmpl-stub',
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': model,
+        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+        'usage': {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+            'prompt_tokens_details': {'cached_tokens': cached_tokens}
+        }
+    }
+
+
+class StubLLM:
+    """
+    FixtureServer handler standing in for the OpenAI chat completions endpoint.
+
+    Structured requests are answered from replies by their json_schema name, with the fields the schema asks
+    for; JSON-mode requests from the first reply with every field of the structure in their last message;
+    other requests get text_reply. Statuses in failures answer the first requests instead (e.g. 429, 503);
+    a None there lets its request through.
+    Every answered request is recorded in self.calls with its schema name and server-side start and end times.
+    Usage reports as cached the longest prefix (in whole CACHE_BLOCK_TOKENS blocks) shared with a prompt
+    answered before, counting the response schema as part of the prompt.
+    """
+
+    def __init__(self, replies=None, text_reply='', failures=(), latency=0.0):
+        self.replies = STUB_REPLIES if replies is None else replies
+        self.text_reply = text_reply
+        self.failures = list(failures)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.calls = []
+        self.failed = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompts = []
+
+    def names(self):
+        """Schema names of the answered requests, in the order they started."""
+        with self.lock:
+            return [call['name'] for call in sorted(self.calls, key=lambda call: call['started_at'])]
+
+    def reply(self, request):
+        response_format = request.get('response_format') or {}
+        if response_format.get('type') == 'json_schema':
+            schema = response_format['json_schema']
+            name, fields = schema['name'], schema['schema']['required']
+        elif 'filled in:\n' in request['messages'][-1]['content']:
+            fields = list(json.loads(request['messages'][-1]['content'].split('filled in:\n', 1)[1]))
+            name = next((name for name, reply in self.replies.items() if all(field in reply for field in fields)), None)
+        else:
+            return None, self.text_reply
+        reply = self.replies.get(name, {})
+        return name, json.dumps({field: reply[field] for field in fields if field in reply})
+
+    def cached_tokens(self, prompt):
+        with self.lock:
+            cached = max((common_prefix_length(prompt, seen) for seen in self.prompts), default=0) // 4
+        return cached - cached % CACHE_BLOCK_TOKENS
+
+    def __call__(self, method, path, query, body):
+        if method != 'POST' or not path.endswith('/chat/completions'):
+            return 404, 'application/json', b'{"error": {"message": "not found"}}'
+        request = json.loads(body)
+        with self.lock:
+            status = self.failures.pop(0) if self.failures else None
+            if status is not None:
+                self.failed.append(status)
+            else:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if status is not None:
+            error = {'error': {'message': f'stub error {status}', 'type': 'stub', 'code': None}}
+            return status, 'application/json', json.dumps(error).encode('utf-8')
+
+        started_at = time.monotonic()
+        prompt = prompt_text(request)
+        cached_tokens = self.cached_tokens(prompt)
+        time.sleep(self.latency)
+        name, content = self.reply(request)
+        with self.lock:
+            self.in_flight -= 1
+            self.prompts.append(prompt)
+            self.calls.append({'name': name, 'request': request, 'started_at': started_at,
+                               'finished_at': time.monotonic()})
+        payload = completion(request['model'], content, len(prompt) // 4, cached_tokens)
+        return 200, 'application/json', json.dumps(payload).encode('utf-8')
+
+
+class StubBatchLLM(StubLLM):
+    """
+    StubLLM that also stands in for the Files and Batch endpoints: an uploaded batch input completes as soon
+    as it is retrieved, each line answered as StubLLM answers it live. Batch inputs are kept in self.batches.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.files = {}
+        self.batches = []
+
+    def batch_object(self, number):
+        batch = self.batches[number]
+        return {
+            'id': f'batch-{number}', 'object': 'batch', 'endpoint': '/v1/chat/completions',
+            'input_file_id': batch['input_file_id'], 'completion_window': '24h', 'created_at': 0,
+            'status': 'completed', 'output_file_id': f'file-output-{number}',
+            'request_counts': {'total': len(batch['lines']), 'completed': len(batch['lines']), 'failed': 0}
+        }
+
+    def batch_output(self, number):
+        results = []
+        for line in self.batches[number]['lines']:
+            request = line['body']
+            _, content = self.reply(request)
+            results.append(json.dumps({
+                'id': f"batch-request-{line['custom_id'][:8]}", 'custom_id': line['custom_id'], 'error': None,
+                'response': {'status_code': 200, 'request_id': 'stub', 'body': completion(request['model'], content, 0)}
+            }))
+        return '\n'.join(results) + '\n'
+
+    def __call__(self, method, path, query, body):
+        if path == '/v1/files' and method == 'POST':
+            # Multipart upload; the JSON Lines of the batch input are lines of the body
+            lines = [json.loads(line) for line in body.decode('utf-8').splitlines() if line.startswith('{"custom_id"')]
+            file_id = f'file-input-{len(self.files)}'
+            self.files[file_id] = lines
+            payload = {'id': file_id, 'object': 'file', 'bytes': len(body), 'created_at': 0,
+                       'filename': 'batch.jsonl', 'purpose': 'batch', 'status': 'processed'}
+        elif path == '/v1/batches' and method == 'POST':
+            input_file_id = json.loads(body)['input_file_id']
+            self.batches.append({'input_file_id': input_file_id, 'lines': self.files[input_file_id]})
+            payload = dict(self.batch_object(len(self.batches) - 1), status='validating', output_file_id=None)
+        elif path.startswith('/v1/batches/'):
+            payload = self.batch_object(int(path.rsplit('-', 1)[1]))
+        elif path.startswith('/v1/files/file-output-') and path.endswith('/content'):
+            number = int(path.split('/')[3].rsplit('-', 1)[1])
+            return 200, 'application/octet-stream', self.batch_output(number).encode('utf-8')
+        else:
+            return super().__call__(method, path, query, body)
+        return 200, 'application/json', json.dumps(payload).encode('utf-8')
@@ -0,0 +1,86 @@
+# tests/test_bill_chunks.py
+
+import re
+from conftest import run_llm
+from helpers.bill_chunks import leading_chunks, split_bill_text
+from openaiconfig.openaiservice import count_tokens
+from stub_llm import TASK_REPLIES, stub_bill
+
+HEADER = """BILL C-21
+An Act to amend certain Acts and to make certain consequential amendments (firearms)
+His Majesty, by and with the advice and consent of the Senate and House of Commons of Canada, enacts as follows:
+"""
+
+
+def provision(number):
+    return (f"{number} Section {number * 10} of the Firearms Act is replaced by the following:\n"
+            f"{number * 10} A chief firearms officer may refuse to issue a licence for the {number}th class of "
+            f"firearm to a person who is subject to a protection order.\n")
+
+
+LONG_TEXT = HEADER + ''.join(provision(number) for number in range(1, 61))
+
+
+def test_chunks_are_whole_provisions_within_the_limit():
+    chunks = split_bill_text(LONG_TEXT, max_tokens=150, min_tokens=60)
+
+    assert len(chunks) > 5
+    assert ''.join(chunks) == LONG_TEXT
+    assert all(count_tokens(chunk) <= 150 for chunk in chunks)
+    assert all(chunk.startswith('BILL C-21') or re.match(r'\d+ Section \d+ of', chunk) for chunk in chunks)
+    opening = leading_chunks(chunks, 300)
+    assert LONG_TEXT.startswith(opening) and count_tokens(opening) <= 300
+
+
+def test_amendment_only_changes_the_chunks_around_it():
+    amended = LONG_TEXT.replace(provision(30), provision(30).replace('protection order', 'prohibition order'))
+
+    before = split_bill_text(LONG_TEXT, max_tokens=150, min_tokens=60)
+    after = split_bill_text(amended, max_tokens=150, min_tokens=60)
+
+    assert len(set(before) - set(after)) <= 2
+    assert len(set(before) & set(after)) >= len(before) - 2
+
+
+def test_oversized_provision_is_split_at_line_breaks():
+    oversized = '1 Section 84 of the Criminal Code is replaced by the following:\n' + ''.join(
+        f'({number}) handgun means a firearm designed to be fired by the action of one hand.\n' for number in range(40))
+
+    chunks = split_bill_text(oversized, max_tokens=100, min_tokens=50)
+
+    assert len(chunks) > 1 and ''.join(chunks) == oversized
+    assert all(count_tokens(chunk) <= 100 and chunk.endswith('\n') for chunk in chunks)
+
+
+def test_long_bill_is_map_reduced_over_its_chunks(summarizer, stub_llm, monkeypatch):
+    stub = stub_llm(text_reply='Replaces licence refusal provisions of the Firearms Act.')
+    monkeypatch.setattr(summarizer, 'LOCAL_TASKS', [])
+    monkeypatch.setattr(summarizer, 'SINGLE_CALL_MAX_TOKENS', 300)
+    monkeypatch.setattr(summarizer, 'CHUNK_MAX_TOKENS', 150)
+    bill = stub_bill('C-21', LONG_TEXT)
+    chunks = split_bill_text(summarizer.load_bill_body(bill), 150)
+    assert count_tokens(LONG_TEXT) > 300 and len(chunks) > 2
+
+    enhanced = run_llm(summarizer.process_single_bill(bill, list(summarizer.WRAPPER_FUNCTIONS)))
+
+    def chunk_of(call):
+        prompt = call['request']['messages'][-1]['content']
+        assert sum(chunk in prompt for chunk in chunks) == 1
+        return next(chunk for chunk in chunks if f'Bill Content: {chunk}' in prompt)
+
+    # Map: every chunked task reads each chunk once, and no request reads more than a chunk
+    for name in (None, 'amendments', 'named_entities'):
+        calls = [call for call in stub.calls if call['name'] == name]
+        assert sorted(map(chunk_of, calls)) == sorted(chunks)
+    # Reduce: one summary of the part summaries
+    reduce_calls = [call for call in stub.calls if call['name'] == 'summary']
+    assert len(reduce_calls) == 1
+    assert reduce_calls[0]['request']['messages'][-1]['content'].count('Replaces licence refusal') == len(chunks)
+    assert enhanced['summary']['content'] == TASK_REPLIES['summary']['content']
+    # Merged results keep each item once
+    assert enhanced['amendments'] == TASK_REPLIES['amendments']
+    assert enhanced['named_entities'] == TASK_REPLIES['named_entities']
+    # The other tasks read only the opening chunks
+    committees = next(call for call in stub.calls if call['name'] == 'committees')
+    assert provision(60) not in committees['request']['messages'][-1]['content']
+    assert enhanced['committees'] == TASK_REPLIES['committees']
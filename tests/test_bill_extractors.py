@@ -0,0 +1,93 @@
+# tests/test_bill_extractors.py
+
+from conftest import read_fixture, run_llm
+from helpers.bill_extractors import acts_in_title, extract_bill_references, find_bill_references
+from stub_llm import TASK_REPLIES, stub_bill
+
+TITLE = ('An Act to amend the Criminal Code, the Sex Offender Information Registration Act and the '
+         'International Transfer of Offenders Act')
+ACTS = ['Criminal Code', 'Sex Offender Information Registration Act', 'International Transfer of Offenders Act']
+
+
+def s12_text():
+    return read_fixture('bills', 's-12.txt')
+
+
+def test_bill_references_leave_out_the_bill_itself_and_chapters():
+    text = s12_text() + '\nAs in R.S., c. C-46 and S.C. 2019, ch. C-71; not SC-5, C-21a or C-12345.'
+
+    assert find_bill_references(text, 'S-12') == ['Bill C-16', 'Bill C-21']
+    assert find_bill_references(text, 's-12') == ['Bill C-16', 'Bill C-21']
+    assert find_bill_references(text) == ['Bill S-12', 'Bill C-16', 'Bill C-21']
+
+
+def test_acts_in_title():
+    assert acts_in_title(TITLE) == ACTS
+    assert acts_in_title('An Act to amend the Immigration and Refugee Protection Act and to make related '
+                         'amendments to other Acts') == ['Immigration and Refugee Protection Act']
+    assert acts_in_title('An Act respecting the Canada Disability Benefit') == []
+    assert acts_in_title(None) == []
+
+
+def test_extract_bill_references():
+    extracted = extract_bill_references(s12_text(), TITLE, 'S-12')
+
+    assert extracted['amended_acts'] == ACTS
+    assert extracted['related_bills'] == ['Bill C-16', 'Bill C-21'] + ACTS
+    # "The Act" is the Act of the heading above the provision
+    assert extracted['amendments'] == [
+        'Section 1: replaces subsection 161(1) of the Criminal Code',
+        'Section 1: repeals subsection 161(1.1) of the Criminal Code',
+        'Section 2: amends the Criminal Code by adding the following after section 490.011',
+        'Section 3: amends paragraph 4(3)(a) of the Sex Offender Information Registration Act',
+        'Section 4: replaces the definition sex offence in section 3 of the Sex Offender Information Registration Act'
+    ]
+    assert extracted['entities'] == ACTS + [
+        'Supreme Court of Canada', 'Parliament', 'Senate', 'House of Commons', 'Attorney General of Canada',
+        'Governor in Council'
+    ]
+
+
+def test_nothing_is_extracted_from_text_without_references():
+    empty = {'related_bills': [], 'amended_acts': [], 'amendments': [], 'entities': []}
+
+    assert extract_bill_references('') == empty
+    assert extract_bill_references('This enactment provides for a national day of remembrance.', None) == empty
+    assert extract_bill_references('\x00 BILL C-\n of the is replaced (', 'An Act to amend') == empty
+
+
+def test_provisions_without_a_heading_keep_the_act_unnamed():
+    text = 'The Act is amended by adding the following after section 2:\nSubsection 3(1) of the Act is repealed.'
+
+    assert extract_bill_references(text)['amendments'] == [
+        'Amends the Act by adding the following after section 2', 'Repeals subsection 3(1)']
+
+
+def test_extract_local_fields(summarizer):
+    bill = stub_bill('S-12', s12_text())
+    bill['title'] = TITLE
+    bill['similar_bills'] = [{'bill_number': 'C-16', 'parliament_session': '43-2', 'title': 'Sex offenders'}]
+
+    fields = summarizer.extract_local_fields(bill, s12_text())
+
+    assert fields['related_bills'] == {'related_bills': ['Bill C-16', 'Bill C-21'] + ACTS + [
+        'Bill C-16 (43-2): Sex offenders']}
+    assert len(fields['amendments']['amendments']) == 5
+    assert fields['named_entities']['entities'][:3] == ACTS
+    # Tasks the extraction finds nothing for are left to the model
+    assert summarizer.extract_local_fields(stub_bill('C-2', 'A short text.'), 'A short text.') == {}
+
+
+def test_local_tasks_need_no_request(summarizer, stub_llm):
+    stub = stub_llm()
+    bill = stub_bill('S-12', s12_text())
+    bill['title'] = TITLE
+
+    enhanced = run_llm(summarizer.process_single_bill(bill, list(summarizer.WRAPPER_FUNCTIONS)))
+
+    assert sorted(summarizer.LOCAL_TASKS) == ['amendments', 'related_bills']
+    assert sorted(stub.names()) == sorted(set(summarizer.WRAPPER_FUNCTIONS) - set(summarizer.LOCAL_TASKS))
+    assert enhanced['related_bills']['related_bills'][:2] == ['Bill C-16', 'Bill C-21']
+    assert enhanced['amendments']['amendments'][0] == 'Section 1: replaces subsection 161(1) of the Criminal Code'
+    # named_entities is extracted too, but not a local task, so the model's answer is kept
+    assert enhanced['named_entities'] == TASK_REPLIES['named_entities']
@@ -0,0 +1,72 @@
+# tests/test_bill_index.py
+
+from helpers.bill_index import (append_changelog, bill_fingerprint, build_index, changed_since, field_transitions,
+                                iter_changelog, load_index, save_index)
+
+BILL = {
+    'href': 'https://www.parl.ca/LegisInfo/en/bill/44-1/c-21',
+    'bill_number': 'C-21',
+    'title': 'Firearms',
+    'current_status': 'At second reading'
+}
+
+
+def test_fingerprint_is_stable():
+    reordered = dict(reversed(list(BILL.items())), change_status=True, sponsor='Hon. Marco Mendicino')
+
+    # Stored indexes compare against this value across runs, so it must not depend on the process or key order
+    assert bill_fingerprint(BILL) == 'e96a06fcd2fd1feafce88f409e439118107f2fc7b1019891727430136808178c'
+    assert bill_fingerprint(reordered) == bill_fingerprint(BILL)
+    assert bill_fingerprint(dict(BILL, current_status='At third reading')) != bill_fingerprint(BILL)
+
+
+def test_field_transitions_record_each_changed_field():
+    passed = dict(BILL, current_status='At third reading', house_second_reading='2023-05-18')
+
+    assert field_transitions(BILL, BILL, '2024-01-02T00:00:00') == []
+    assert field_transitions(BILL, passed, '2024-01-02T00:00:00') == [
+        {'changed_at': '2024-01-02T00:00:00', 'href': BILL['href'], 'bill_number': 'C-21',
+         'field': 'current_status', 'old': 'At second reading', 'new': 'At third reading'},
+        {'changed_at': '2024-01-02T00:00:00', 'href': BILL['href'], 'bill_number': 'C-21',
+         'field': 'house_second_reading', 'old': None, 'new': '2023-05-18'}
+    ]
+    # A new bill records every field it has
+    assert [entry['field'] for entry in field_transitions(None, BILL, '2024-01-01T00:00:00')] == [
+        'bill_number', 'title', 'current_status']
+
+
+def test_changelog_is_read_back_since_a_timestamp(tmp_path):
+    changelog_path = str(tmp_path / 'CanadaBillsChangelog.jsonl')
+    passed = dict(BILL, current_status='At third reading')
+    append_changelog(changelog_path, field_transitions(None, BILL, '2024-01-01T00:00:00'))
+    append_changelog(changelog_path, field_transitions(BILL, passed, '2024-01-02T00:00:00'))
+    append_changelog(changelog_path, [])
+
+    assert len(list(iter_changelog(changelog_path))) == 4
+    assert [(entry['old'], entry['new']) for entry in iter_changelog(changelog_path, since='2024-01-02')] == [
+        ('At second reading', 'At third reading')]
+    assert list(iter_changelog(str(tmp_path / 'missing.jsonl'))) == []
+
+
+def test_changed_since_includes_the_timestamp(tmp_path):
+    bills = [
+        dict(BILL, last_updated_at='2024-01-01T00:00:00'),
+        dict(BILL, href='s-5', bill_number='S-5', last_updated_at='2024-01-02T00:00:00'),
+        dict(BILL, href='c-69', bill_number='C-69')
+    ]
+    index_path = str(tmp_path / 'CanadaBillsIndex.json')
+    save_index(index_path, build_index(bills))
+    index = load_index(index_path)
+
+    assert changed_since(index, '2024-01-02T00:00:00') == ['s-5']
+    assert changed_since(index, '2024-01-01') == [BILL['href'], 's-5']
+    # indexed_at stands in for the change time of bills stored without one
+    assert changed_since(build_index(bills, indexed_at='2024-01-03'), '2024-01-03') == ['c-69']
+
+
+def test_corrupted_index_is_rebuilt(tmp_path):
+    index_path = tmp_path / 'CanadaBillsIndex.json'
+    index_path.write_text('{"truncated')
+
+    assert load_index(str(index_path)) is None
+    assert load_index(str(tmp_path / 'missing.json')) is None
@@ -0,0 +1,71 @@
+# tests/test_bill_structure.py
+
+from helpers.blob_store import BlobStore, store_bill_content
+from helpers.bill_structure import (index_bill_structure, load_bill_body, load_bill_segment, load_bill_structure,
+                                    load_bill_summary)
+
+BILL_TEXT = """Skip to main content
+Parliament of Canada
+BILL S-12
+An Act to amend the Criminal Code, the Sex Offender Information Registration Act and the International Transfer of Offenders Act
+SUMMARY
+This enactment amends the Criminal Code to reform the sex offender registry.
+Available on the Senate of Canada website
+His Majesty, by and with the advice and consent of the Senate and House of Commons of Canada, enacts as follows:
+PART 1
+Criminal Code
+1 (1) Subsection 161(1) of the Criminal Code is replaced by the following:
+(2) Subsection 161(1.1) of the Act is repealed.
+2 Section 490.011 of the Act is amended by adding the following:
+PART 2
+Coming into Force
+3 This Act comes into force on the day on which it receives royal assent.
+Published under the authority of the Speaker of the Senate
+Date modified: 2023-10-19
+"""
+
+
+def indexed_bill(tmp_path, text=BILL_TEXT):
+    store = BlobStore(str(tmp_path))
+    bill = store_bill_content({'bill_number': 'S-12', 'bill_content': text}, store)
+    return index_bill_structure(bill, store), store
+
+
+def test_text_is_stored_once(tmp_path):
+    bill, store = indexed_bill(tmp_path)
+
+    # The text and its offset index, nothing else
+    assert len(store.index) == 2
+    structure = load_bill_structure(bill, store)
+    assert all('hash' not in segment for segment in structure['segments'])
+
+
+def test_segments_are_sliced_from_the_text(tmp_path):
+    bill, store = indexed_bill(tmp_path)
+
+    assert load_bill_summary(bill, store) == (
+        "SUMMARY\nThis enactment amends the Criminal Code to reform the sex offender registry.")
+    assert load_bill_segment(bill, '1(2)', 'subsection', store) == "(2) Subsection 161(1.1) of the Act is repealed."
+    assert load_bill_segment(bill, '3', store=store) == (
+        "3 This Act comes into force on the day on which it receives royal assent.")
+    assert load_bill_segment(bill, 'PART 2', 'part', store).startswith("PART 2\nComing into Force\n3 ")
+    assert load_bill_segment(bill, '4', store=store) is None
+    body = load_bill_body(bill, store)
+    assert body.startswith("BILL S-12\n") and body.endswith("receives royal assent.")
+
+
+def test_structure_of_another_text_is_ignored(tmp_path):
+    bill, store = indexed_bill(tmp_path)
+    new_text = BILL_TEXT.replace('reform the sex offender registry', 'amend the sex offender registry')
+    bill['bill_content_hash'] = store.put(new_text)
+
+    assert load_bill_structure(bill, store) is None
+    assert load_bill_body(bill, store) == new_text
+    assert load_bill_summary(bill, store) is None
+
+
+def test_text_without_segments_has_no_structure(tmp_path):
+    bill, store = indexed_bill(tmp_path, 'No Text Available Yet')
+
+    assert 'bill_structure_hash' not in bill
+    assert load_bill_body(bill, store) == 'No Text Available Yet'
@@ -0,0 +1,123 @@
+# tests/test_bill_tfidf.py
+
+import os
+import numpy as np
+from helpers import bill_tfidf
+from helpers.bill_tfidf import FEATURE_BITS, TfidfIndex
+from stub_llm import BILL_TEXT, stub_bill
+
+DOCUMENTS = {
+    'c-21': ('An Act to amend certain Acts (firearms)', BILL_TEXT),
+    'c-71': ('An Act to amend certain Acts and Regulations in relation to firearms',
+             'The Firearms Act is amended to require a licence verification for the transfer of a non-restricted '
+             'firearm. A chief firearms officer may refuse to issue a licence, and the Royal Canadian Mounted '
+             'Police keep records of handguns and of every prohibited firearm under the Criminal Code.'),
+    'c-69': ('Budget Implementation Act, 2024, No. 1',
+             'Implements income tax measures, the capital gains inclusion rate and the Canada Carbon Rebate '
+             'for small businesses, and extends the GST rental rebate.'),
+    'c-59': ('Fall Economic Statement Implementation Act, 2023',
+             'Implements income tax measures, including the clean technology investment tax credit, '
+             'and amends the Excise Tax Act for the GST rental rebate.')
+}
+
+
+def build_index(documents=DOCUMENTS):
+    index = TfidfIndex()
+    index.update((key, 'v1', lambda document=document: document) for key, document in documents.items())
+    return index
+
+
+def dense_cosines(index):
+    """Cosine similarities of the indexed documents from dense vectors, as a reference."""
+    matrix = index.matrix()
+    dense = np.zeros((len(matrix['keys']), 1 << FEATURE_BITS))
+    for row in range(len(matrix['keys'])):
+        start, end = matrix['indptr'][row], matrix['indptr'][row + 1]
+        dense[row, matrix['columns'][start:end]] = matrix['weights'][start:end]
+    return matrix['keys'], dense @ dense.T
+
+
+def test_neighbours_are_ranked_by_cosine_similarity():
+    index = build_index()
+
+    neighbours = index.most_similar(top_k=3)
+
+    keys, cosines = dense_cosines(index)
+    for row, key in enumerate(keys):
+        expected = sorted(((round(cosines[row, other], 4), keys[other]) for other in range(len(keys)) if other != row),
+                          key=lambda pair: -pair[0])
+        assert [other for _, other in neighbours[key]] == [other for similarity, other in expected if similarity > 0]
+        assert np.allclose([similarity for similarity, _ in neighbours[key]],
+                           [similarity for similarity, _ in expected if similarity > 0], atol=1e-4)
+    assert neighbours['c-21'][0][1] == 'c-71' and neighbours['c-69'][0][1] == 'c-59'
+
+
+def test_neighbours_leave_out_the_document_itself_and_dissimilar_ones(monkeypatch):
+    index = build_index()
+
+    neighbours = index.most_similar(top_k=5, min_similarity=0.1)
+
+    assert all(key not in [other for _, other in pairs] for key, pairs in neighbours.items())
+    assert [other for _, other in neighbours['c-21']] == ['c-71']
+    assert index.most_similar(['c-69'], top_k=1) == {'c-69': neighbours['c-69'][:1]}
+    # Scoring a query at a time gives the same neighbours
+    monkeypatch.setattr(bill_tfidf, 'SCORE_BATCH_SIZE', 1)
+    index._matrix = None
+    assert index.most_similar(top_k=5, min_similarity=0.1) == neighbours
+    assert build_index({'c-21': DOCUMENTS['c-21']}).most_similar() == {'c-21': []}
+
+
+def test_index_round_trips_through_npz(tmp_path):
+    path = str(tmp_path / 'bill_tfidf_index.npz')
+    index = build_index()
+    index.save(path)
+
+    loaded = TfidfIndex.load(path)
+
+    assert list(loaded.rows) == list(index.rows)
+    for key, (version, columns, counts) in index.rows.items():
+        assert loaded.rows[key][0] == version
+        assert np.array_equal(loaded.rows[key][1], columns) and np.array_equal(loaded.rows[key][2], counts)
+    assert loaded.most_similar() == index.most_similar()
+    assert not os.path.exists(path + '.tmp.npz')
+
+
+def test_missing_or_unreadable_index_starts_empty(tmp_path):
+    path = tmp_path / 'bill_tfidf_index.npz'
+    path.write_bytes(b'not an archive')
+
+    assert len(TfidfIndex.load(str(path))) == 0
+    assert len(TfidfIndex.load(str(tmp_path / 'missing.npz'))) == 0
+
+
+def test_update_vectorizes_only_new_and_changed_documents():
+    index = build_index()
+    loaded = []
+
+    def documents(versions):
+        for key, version in versions.items():
+            yield key, version, lambda key=key: loaded.append(key) or DOCUMENTS[key]
+
+    assert index.update(documents({'c-21': 'v1', 'c-71': 'v2', 'c-69': 'v1'})) == 1
+    assert loaded == ['c-71']
+    # c-59 was not listed, so it is pruned
+    assert sorted(index.rows) == ['c-21', 'c-69', 'c-71']
+
+
+def test_update_similar_bills(summarizer):
+    bills = []
+    for key, (title, text) in DOCUMENTS.items():
+        bill = stub_bill(key.upper(), text)
+        bill.update(title=title, parliament_session='44-1')
+        bills.append(bill)
+
+    assert summarizer.update_similar_bills(bills) == 4
+
+    firearms = bills[0]['similar_bills']
+    assert [match['bill_number'] for match in firearms] == ['C-71']
+    assert firearms[0]['parliament_session'] == '44-1' and 0 < firearms[0]['similarity'] < 1
+    assert all(match['href'] != bill['href'] for bill in bills for match in bill['similar_bills'])
+    assert os.path.exists(os.path.join(summarizer.STORAGE_DIR, summarizer.TFIDF_INDEX_FILE))
+    # Nothing changed, so nothing is vectorized again
+    assert summarizer.update_similar_bills(bills) == 0
+    assert bills[0]['similar_bills'] == firearms
@@ -0,0 +1,46 @@
+# tests/test_blob_store.py
+
+import pytest
+from helpers.blob_store import BlobStore
+
+
+def test_put_and_get(tmp_path):
+    store = BlobStore(str(tmp_path))
+    digest = store.put('An Act respecting railways')
+
+    assert store.put('An Act respecting railways') == digest
+    assert store.get(digest) == 'An Act respecting railways'
+    assert BlobStore(str(tmp_path)).get(digest) == 'An Act respecting railways'
+
+
+def test_get_reads_entries_added_by_another_store(tmp_path):
+    reader = BlobStore(str(tmp_path))
+    reader.get(reader.put('First text'))
+
+    # Another process opened the same store and added a text after the reader loaded its index
+    digest = BlobStore(str(tmp_path)).put('Second text')
+
+    assert reader.get(digest) == 'Second text'
+
+
+def test_get_unknown_hash(tmp_path):
+    store = BlobStore(str(tmp_path))
+    store.put('Some text')
+
+    with pytest.raises(KeyError):
+        store.get('0' * 64)
+
+
+def test_partly_written_index_line_is_read_once_complete(tmp_path):
+    writer = BlobStore(str(tmp_path))
+    digest = writer.put('Text being indexed')
+    with open(writer.index_path, 'rb') as f:
+        line = f.read()
+    with open(writer.index_path, 'wb') as f:
+        f.write(line[:-10])
+
+    reader = BlobStore(str(tmp_path))
+    assert digest not in reader
+    with open(writer.index_path, 'wb') as f:
+        f.write(line)
+    assert reader.get(digest) == 'Text being indexed'
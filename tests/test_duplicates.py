@@ -0,0 +1,127 @@
+# tests/test_duplicates.py
+
+import asyncio
+import copy
+import random
+import pytest
+from conftest import run_llm
+from helpers import bill_similarity
+from helpers.bill_similarity import minhash_signature, shingle_hashes, signature_similarity
+from stub_llm import BILL_TEXT, STUB_REPLIES, TASK_REPLIES, stub_bill
+
+AMENDED_TEXT = BILL_TEXT.replace('subject to a protection order', 'subject to a firearms prohibition order')
+UNRELATED_TEXT = """BILL C-69
+An Act to implement certain provisions of the budget tabled in Parliament on April 16, 2024
+SUMMARY
+Part 1 implements certain income tax measures, including the capital gains inclusion rate and the
+Canada Carbon Rebate for small businesses, and amends the Excise Tax Act to extend the GST rental rebate.
+Part 2 enacts the Canada Disability Benefit Act and amends the Employment Insurance Act for adoptive parents.
+""" * 3
+
+
+def reference_signature(text):
+    """minhash_signature() as first written, with Python integers; stored signatures were computed this way."""
+    hashes = shingle_hashes(text)
+    return [min((a * value + b) % bill_similarity._MERSENNE_PRIME for value in hashes)
+            for a, b in bill_similarity._PERMUTATIONS]
+
+
+def test_vectorized_signature_matches_stored_signatures(monkeypatch):
+    words = BILL_TEXT.split()
+    text = ' '.join(random.Random(1867).choice(words) for _ in range(3000))
+    monkeypatch.setattr(bill_similarity, 'SHINGLE_BLOCK', 512)
+
+    for sample in (text, BILL_TEXT, 'C-21', ''):
+        assert minhash_signature(sample) == reference_signature(sample)
+    assert signature_similarity(minhash_signature(BILL_TEXT), minhash_signature(AMENDED_TEXT)) > 0.9
+
+
+@pytest.fixture
+def donor(summarizer, stub_llm, monkeypatch):
+    """C-21 analysed per task, so every reusable field is up to date with its text."""
+    monkeypatch.setattr(summarizer, 'LOCAL_TASKS', [])
+    stub_llm()
+    return run_llm(summarizer.process_single_bill(stub_bill('C-21'), list(summarizer.WRAPPER_FUNCTIONS)))
+
+
+def find_donor(summarizer, bills_data, bill):
+    finder = summarizer.DuplicateFinder(bills_data, [bill], {})
+    finder.start(bill)
+    return run_llm(finder.find(bill))
+
+
+def test_reintroduced_bill_reuses_the_donor_analysis(summarizer, donor, stub_llm):
+    stub = stub_llm()
+    # Same text, new number: a reintroduced or pro forma bill
+    bill = stub_bill('C-2')
+
+    found = find_donor(summarizer, [donor, bill], bill)
+    fields = run_llm(summarizer.reuse_analysis(bill, BILL_TEXT, found, summarizer.REUSABLE_KEYS))
+
+    assert found[0]['bill_number'] == 'C-21' and found[2] == 1.0
+    assert fields == {key: donor[key] for key in summarizer.REUSABLE_KEYS}
+    assert stub.calls == []
+
+
+def test_diff_update_refreshes_only_the_changed_fields(summarizer, donor, stub_llm):
+    replies = copy.deepcopy(STUB_REPLIES)
+    replies['diff_update'] = {
+        'summary': {'content': '<p>Adds firearms prohibition orders.</p>', 'format': 'HTML', 'generated_on': ''},
+        'committees': TASK_REPLIES['committees'],
+        'stakeholder_analysis': {'stakeholders': 'Firearms owners'}
+    }
+    stub = stub_llm(replies)
+    bill = stub_bill('C-2', AMENDED_TEXT)
+    keys = ['summary', 'committees', 'stakeholder_analysis']
+
+    found = find_donor(summarizer, [donor, bill], bill)
+    fields = run_llm(summarizer.reuse_analysis(bill, AMENDED_TEXT, found, keys))
+
+    assert stub.names() == ['diff_update']
+    request = stub.calls[0]['request']
+    assert request['response_format']['json_schema']['schema']['required'] == keys
+    # The request carries the changed lines, not the whole text
+    prompt = request['messages'][-1]['content']
+    assert '+(2.1) A chief firearms officer may refuse' in prompt and 'firearms prohibition order' in prompt
+    assert 'Coming into Force' not in prompt
+    # An invalid field is left for the usual analysis
+    assert sorted(fields) == ['committees', 'summary']
+    assert 'Adds firearms prohibition orders.' in fields['summary']['content']
+    assert fields['committees'] == donor['committees']
+
+
+def test_long_diff_is_analysed_from_scratch(summarizer, donor, stub_llm, monkeypatch):
+    stub = stub_llm()
+    monkeypatch.setattr(summarizer, 'DUPLICATE_MAX_DIFF_TOKENS', 5)
+    bill = stub_bill('C-2', AMENDED_TEXT)
+
+    found = find_donor(summarizer, [donor, bill], bill)
+
+    assert run_llm(summarizer.reuse_analysis(bill, AMENDED_TEXT, found, ['committees'])) == {}
+    assert stub.calls == []
+
+
+def test_unrelated_bill_has_no_donor(summarizer, donor):
+    bill = stub_bill('C-69', UNRELATED_TEXT)
+
+    assert find_donor(summarizer, [donor, bill], bill) is None
+    # A bill never matches itself
+    assert find_donor(summarizer, [donor], donor) is None
+
+
+def test_bill_waits_for_a_duplicate_started_before_it(summarizer, donor):
+    first, second = stub_bill('C-2'), stub_bill('C-3')
+    finder = summarizer.DuplicateFinder([first, second], [first, second], {})
+    finder.start(first)
+    finder.start(second)
+
+    async def find_while_first_runs():
+        lookup = asyncio.ensure_future(finder.find(second))
+        await asyncio.sleep(0.01)
+        assert not lookup.done()
+        finder.finish(first, dict(donor, href=first['href'], bill_number='C-2'))
+        return await lookup
+
+    found = asyncio.run(find_while_first_runs())
+
+    assert found[0] is first and found[1]['committees'] == donor['committees']
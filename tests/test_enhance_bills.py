@@ -0,0 +1,174 @@
+# tests/test_enhance_bills.py
+
+import json
+from datetime import datetime, timedelta
+import pytest
+from lxml import html as lxml_html
+from conftest import load_tool, read_fixture
+from helpers import blob_store
+from helpers.blob_store import BlobStore, load_bill_content
+
+BILL_TEXT = """First Session, Forty-fourth Parliament
+BILL C-21
+An Act to amend certain Acts and to make certain consequential amendments (firearms)
+Summary
+This enactment amends the Criminal Code.
+1 Subsection 5(2) of the Criminal Code is replaced by the following:
+"""
+
+
+def detail_page(sponsor, bill_type, publication_path):
+    return f"""<html><body>
+<div class="attribute"><div class="label">Sponsor</div><div>{sponsor}</div></div>
+<div class="attribute"><div class="label">Bill type</div><div>{bill_type}</div></div>
+<a class="publication btn btn-primary" href="{publication_path}">Text of the bill</a>
+</body></html>"""
+
+
+def publication_page(text, email):
+    paragraphs = ''.join(f'<p>{line}</p>' for line in text.splitlines())
+    return f'<html><head><title>C-21</title></head><body>{paragraphs}<a href="mailto:{email}">Contact</a></body></html>'
+
+
+BILLS = [
+    {'href': 'https://www.parl.ca/LegisInfo/en/bill/44-1/c-21', 'bill_number': 'C-21', 'title': 'Firearms',
+     'current_status': 'Royal assent received', 'change_status': True},
+    {'href': 'https://www.parl.ca/LegisInfo/en/bill/44-1/s-5', 'bill_number': 'S-5', 'title': 'Environment',
+     'current_status': 'At third reading in the House of Commons', 'change_status': True}
+]
+
+PAGES = {
+    '/LegisInfo/en/bill/44-1/c-21': detail_page('Hon. Marco Mendicino', 'House Government Bill',
+                                                '/DocumentViewer/en/44-1/bill/C-21/first-reading'),
+    '/DocumentViewer/en/44-1/bill/C-21/first-reading': publication_page(BILL_TEXT, 'info@parl.gc.ca')
+}
+
+
+def detail_handler(method, path, query, body):
+    if path in PAGES:
+        return 200, 'text/html; charset=utf-8', PAGES[path].encode('utf-8')
+    return 500, 'text/plain', b'Internal Server Error'
+
+
+@pytest.fixture
+def enhancer(monkeypatch, tmp_path, fixture_server):
+    module = load_tool('B Enhance Bills.py')
+    server = fixture_server(detail_handler)
+    monkeypatch.setattr(module, 'FETCH_BASE_URL', server.url)
+    monkeypatch.setattr(module, 'input_file_path', str(tmp_path / 'CanadaBills.json'))
+    monkeypatch.setattr(module, 'output_file_path', str(tmp_path / 'CanadaBillsEnhanced.json'))
+    monkeypatch.setattr(module, 'checkpoint_file_path', str(tmp_path / 'CanadaBillsEnhanced.checkpoint.jsonl'))
+    monkeypatch.setattr(blob_store, '_default_store', BlobStore(str(tmp_path / 'bill_content')))
+    with open(module.input_file_path, 'w') as f:
+        json.dump(BILLS, f)
+    return module
+
+
+def read_enhanced(enhancer):
+    with open(enhancer.output_file_path) as f:
+        return {bill['bill_number']: bill for bill in json.load(f)}
+
+
+def test_failed_bill_does_not_stop_the_run(enhancer):
+    failures = enhancer.enhance_bills('http', workers=2)
+
+    assert [bill_number for bill_number, _ in failures] == ['S-5']
+    assert '500' in failures[0][1]
+    enhanced = read_enhanced(enhancer)
+    assert list(enhanced) == ['C-21']
+    assert enhanced['C-21']['sponsor'] == 'Hon. Marco Mendicino'
+    assert enhanced['C-21']['contact_email'] == 'info@parl.gc.ca'
+    assert load_bill_content(enhanced['C-21']) == BILL_TEXT.strip() + '\nContact'
+
+
+def test_failed_bill_is_fetched_again(enhancer):
+    enhancer.enhance_bills('http', workers=2)
+
+    with open(enhancer.input_file_path) as f:
+        bills = json.load(f)
+    assert [bill['bill_number'] for bill in enhancer.select_bills_to_enhance(bills)] == ['S-5']
+
+
+def test_compaction_drops_stale_text_keys(enhancer):
+    """A re-enhanced bill whose text has no structure must not keep the old text's structure."""
+    with open(enhancer.output_file_path, 'w') as f:
+        json.dump([{'bill_number': 'C-21', 'bill_content_hash': 'old', 'bill_content_length': 3,
+                    'bill_structure_hash': 'old structure', 'summary': 'Kept from the summarizer'}], f)
+    with open(enhancer.checkpoint_file_path, 'w') as f:
+        f.write(json.dumps({'bill_number': 'C-21', 'bill_content_hash': 'new', 'bill_content_length': 9}) + '\n')
+
+    enhancer.compact_enhanced_bills()
+
+    assert read_enhanced(enhancer)['C-21'] == {
+        'bill_number': 'C-21', 'bill_content_hash': 'new', 'bill_content_length': 9,
+        'summary': 'Kept from the summarizer'
+    }
+
+
+def test_field_max_ages_from_environment(monkeypatch):
+    monkeypatch.setenv('ENHANCE_SPONSOR_MAX_AGE_DAYS', '7')
+    monkeypatch.setenv('ENHANCE_BILL_TYPE_MAX_AGE_DAYS', '365')
+    monkeypatch.setenv('ENHANCE_CONTACT_EMAIL_MAX_AGE_DAYS', 'none')
+    module = load_tool('B Enhance Bills.py')
+
+    assert module.FIELD_MAX_AGE_DAYS == {'sponsor': 7, 'bill_type': 365, 'bill_content': 30, 'contact_email': None}
+
+
+def test_stale_field_triggers_refetch(enhancer):
+    now = datetime(2024, 6, 1)
+    bill = dict(BILLS[0])
+    state = {'listing_fingerprint': enhancer.bill_fingerprint(bill),
+             'enhanced_at': (now - timedelta(days=40)).isoformat()}
+
+    assert enhancer.refetch_reason(bill, state, now) == 'stale bill_content'
+    enhancer.FIELD_MAX_AGE_DAYS['bill_content'] = None
+    assert enhancer.refetch_reason(bill, state, now) is None
+
+
+def test_http_text_matches_selenium_text():
+    """
+    The expected text is what Selenium's element.text gives for the page body under WebDriver's visible-text
+    rules. The one difference is text hidden by a stylesheet rule, which HTTP mode cannot see.
+    """
+    module = load_tool('B Enhance Bills.py')
+    page = lxml_html.fromstring(read_fixture('enhance', 'publication.html'))
+
+    http_lines = module.visible_text(page.find('body')).split('\n')
+
+    assert http_lines[2] == 'Printed from parl.ca'
+    del http_lines[2]
+    assert http_lines == read_fixture('enhance', 'publication.selenium.txt').splitlines()
+
+
+class FakeDriver:
+    def __init__(self, dead):
+        self.dead = dead
+        self.quit_calls = 0
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+def test_crashed_driver_is_replaced(enhancer, monkeypatch):
+    drivers = []
+
+    def build_chrome_driver():
+        # The first browser crashes on its first page and stays dead
+        drivers.append(FakeDriver(dead=not drivers))
+        return drivers[-1]
+
+    def enhance_bill_info(bill, driver):
+        if driver.dead:
+            raise RuntimeError('invalid session id')
+        return dict(bill, sponsor='Hon. Steven Guilbeault', bill_type='Senate Government Bill',
+                    bill_content='No Text Available Yet', contact_email='Not Available')
+
+    monkeypatch.setattr(enhancer, 'build_chrome_driver', build_chrome_driver)
+    monkeypatch.setattr(enhancer, 'enhance_bill_info', enhance_bill_info)
+    monkeypatch.setattr(enhancer, 'STORE_CONTENT_AS_BLOBS', False)
+
+    failures = enhancer.enhance_bills('selenium', workers=1)
+
+    assert [bill_number for bill_number, _ in failures] == ['C-21']
+    assert len(drivers) == 2 and drivers[0].quit_calls == 1
+    assert read_enhanced(enhancer)['S-5']['sponsor'] == 'Hon. Steven Guilbeault'
@@ -0,0 +1,88 @@
+# tests/test_legisinfo_export.py
+
+import json
+import os
+import pytest
+from conftest import FIXTURES_DIR, load_tool, read_fixture
+from helpers.bill_index import FIELDS_TO_COMPARE
+from helpers.legisinfo_export import export_record_to_bill, iter_export_bills
+
+EXPORT_JSON = os.path.join(FIXTURES_DIR, 'export', 'bills.json')
+EXPORT_XML = os.path.join(FIXTURES_DIR, 'export', 'bills.xml')
+
+
+@pytest.fixture(scope='module')
+def scraper():
+    return load_tool('A Scrape Bills.py')
+
+
+def exported_bills(source):
+    return {bill['bill_number']: bill for bill in iter_export_bills(source)}
+
+
+def test_json_and_xml_exports_agree():
+    json_bills = exported_bills(EXPORT_JSON)
+    xml_bills = exported_bills(EXPORT_XML)
+
+    assert list(json_bills) == ['C-21', 'C-318', 'S-254', 'S-1']
+    for bill_number, bill in json_bills.items():
+        xml_bill = xml_bills[bill_number]
+        assert {field: bill[field] for field in FIELDS_TO_COMPARE} == {field: xml_bill[field] for field in FIELDS_TO_COMPARE}
+        assert bill['href'] == xml_bill['href']
+
+
+def test_stage_mapping():
+    bills = exported_bills(EXPORT_JSON)
+
+    assert bills['C-21']['href'] == 'https://www.parl.ca/LegisInfo/en/bill/44-1/c-21'
+    assert bills['C-21']['parliament_session'] == '44th Parliament, 1st session'
+    assert bills['C-21']['royal_assent'] == 'Completed'
+    # An empty date is a stage not reached yet
+    assert bills['C-318']['house_second_reading'] == 'Not Completed'
+    assert bills['C-318']['senate_first_reading'] == 'Not Completed'
+    # A stage the record has no field for does not apply to the bill
+    assert bills['S-254']['senate_second_reading'] == 'Not Completed'
+    assert bills['S-254']['senate_third_reading'] == 'Not Applicable'
+    assert bills['S-1']['house_first_reading'] == 'Not Applicable'
+    assert bills['S-1']['royal_assent'] == 'Not Applicable'
+
+
+def test_export_matches_listing_cards(scraper):
+    """Bills read from the export merge with the same bills read from listing cards."""
+    exported = exported_bills(EXPORT_JSON)
+    listed = {}
+    for page in ('page1.html', 'page2.html'):
+        for bill in scraper.parse_bills_page_lxml(read_fixture('listing', page)):
+            listed[bill['bill_number']] = bill
+
+    for bill_number in ('C-21', 'S-254'):
+        assert exported[bill_number]['href'] == listed[bill_number]['href']
+        assert scraper.bill_fingerprint(exported[bill_number]) == scraper.bill_fingerprint(listed[bill_number])
+
+
+def test_record_without_numbers_fails():
+    with pytest.raises(KeyError):
+        export_record_to_bill({'BillNumberFormatted': 'C-1'})
+
+
+def test_offline_export_ingest(scraper, monkeypatch, tmp_path):
+    output_file_path = str(tmp_path / 'CanadaBills.json')
+    monkeypatch.setattr(scraper, 'EXPORT_SOURCE', EXPORT_JSON)
+
+    scraper.scrape_canada_bills('export', output_file_path=output_file_path)
+
+    with open(output_file_path) as f:
+        stored = {bill['bill_number']: bill for bill in json.load(f)}
+    assert list(stored) == ['C-21', 'C-318', 'S-254', 'S-1']
+    assert stored['S-1']['royal_assent'] == 'Not Applicable'
+    index_path, changelog_path = scraper.index_paths(output_file_path)
+    with open(changelog_path) as f:
+        assert {json.loads(line)['bill_number'] for line in f} == set(stored)
+
+    # The XML export of the same bills changes no bill
+    monkeypatch.setattr(scraper, 'EXPORT_SOURCE', EXPORT_XML)
+    scraper.scrape_canada_bills('export', output_file_path=output_file_path)
+    with open(output_file_path) as f:
+        assert not any(bill['change_status'] for bill in json.load(f))
+    with open(changelog_path) as f:
+        assert len({json.loads(line)['changed_at'] for line in f}) == 1
@@ -0,0 +1,45 @@
+# tests/test_page_parsers.py
+
+import pytest
+from conftest import load_tool, read_fixture
+
+LISTING_FIXTURES = ['page1.html', 'page2.html', 'page3.html', 'edge_cases.html']
+
+
+@pytest.fixture(scope='module')
+def scraper():
+    return load_tool('A Scrape Bills.py')
+
+
+def parse(scraper, engine, file_name):
+    """Parses a listing fixture, dropping the parse timestamp that differs between runs."""
+    bills = scraper.PAGE_PARSERS[engine](read_fixture('listing', file_name))
+    for bill in bills:
+        bill.pop('last_updated_at')
+    return bills
+
+
+@pytest.mark.parametrize('file_name', LISTING_FIXTURES)
+def test_parsers_agree(scraper, file_name):
+    assert parse(scraper, 'lxml', file_name) == parse(scraper, 'bs4', file_name)
+
+
+def test_edge_cases(scraper):
+    bills = {bill['bill_number']: bill for bill in parse(scraper, 'lxml', 'edge_cases.html')}
+
+    assert bills['C-11']['title'].endswith('other Acts (Online Streaming Act)')
+    assert bills['C-11']['current_status'].split() == ['Royal', 'assent', 'received', '2023-04-27']
+    assert bills['C-11']['parliament_session'] == '44th Parliament, 1st session'
+    assert bills['S-209']['title'] == 'An Act to amend the Criminal Code & the Youth Criminal Justice Act (restorative justice)'
+    assert bills['S-209']['senate_second_reading'] == 'Not Completed'
+    assert bills['S-209']['house_first_reading'] == 'Not Applicable'
+    # An empty Royal Assent group counts as a stage not yet completed
+    assert bills['S-209']['royal_assent'] == 'Not Completed'
+    assert bills['C-1']['last_major_stage_completed'] == ''
+    assert bills['C-1']['house_second_reading'] == 'Not Applicable'
+    assert bills['C-1']['royal_assent'] == 'Not Applicable'
+
+
+def test_has_next_page(scraper):
+    assert scraper.has_next_page(read_fixture('listing', 'page1.html'))
+    assert not scraper.has_next_page(read_fixture('listing', 'page3.html'))
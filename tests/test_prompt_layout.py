@@ -0,0 +1,53 @@
+# tests/test_prompt_layout.py
+
+from conftest import run_llm
+from openaiconfig.openaiservice import track_usage
+from stub_llm import TASK_REPLIES, stub_bill
+
+
+def analyze(summarizer, monkeypatch, layout):
+    monkeypatch.setattr(summarizer, 'PROMPT_LAYOUT', layout)
+    monkeypatch.setattr(summarizer, 'LOCAL_TASKS', [])
+    with track_usage() as usage:
+        enhanced = run_llm(summarizer.process_single_bill(stub_bill(), list(summarizer.WRAPPER_FUNCTIONS)))
+    return enhanced, usage.as_dict()
+
+
+def test_shared_prefix_warms_up_before_fanning_out(summarizer, stub_llm, monkeypatch):
+    stub = stub_llm(latency=0.05)
+
+    enhanced, _ = analyze(summarizer, monkeypatch, 'shared_prefix')
+
+    calls = sorted(stub.calls, key=lambda call: call['started_at'])
+    warm_up, others = calls[0], calls[1:]
+    assert warm_up['name'] == 'summary'
+    assert len(others) == len(summarizer.WRAPPER_FUNCTIONS) - 1
+    # The other requests only start once the warm-up response is back, and they start together
+    assert all(call['started_at'] >= warm_up['finished_at'] for call in others)
+    assert stub.max_in_flight > 1
+    # Every request on the bill text starts with the same response format and system message
+    on_text = [call['request'] for call in calls if call['name'] != 'public_engagement']
+    assert {str(request['response_format']) for request in on_text} == {"{'type': 'json_object'}"}
+    prefixes = {request['messages'][0]['content'] for request in on_text}
+    assert len(prefixes) == 1 and 'An Act to amend certain Acts' in prefixes.pop()
+    assert enhanced['summary']['content']
+    assert enhanced['bill_impact'] == TASK_REPLIES['bill_impact']
+
+
+def test_shared_prefix_is_served_from_the_prompt_cache(summarizer, stub_llm, monkeypatch):
+    stub_llm()
+
+    _, usage = analyze(summarizer, monkeypatch, 'shared_prefix')
+
+    assert usage['cached_ratio'] > 0
+
+
+def test_task_first_layout_shares_no_prefix(summarizer, stub_llm, monkeypatch):
+    stub = stub_llm(latency=0.05)
+
+    _, usage = analyze(summarizer, monkeypatch, 'task_first')
+
+    assert usage['cached_ratio'] == 0
+    first = min(stub.calls, key=lambda call: call['finished_at'])
+    assert sum(call['started_at'] < first['finished_at'] for call in stub.calls) > 1
+    assert len({call['request']['messages'][0]['content'] for call in stub.calls}) > 1
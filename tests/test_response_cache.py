@@ -0,0 +1,71 @@
+# tests/test_response_cache.py
+
+import time
+from conftest import run_llm
+from openaiconfig import openaiservice
+from openaiconfig.openaiservice import agenerate_text, track_usage
+from openaiconfig.response_cache import ResponseCache
+
+ENTRY = 'x' * 1000
+
+
+def open_cache(tmp_path, max_bytes=10000, max_age_days=30):
+    return ResponseCache(str(tmp_path / 'cache.sqlite3'), max_bytes=max_bytes, max_age_days=max_age_days)
+
+
+def test_least_recently_used_entries_are_evicted_below_the_limit(tmp_path):
+    cache = open_cache(tmp_path)
+    for number in range(10):
+        cache.put(f'key{number}', ENTRY)
+    assert cache.get('key0') == ENTRY
+
+    cache.put('key10', ENTRY)
+
+    # One eviction brings the cache down to 90% of max_bytes, oldest use first
+    stats = cache.stats()
+    assert stats['bytes'] == 9000 and stats['evictions'] == 2
+    assert cache.get('key1') is None and cache.get('key2') is None
+    assert cache.get('key0') == ENTRY and cache.get('key10') == ENTRY
+
+
+def test_puts_under_the_limit_do_not_scan_the_table(tmp_path, monkeypatch):
+    cache = open_cache(tmp_path, max_bytes=100000)
+    evictions = []
+    monkeypatch.setattr(cache, 'evict', lambda: evictions.append(cache.total_bytes))
+
+    for number in range(101):
+        cache.put(f'key{number}', ENTRY)
+
+    assert evictions == [101000]
+
+
+def test_opening_the_cache_evicts_what_other_runs_left(tmp_path):
+    cache = open_cache(tmp_path, max_bytes=0)
+    for number in range(20):
+        cache.put(f'key{number}', ENTRY)
+    with cache._connection() as connection:
+        connection.execute("UPDATE responses SET created_at = ? WHERE key = 'key0'", (time.time() - 86400 * 31,))
+
+    reopened = open_cache(tmp_path)
+
+    assert reopened.stats()['entries'] == 9
+    assert reopened.evictions == 11
+    assert reopened.total_bytes == 9000
+
+
+def test_async_requests_are_answered_from_the_cache(tmp_path, stub_llm, monkeypatch):
+    stub = stub_llm(text_reply='A cached answer.')
+    monkeypatch.setattr(openaiservice, 'OPENAI_CACHE_ENABLED', True)
+    monkeypatch.setattr(openaiservice, 'OPENAI_CACHE_PATH', str(tmp_path / 'cache.sqlite3'))
+
+    async def ask_twice():
+        with track_usage() as usage:
+            replies = [await agenerate_text('system', 'assistant', 'prompt') for _ in range(2)]
+        return replies, usage.as_dict()
+
+    replies, usage = run_llm(ask_twice())
+
+    assert replies == ['A cached answer.'] * 2
+    assert len(stub.calls) == 1
+    # Lookups run in worker threads, with this context's usage totals
+    assert usage['calls'] == 1 and usage['cache_hits'] == 1
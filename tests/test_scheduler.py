@@ -0,0 +1,94 @@
+# tests/test_scheduler.py
+
+import asyncio
+import json
+from stub_llm import BILL_TEXT, stub_bill
+
+USAGE = {'prompt_tokens': 800, 'completion_tokens': 200, 'cached_tokens': 0}
+
+
+def test_bills_are_ordered_by_priority(summarizer):
+    bills = [
+        {'href': 'private', 'bill_type': 'House of Commons Private Member’s Bill', 'house_first_reading': 'Completed'},
+        {'href': 'government', 'bill_type': 'House Government Bill'},
+        {'href': 'changed', 'bill_type': 'Senate Public Bill', 'change_status': True},
+        {'href': 'senate', 'bill_type': 'Senate Public Bill', 'last_updated_at': '2024-01-02'},
+        {'href': 'senate-older', 'bill_type': 'Senate Public Bill', 'last_updated_at': '2024-01-01'},
+        {'href': 'advanced', 'bill_type': 'House Government Bill', 'house_first_reading': 'Completed',
+         'house_second_reading': 'Completed', 'house_third_reading': 'Completed'}
+    ]
+
+    ordered = sorted(bills, key=summarizer.bill_priority, reverse=True)
+
+    assert [bill['href'] for bill in ordered] == ['changed', 'advanced', 'government', 'senate', 'senate-older', 'private']
+
+
+def test_budget_stops_at_the_token_limit(summarizer):
+    budget = summarizer.RunBudget(max_tokens=2500)
+
+    assert budget.admit((800, 200)) and budget.admit((800, 200))
+    # A third bill does not fit beside the two in flight, but the budget is not used up yet
+    assert not budget.admit((800, 200)) and budget.exhausted is None
+    budget.settle((800, 200), USAGE)
+    budget.settle((800, 200), dict(USAGE, prompt_tokens=1400))
+    assert budget.spent_tokens == 2600
+
+    assert not budget.admit((800, 200), alone=True)
+    assert budget.exhausted == '2500 token budget'
+
+
+def test_budget_stops_at_the_cost_limit(summarizer, monkeypatch):
+    monkeypatch.setattr(summarizer, 'estimate_cost', lambda model, prompt, completion, cached=0: (prompt + completion) / 1000)
+    budget = summarizer.RunBudget(max_cost_usd=1.5)
+
+    assert budget.admit((800, 200))
+    assert not budget.admit((800, 200))
+    budget.settle((800, 200), USAGE)
+    assert budget.admit((300, 100))
+    budget.settle((300, 100), USAGE)
+
+    assert not budget.admit((1, 1)) and budget.exhausted == '$1.50 cost budget'
+
+
+def test_bill_over_the_budget_starts_alone(summarizer):
+    budget = summarizer.RunBudget(max_tokens=1000)
+
+    assert budget.admit((200, 100))
+    assert not budget.admit((5000, 1000), alone=True)
+    budget.settle((200, 100), dict(USAGE, prompt_tokens=200, completion_tokens=100))
+
+    assert budget.admit((5000, 1000), alone=True)
+    assert not budget.admit((10, 10)) and budget.exhausted is None
+
+
+def test_over_budget_head_bill_does_not_starve_the_run(summarizer, stub_llm, tmp_path, monkeypatch):
+    stub = stub_llm()
+    monkeypatch.setattr(summarizer, 'LOCAL_TASKS', [])
+    monkeypatch.setattr(summarizer, 'DUPLICATE_THRESHOLD', 0)
+    monkeypatch.setattr(summarizer, 'ANALYSIS_MODE', 'fused')
+    monkeypatch.setattr(summarizer, 'RUN_MAX_TOKENS', 6000)
+    monkeypatch.setattr(summarizer, 'BILL_CONCURRENCY', 4)
+    # The changed bill comes first and its estimate alone is over the budget
+    head = dict(stub_bill('C-100', BILL_TEXT * 20), change_status=True)
+    small = [stub_bill(f'C-{number}', BILL_TEXT.replace('C-21', f'C-{number}')) for number in (101, 102)]
+    bills = [head] + small
+    keys = list(summarizer.WRAPPER_FUNCTIONS)
+    assert sum(summarizer.estimate_bill_tokens(head, keys)) > 6000
+    assert sum(sum(summarizer.estimate_bill_tokens(bill, keys)) for bill in small) < 6000
+    with open(tmp_path / summarizer.ENHANCED_BILLS_FILE, 'w') as f:
+        json.dump(bills, f)
+
+    asyncio.run(summarizer.process_bills())
+
+    with open(tmp_path / summarizer.OUTPUT_FILE) as f:
+        enhanced = {bill['bill_number']: bill for bill in json.load(f)}
+    # The smaller bills go first, then the head bill starts alone once the budget has room left
+    assert enhanced['C-101']['committees'] and enhanced['C-102']['committees']
+    assert enhanced['C-100']['committees']
+    first_head_call = min(call['started_at'] for call in stub.calls if 'C-100' in call['request']['messages'][-1]['content'])
+    small_calls = [call for call in stub.calls if 'C-100' not in call['request']['messages'][-1]['content']]
+    assert all(call['finished_at'] <= first_head_call for call in small_calls)
+
+    # Every bill is now up to date, and the next run starts with a fresh budget
+    asyncio.run(summarizer.process_bills())
+    assert len(stub.calls) == 2 * len(bills)
@@ -0,0 +1,161 @@
+# tests/test_scrape_http.py
+
+import json
+import os
+import pytest
+from conftest import load_tool, read_fixture
+
+LISTING_PAGES = 3
+
+
+@pytest.fixture(scope='module')
+def scraper():
+    return load_tool('A Scrape Bills.py')
+
+
+def listing_handler(pages):
+    """Serves pages[n - 1] for ?page=n and an empty listing page past the end."""
+    def handle(method, path, query, body):
+        page_number = int(query.get('page', ['1'])[0])
+        if page_number <= len(pages):
+            return 200, 'text/html; charset=utf-8', pages[page_number - 1].encode('utf-8')
+        return 200, 'text/html; charset=utf-8', b'<html><body><main id="bills-list"></main></body></html>'
+    return handle
+
+
+@pytest.fixture
+def listing_pages():
+    return [read_fixture('listing', f'page{number}.html') for number in range(1, LISTING_PAGES + 1)]
+
+
+@pytest.fixture
+def listing_server(fixture_server, listing_pages):
+    return fixture_server(listing_handler(listing_pages))
+
+
+def listing_url(server):
+    return server.url + '/LegisInfo/en/bills?advancedview=true'
+
+
+def test_listing_page_url_sets_page(scraper):
+    url = scraper.listing_page_url('http://host/bills?advancedview=true&page=1', 4)
+    assert url == 'http://host/bills?advancedview=true&page=4'
+
+
+def test_http_crawl_reads_every_page_in_order(scraper, listing_server):
+    bills = scraper.scrape_all_bills_http(listing_url(listing_server), max_workers=2)
+
+    assert [bill['bill_number'] for bill in bills] == ['C-21', 'S-5', 'C-234', 'S-12', 'C-318', 'S-254', 'C-69']
+    assert bills[0]['href'] == 'https://www.parl.ca/LegisInfo/en/bill/44-1/c-21'
+    # The crawl stops at the page without a "Next page" link; at most one window past it is requested
+    requested_pages = sorted({path.rsplit('page=', 1)[1] for _, path in listing_server.requests})
+    assert requested_pages[:LISTING_PAGES] == ['1', '2', '3']
+    assert len(requested_pages) <= LISTING_PAGES + 1
+
+
+def test_http_crawl_reads_stage_progress(scraper, listing_server):
+    bills = {bill['bill_number']: bill for bill in scraper.scrape_all_bills_http(listing_url(listing_server))}
+
+    assert bills['S-5']['senate_third_reading'] == 'Completed'
+    assert bills['S-5']['house_third_reading'] == 'Not Completed'
+    assert bills['S-5']['royal_assent'] == 'Not Completed'
+    assert bills['C-69']['royal_assent'] == 'Completed'
+    # A Senate public bill still in the Senate has no House group and no Royal Assent group
+    assert bills['S-254']['senate_second_reading'] == 'Not Completed'
+    assert bills['S-254']['senate_third_reading'] == 'Not Applicable'
+    assert bills['S-254']['house_first_reading'] == 'Not Applicable'
+    assert bills['S-254']['royal_assent'] == 'Not Applicable'
+
+
+def test_http_crawl_stops_without_bill_cards(scraper, fixture_server, listing_pages):
+    server = fixture_server(listing_handler(listing_pages[:1] + ['<html><body></body></html>'] + listing_pages[1:]))
+
+    bills = scraper.scrape_all_bills_http(listing_url(server), max_workers=1)
+
+    assert [bill['bill_number'] for bill in bills] == ['C-21', 'S-5', 'C-234']
+
+
+def test_delta_crawl_stops_after_unchanged_pages(scraper, listing_server):
+    stored = {bill['href']: bill for bill in scraper.scrape_all_bills_http(listing_url(listing_server))}
+    listing_server.requests.clear()
+
+    bills, stats = scraper.scrape_changed_bills_http(stored, listing_url(listing_server), unchanged_pages_to_stop=1)
+
+    assert [bill['bill_number'] for bill in bills] == ['C-21', 'S-5', 'C-234']
+    assert stats == {'pages_fetched': 1, 'pages_unchanged': 1, 'pages_skipped': 2}
+
+
+def test_delta_listing_url_sorts_by_latest_activity(scraper):
+    url = scraper.delta_listing_url('http://host/bills?advancedview=true&sortBy=Number&chamber=S')
+
+    assert url == 'http://host/bills?advancedview=true&chamber=S&sortBy=LatestActivityDateTime&sortDirection=desc'
+    assert scraper.delta_listing_url('http://host/bills') == (
+        'http://host/bills?sortBy=LatestActivityDateTime&sortDirection=desc')
+
+
+def test_delta_crawl_walks_the_given_listing(scraper, listing_server, tmp_path, capsys):
+    output_file_path = str(tmp_path / 'CanadaBills.json')
+    scraper.scrape_canada_bills('http', listing_url(listing_server), output_file_path, crawl_mode='full')
+    listing_server.requests.clear()
+
+    scraper.scrape_canada_bills('http', listing_url(listing_server), output_file_path, crawl_mode='delta')
+
+    paths = [path for _, path in listing_server.requests]
+    assert paths and all(path.startswith('/LegisInfo/en/bills?advancedview=true&sortBy=LatestActivityDateTime'
+                                         '&sortDirection=desc&page=') for path in paths)
+    assert 'Delta crawl: ' in capsys.readouterr().out
+
+
+def test_delta_crawl_warns_when_falling_back_to_selenium(scraper, fixture_server, listing_pages, tmp_path,
+                                                         monkeypatch, capsys):
+    output_file_path = str(tmp_path / 'CanadaBills.json')
+    scraper.scrape_canada_bills('http', listing_url(fixture_server(listing_handler(listing_pages))),
+                                output_file_path, crawl_mode='full')
+    crawled = []
+    monkeypatch.setattr(scraper, 'scrape_all_bills_selenium', lambda url: crawled.append(url) or [])
+
+    # A listing with no bill cards over HTTP falls back to Selenium, which has no delta crawl
+    scraper.scrape_canada_bills('http', listing_url(fixture_server(listing_handler([]))), output_file_path,
+                                crawl_mode='delta')
+
+    assert len(crawled) == 1
+    assert 'Delta crawl is only supported over HTTP' in capsys.readouterr().out
+
+
+def test_scrape_canada_bills_over_http(scraper, listing_server, tmp_path):
+    output_file_path = str(tmp_path / 'CanadaBills.json')
+
+    scraper.scrape_canada_bills('http', listing_url(listing_server), output_file_path, crawl_mode='full')
+
+    with open(output_file_path) as f:
+        stored = json.load(f)
+    assert len(stored) == 7
+    assert all(bill['change_status'] for bill in stored)
+    index_path, changelog_path = scraper.index_paths(output_file_path)
+    assert os.path.exists(index_path) and os.path.exists(changelog_path)
+
+    # A second run over the same listing only clears the change flags of the first run
+    scraper.scrape_canada_bills('http', listing_url(listing_server), output_file_path, crawl_mode='full')
+    with open(output_file_path) as f:
+        assert not any(bill['change_status'] for bill in json.load(f))
+
+    # After that, an unchanged listing leaves the file untouched
+    modified_at = os.path.getmtime(output_file_path)
+    scraper.scrape_canada_bills('http', listing_url(listing_server), output_file_path, crawl_mode='full')
+    assert os.path.getmtime(output_file_path) == modified_at
+    assert not os.path.exists(output_file_path + '.tmp')
+
+
+def test_change_status_flags_only_this_runs_changes(scraper, fixture_server, listing_pages, tmp_path):
+    output_file_path = str(tmp_path / 'CanadaBills.json')
+    server = fixture_server(listing_handler(listing_pages))
+    scraper.scrape_canada_bills('http', listing_url(server), output_file_path, crawl_mode='full')
+
+    # C-318 moves on to committee
+    before, card = listing_pages[1].split('C-318', 1)
+    listing_pages[1] = before + 'C-318' + card.replace('At second reading', 'At consideration in committee', 1)
+    scraper.scrape_canada_bills('http', listing_url(server), output_file_path, crawl_mode='full')
+
+    with open(output_file_path) as f:
+        flagged = [bill['bill_number'] for bill in json.load(f) if bill['change_status']]
+    assert flagged == ['C-318']
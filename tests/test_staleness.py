@@ -0,0 +1,110 @@
+# tests/test_staleness.py
+
+import asyncio
+import json
+import os
+import pytest
+from conftest import run_llm
+from stub_llm import BILL_TEXT, TASK_REPLIES, stub_bill
+
+
+def text_keys(summarizer):
+    return [key for key in summarizer.WRAPPER_FUNCTIONS if key != 'public_engagement']
+
+
+@pytest.fixture
+def analysed(summarizer, stub_llm, monkeypatch):
+    """C-21 with every enhanced key derived."""
+    monkeypatch.setattr(summarizer, 'LOCAL_TASKS', [])
+    stub_llm()
+    bill = stub_bill('C-21')
+    bill.update(sponsor='Hon. Marco Mendicino', bill_type='House Government Bill', contact_email='Not Available')
+    enhanced = run_llm(summarizer.process_single_bill(bill))
+    assert summarizer.stale_keys(enhanced) == []
+    return enhanced
+
+
+@pytest.mark.parametrize('change, stale', [
+    ({'current_status': 'At third reading in the House of Commons'}, ['bill_progress']),
+    ({'sponsor': 'Hon. Dominic LeBlanc'}, ['sponsor_profile']),
+    ({'bill_number': 'C-2'}, ['public_engagement']),
+    ({'similar_bills': [{'href': 'c-71'}]}, ['related_bills']),
+    ({'bill_content': BILL_TEXT.replace('protection order', 'prohibition order')}, None),
+    ({'title': 'A new title'}, [])
+])
+def test_changing_one_input_outdates_only_its_fields(summarizer, analysed, change, stale):
+    if stale is None:
+        stale = text_keys(summarizer)
+
+    assert summarizer.stale_keys(dict(analysed, **change)) == stale
+
+
+def test_only_outdated_fields_are_requested_again(summarizer, analysed, stub_llm):
+    stub = stub_llm()
+    changed = dict(analysed, similar_bills=[{'href': 'c-71', 'bill_number': 'C-71', 'parliament_session': '42-1',
+                                             'title': 'Firearms'}])
+
+    enhanced = run_llm(summarizer.process_single_bill(changed, summarizer.stale_keys(changed)))
+
+    assert stub.names() == ['related_bills']
+    assert enhanced['committees'] == analysed['committees']
+    assert summarizer.stale_keys(enhanced) == []
+
+
+def read_checkpoint(summarizer, tmp_path):
+    path = tmp_path / summarizer.ANALYSIS_CHECKPOINT_FILE
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def bill_of(call):
+    return 'C-69' if 'C-69' in json.dumps(call['request']['messages']) else 'C-21'
+
+
+def test_interrupted_run_resumes_from_the_checkpoint(summarizer, stub_llm, tmp_path, monkeypatch):
+    monkeypatch.setattr(summarizer, 'LOCAL_TASKS', [])
+    monkeypatch.setattr(summarizer, 'DUPLICATE_THRESHOLD', 0)
+    monkeypatch.setattr(summarizer, 'RELATED_TOP_K', 0)
+    monkeypatch.setattr(summarizer, 'BILL_CONCURRENCY', 1)
+    bills = [stub_bill('C-21'), stub_bill('C-69', BILL_TEXT.replace('C-21', 'C-69').replace('handguns', 'rifles'))]
+    with open(tmp_path / summarizer.ENHANCED_BILLS_FILE, 'w') as f:
+        json.dump(bills, f)
+    tasks = len(summarizer.WRAPPER_FUNCTIONS)
+
+    stub_llm(latency=0.01)
+    agenerate_text = summarizer.agenerate_text
+    calls = []
+
+    async def killed_part_way(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == tasks + 4:
+            # Killed once the second bill's other requests have been answered
+            await asyncio.sleep(0.5)
+            raise KeyboardInterrupt
+        return await agenerate_text(*args, **kwargs)
+
+    monkeypatch.setattr(summarizer, 'agenerate_text', killed_part_way)
+    with pytest.raises(KeyboardInterrupt):
+        asyncio.run(summarizer.process_bills())
+    monkeypatch.setattr(summarizer, 'agenerate_text', agenerate_text)
+
+    checkpointed = {(record['href'].rsplit('/', 1)[1].upper(), record['key'])
+                    for record in read_checkpoint(summarizer, tmp_path)}
+    assert {key for bill_number, key in checkpointed if bill_number == 'C-21'} >= set(summarizer.WRAPPER_FUNCTIONS)
+    second_bill = {key for bill_number, key in checkpointed if bill_number == 'C-69'}
+    assert second_bill and not second_bill >= set(summarizer.WRAPPER_FUNCTIONS)
+    with open(tmp_path / summarizer.OUTPUT_FILE) as f:
+        assert all('committees' not in bill for bill in json.load(f))
+
+    resumed = stub_llm()
+    asyncio.run(summarizer.process_bills())
+
+    requested = {(bill_of(call), call['name']) for call in resumed.calls}
+    assert requested and not requested & checkpointed
+    model_fields = {pair for pair in checkpointed if pair[1] in summarizer.WRAPPER_FUNCTIONS}
+    assert len(resumed.calls) == 2 * tasks - len(model_fields)
+    with open(tmp_path / summarizer.OUTPUT_FILE) as f:
+        enhanced = {bill['bill_number']: bill for bill in json.load(f)}
+    assert all(enhanced[number]['committees'] == TASK_REPLIES['committees'] for number in ('C-21', 'C-69'))
+    assert all(summarizer.stale_keys(bill) == [] for bill in enhanced.values())
+    assert not os.path.exists(tmp_path / summarizer.ANALYSIS_CHECKPOINT_FILE)
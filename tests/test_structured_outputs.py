@@ -0,0 +1,39 @@
+# tests/test_structured_outputs.py
+
+import pytest
+from conftest import run_llm
+from openaiconfig.openaiservice import GenerationError
+from stub_llm import TASK_REPLIES
+
+PARTIAL_IMPACT = {'social': TASK_REPLIES['bill_impact']['social'], 'economic': ''}
+
+
+def analyze_impact(summarizer):
+    return run_llm(summarizer.analyze_bill_impact('Bill Content: An Act respecting firearms.'))
+
+
+def test_invalid_fields_are_asked_for_again(summarizer, stub_llm):
+    stub = stub_llm({'bill_impact': PARTIAL_IMPACT})
+
+    impact = analyze_impact(summarizer)
+
+    # The re-ask only asks for the missing field, and the stub has no answer for it either
+    requested = [call['request']['response_format']['json_schema']['schema']['required'] for call in stub.calls]
+    assert requested == [['social', 'economic', 'legal'], ['legal']]
+    assert impact == dict(PARTIAL_IMPACT, legal='')
+
+
+def test_failed_reask_keeps_the_valid_fields(summarizer, stub_llm):
+    stub = stub_llm({'bill_impact': PARTIAL_IMPACT}, failures=[None, 400])
+
+    impact = analyze_impact(summarizer)
+
+    assert stub.failed == [400]
+    assert impact == dict(PARTIAL_IMPACT, legal='')
+
+
+def test_failed_first_request_raises(summarizer, stub_llm):
+    stub_llm(failures=[400])
+
+    with pytest.raises(GenerationError):
+        analyze_impact(summarizer)
@@ -0,0 +1,85 @@
+# tests/test_summarize_async.py
+
+import asyncio
+import json
+import os
+import pytest
+from conftest import run_llm
+from openaiconfig import openaiservice
+from openaiconfig.openaiservice import GenerationError, agenerate_text, concurrency_metrics, generate_text
+from stub_llm import TASK_REPLIES, stub_bill
+
+
+def test_throttled_requests_are_retried(stub_llm):
+    stub = stub_llm(text_reply='Answered.', failures=[429, 503])
+
+    async def ask():
+        reply = await agenerate_text('system', 'assistant', 'prompt')
+        return reply, concurrency_metrics()
+
+    reply, metrics = run_llm(ask())
+
+    assert reply == 'Answered.'
+    assert stub.failed == [429, 503] and len(stub.calls) == 1
+    assert metrics['throttled'] == 2 and metrics['succeeded'] == 1
+
+
+def test_other_errors_are_not_retried(stub_llm):
+    stub = stub_llm(failures=[400])
+
+    with pytest.raises(GenerationError):
+        run_llm(agenerate_text('system', 'assistant', 'prompt'))
+    assert stub.failed == [400] and stub.calls == []
+
+
+def test_sync_requests_raise_instead_of_returning_none(stub_llm, monkeypatch):
+    stub = stub_llm(text_reply='Answered.', failures=[400])
+    monkeypatch.setattr(openaiservice.openai, 'base_url', os.environ['OPENAI_BASE_URL'] + '/')
+    monkeypatch.setattr(openaiservice.openai, 'api_key', 'test')
+
+    with pytest.raises(GenerationError):
+        generate_text('system', 'assistant', 'prompt')
+    assert generate_text('system', 'assistant', 'prompt') == 'Answered.'
+    assert stub.failed == [400] and len(stub.calls) == 1
+
+
+def test_requests_in_flight_stay_within_the_concurrency_window(stub_llm, monkeypatch):
+    stub = stub_llm(text_reply='Answered.', latency=0.05)
+    monkeypatch.setattr(openaiservice, 'OPENAI_INITIAL_CONCURRENCY', 4)
+
+    async def ask_all():
+        replies = await asyncio.gather(*[agenerate_text('system', 'assistant', f'prompt {n}') for n in range(16)])
+        return replies, concurrency_metrics()
+
+    replies, metrics = run_llm(ask_all())
+
+    assert replies == ['Answered.'] * 16
+    # The window starts at 4 and widens by about one slot per window of fast responses
+    assert 1 < stub.max_in_flight <= int(metrics['window']) < 8
+
+
+def test_process_bills_end_to_end(summarizer, stub_llm, tmp_path, monkeypatch):
+    stub = stub_llm()
+    monkeypatch.setattr(summarizer, 'LOCAL_TASKS', [])
+    monkeypatch.setattr(summarizer, 'DUPLICATE_THRESHOLD', 0)
+    bills = [stub_bill('C-21'), stub_bill('S-5', 'Too short to analyze.'), stub_bill('C-69')]
+    bills[2]['bill_content'] = bills[2]['bill_content'].replace('handguns', 'assault-style firearms')
+    with open(tmp_path / summarizer.ENHANCED_BILLS_FILE, 'w') as f:
+        json.dump(bills, f)
+
+    asyncio.run(summarizer.process_bills())
+
+    with open(tmp_path / summarizer.OUTPUT_FILE) as f:
+        enhanced = {bill['bill_number']: bill for bill in json.load(f)}
+    assert len(stub.calls) == 2 * len(summarizer.WRAPPER_FUNCTIONS)
+    for bill_number in ('C-21', 'C-69'):
+        assert enhanced[bill_number]['committees'] == TASK_REPLIES['committees']
+        assert enhanced[bill_number]['public_engagement'] == TASK_REPLIES['public_engagement']
+    assert 'committees' not in enhanced['S-5'] and enhanced['S-5']['bill_progress']
+    assert not os.path.exists(tmp_path / summarizer.ANALYSIS_CHECKPOINT_FILE)
+    with open(tmp_path / summarizer.RUN_REPORT_FILE) as f:
+        assert json.load(f)['totals']['calls'] == len(stub.calls)
+
+    # Every field is up to date, so a second run sends nothing
+    asyncio.run(summarizer.process_bills())
+    assert len(stub.calls) == 2 * len(summarizer.WRAPPER_FUNCTIONS)
@@ -0,0 +1,47 @@
+# tests/test_summarize_batch.py
+
+import asyncio
+import json
+from openaiconfig import openaiservice
+from stub_llm import StubBatchLLM, TASK_REPLIES, stub_bill
+
+
+def test_batch_run_reads_answers_back_despite_cache_bypass(summarizer, stub_llm, tmp_path, monkeypatch):
+    stub = stub_llm(stub_class=StubBatchLLM)
+    monkeypatch.setattr(openaiservice, 'OPENAI_CACHE_ENABLED', True)
+    monkeypatch.setattr(openaiservice, 'OPENAI_CACHE_BYPASS', True)
+    monkeypatch.setattr(openaiservice, 'OPENAI_CACHE_PATH', str(tmp_path / 'cache.sqlite3'))
+    monkeypatch.setattr(summarizer, 'LOCAL_TASKS', [])
+    with open(tmp_path / summarizer.ENHANCED_BILLS_FILE, 'w') as f:
+        json.dump([stub_bill()], f)
+
+    asyncio.run(summarizer.process_bills_batch())
+
+    # One batch of every task; the second round finds all of them in the cache and submits nothing
+    assert len(stub.batches) == 1
+    assert len(stub.batches[0]['lines']) == len(summarizer.WRAPPER_FUNCTIONS)
+    assert stub.calls == []
+    with open(tmp_path / summarizer.OUTPUT_FILE) as f:
+        enhanced = json.load(f)[0]
+    assert enhanced['committees'] == TASK_REPLIES['committees']
+    assert enhanced['summary']['content'] == TASK_REPLIES['summary']['content']
+
+
+def test_batch_responses_outlive_cache_eviction(summarizer, stub_llm, tmp_path, monkeypatch):
+    stub = stub_llm(stub_class=StubBatchLLM)
+    monkeypatch.setattr(openaiservice, 'OPENAI_CACHE_ENABLED', True)
+    monkeypatch.setattr(openaiservice, 'OPENAI_CACHE_PATH', str(tmp_path / 'cache.sqlite3'))
+    # Every entry is evicted as soon as it is stored
+    openaiservice.get_response_cache().max_bytes = 1
+    monkeypatch.setattr(summarizer, 'LOCAL_TASKS', [])
+    with open(tmp_path / summarizer.ENHANCED_BILLS_FILE, 'w') as f:
+        json.dump([stub_bill()], f)
+
+    asyncio.run(summarizer.process_bills_batch())
+
+    assert openaiservice.get_response_cache().stats()['entries'] == 0
+    assert len(stub.batches) == 1
+    with open(tmp_path / summarizer.OUTPUT_FILE) as f:
+        enhanced = json.load(f)[0]
+    assert enhanced['committees'] == TASK_REPLIES['committees']
+    assert not (tmp_path / summarizer.BATCH_RESPONSES_FILE).exists()
@@ -0,0 +1,69 @@
+# tests/test_summarize_fused.py
+
+import copy
+from conftest import run_llm
+from stub_llm import FUSED_REPLY, STUB_REPLIES, TASK_REPLIES, stub_bill
+
+
+def model_keys(summarizer):
+    return list(summarizer.WRAPPER_FUNCTIONS)
+
+
+def test_fused_request_answers_every_fused_task(summarizer, stub_llm, monkeypatch):
+    stub = stub_llm()
+    monkeypatch.setattr(summarizer, 'ANALYSIS_MODE', 'fused')
+    monkeypatch.setattr(summarizer, 'LOCAL_TASKS', [])
+
+    enhanced = run_llm(summarizer.process_single_bill(stub_bill(), model_keys(summarizer)))
+
+    # One request for the nine fused tasks, one for public engagement, which is not fused
+    assert sorted(stub.names()) == ['fused_analysis', 'public_engagement']
+    fused = next(call['request'] for call in stub.calls if call['name'] == 'fused_analysis')
+    assert fused['response_format']['json_schema']['schema']['required'] == list(summarizer.FUSED_TASKS)
+    assert enhanced['committees'] == TASK_REPLIES['committees']
+    assert enhanced['future_projections'] == TASK_REPLIES['future_projections']
+    assert enhanced['public_engagement'] == TASK_REPLIES['public_engagement']
+    assert enhanced['summary']['content'] == TASK_REPLIES['summary']['content']
+    assert enhanced['summary']['generated_on']
+    assert set(enhanced['analysis_inputs']) == set(model_keys(summarizer))
+
+
+def test_invalid_fused_fields_fall_back_to_their_own_requests(summarizer, stub_llm, monkeypatch):
+    replies = copy.deepcopy(STUB_REPLIES)
+    replies['fused_analysis'] = dict(FUSED_REPLY, committees={'committees': 'Public Safety'}, summary={
+        'content': '  ', 'format': 'HTML', 'generated_on': ''})
+    del replies['fused_analysis']['debates']
+    stub = stub_llm(replies)
+    monkeypatch.setattr(summarizer, 'ANALYSIS_MODE', 'fused')
+    monkeypatch.setattr(summarizer, 'LOCAL_TASKS', [])
+
+    enhanced = run_llm(summarizer.process_single_bill(stub_bill(), model_keys(summarizer)))
+
+    # A list given as a string, an empty summary and a missing field are each asked for on their own
+    assert sorted(stub.names()) == ['committees', 'debates', 'fused_analysis', 'public_engagement', 'summary']
+    assert enhanced['committees'] == TASK_REPLIES['committees']
+    assert enhanced['debates'] == TASK_REPLIES['debates']
+    assert enhanced['summary']['content'] == TASK_REPLIES['summary']['content']
+    assert enhanced['stakeholder_analysis'] == TASK_REPLIES['stakeholder_analysis']
+
+
+def test_failed_fused_request_falls_back_to_per_task_requests(summarizer, stub_llm, monkeypatch):
+    stub = stub_llm(failures=[400])
+    monkeypatch.setattr(summarizer, 'ANALYSIS_MODE', 'fused')
+    monkeypatch.setattr(summarizer, 'LOCAL_TASKS', [])
+
+    enhanced = run_llm(summarizer.process_single_bill(stub_bill(), model_keys(summarizer)))
+
+    assert stub.failed == [400]
+    assert sorted(stub.names()) == sorted(model_keys(summarizer))
+    assert all(enhanced[key] == TASK_REPLIES[key] for key in model_keys(summarizer) if key != 'summary')
+
+
+def test_per_task_mode_sends_one_request_per_task(summarizer, stub_llm, monkeypatch):
+    stub = stub_llm()
+    monkeypatch.setattr(summarizer, 'LOCAL_TASKS', [])
+
+    enhanced = run_llm(summarizer.process_single_bill(stub_bill(), model_keys(summarizer)))
+
+    assert sorted(stub.names()) == sorted(model_keys(summarizer))
+    assert enhanced['bill_impact'] == TASK_REPLIES['bill_impact']
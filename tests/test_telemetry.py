@@ -0,0 +1,120 @@
+# tests/test_telemetry.py
+
+import json
+import math
+import re
+from types import SimpleNamespace
+import pytest
+from openaiconfig.telemetry import (Histogram, Telemetry, collect_telemetry, estimate_cost, model_prices, record_call,
+                                    record_parse, telemetry_labels)
+
+# metric_name{label="value",...} number
+SAMPLE_LINE = re.compile(r'^[a-z_]+(\{[a-z]+="(?:[^"\\]|\\.)*"(?:,[a-z]+="(?:[^"\\]|\\.)*")*\})? -?[0-9.e+-]+$')
+
+
+def usage(prompt_tokens, completion_tokens, cached_tokens=0):
+    return SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                           prompt_tokens_details=SimpleNamespace(cached_tokens=cached_tokens))
+
+
+@pytest.fixture(autouse=True)
+def list_prices(monkeypatch):
+    for name in ('OPENAI_PRICE_INPUT_PER_1M', 'OPENAI_PRICE_CACHED_INPUT_PER_1M', 'OPENAI_PRICE_OUTPUT_PER_1M'):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_histogram_quantiles_are_nearest_rank():
+    histogram = Histogram((10, 50, 100))
+    for value in reversed(range(1, 101)):
+        histogram.observe(value)
+
+    assert [histogram.quantile(q) for q in (0, 0.5, 0.95, 0.99, 1)] == [1, 50, 95, 99, 100]
+    assert histogram.bucket_counts() == [(10, 10), (50, 50), (100, 100), (math.inf, 100)]
+    assert histogram.summary() == {'count': 100, 'sum': 5050, 'p50': 50, 'p95': 95, 'p99': 99, 'max': 100}
+    assert Histogram((1,)).quantile(0.5) is None
+    assert Histogram((1,)).summary()['max'] is None
+
+
+def test_cost_uses_the_cached_rate_and_model_overrides(monkeypatch):
+    assert model_prices('gpt-4o-mini-2024-07-18') == model_prices('gpt-4o-mini') == (0.15, 0.075, 0.60)
+    assert model_prices('unknown-model') == (0.0, 0.0, 0.0)
+    assert estimate_cost('gpt-4o-mini', 1000, 100, cached_tokens=200) == pytest.approx(0.000195)
+
+    monkeypatch.setenv('OPENAI_PRICE_OUTPUT_PER_1M', '1.0')
+    assert model_prices('gpt-4o-mini') == (0.15, 0.075, 1.0)
+
+
+def test_calls_are_accounted_per_task_and_per_bill():
+    with collect_telemetry('gpt-4o-mini') as telemetry:
+        record_call(usage(500, 50), 1.0)
+        with telemetry_labels(bill='C-21'):
+            with telemetry_labels(task='summary'):
+                record_call(usage(1000, 100, cached_tokens=200), 2.0, retries=1)
+                record_parse(1, 0, 0.01)
+            with telemetry_labels(task='committees'):
+                record_call(None, None, retries=2, failed=True)
+                record_parse(1, 1, 0.01)
+                record_parse(1, 0, 0.01, reask=True)
+    # Calls outside the block are not recorded
+    record_call(usage(1000, 100), 1.0)
+
+    report = telemetry.report()
+
+    assert list(report['tasks']) == ['summary', 'other', 'committees']
+    summary = report['tasks']['summary']
+    assert summary['cost_usd'] == pytest.approx(0.000195)
+    assert summary['cached_ratio'] == 0.2 and summary['retries'] == 1
+    assert summary['latency_seconds']['p50'] == 2.0
+    committees = report['tasks']['committees']
+    assert committees['errors'] == 1 and committees['latency_seconds'] is None
+    assert committees['reask_rate'] == 1.0 and committees['invalid_fields'] == 1
+    assert report['bills']['C-21']['calls'] == 2
+    assert report['bills']['C-21']['cost_usd'] == pytest.approx(0.000195)
+    assert report['totals']['calls'] == 3
+    assert report['totals']['cost_usd'] == pytest.approx(0.000195 + (500 * 0.15 + 50 * 0.60) / 1e6)
+
+
+def test_prometheus_text_format():
+    telemetry = Telemetry('gpt-4o-mini')
+    telemetry.record_call('summary', 'C-21', usage(1000, 100, cached_tokens=200), 0.3)
+    telemetry.record_call('summary', 'C-21', usage(1000, 100), 7.0, retries=1)
+    telemetry.record_call('say "hi"\n', None, None, None, failed=True)
+    telemetry.record_bill('C-21', 12.5)
+
+    text = telemetry.prometheus()
+    lines = text.splitlines()
+
+    assert text.endswith('\n')
+    for line in lines:
+        assert line.startswith(('# HELP bill_analyzer_', '# TYPE bill_analyzer_')) or SAMPLE_LINE.match(line), line
+    assert '# TYPE bill_analyzer_llm_requests_total counter' in lines
+    assert 'bill_analyzer_llm_requests_total{task="summary",outcome="ok"} 2' in lines
+    # Label values are escaped
+    assert 'bill_analyzer_llm_requests_total{task="say \\"hi\\"\\n",outcome="error"} 1' in lines
+    assert 'bill_analyzer_llm_tokens_total{task="summary",kind="cached"} 200' in lines
+    assert 'bill_analyzer_llm_cost_usd_total{task="summary"} 0.000405' in lines
+    # Histogram buckets are cumulative and end with +Inf, _sum and _count
+    durations = [line for line in lines if line.startswith('bill_analyzer_llm_request_duration_seconds')]
+    assert durations[:2] == ['bill_analyzer_llm_request_duration_seconds_bucket{task="summary",le="0.25"} 0',
+                             'bill_analyzer_llm_request_duration_seconds_bucket{task="summary",le="0.5"} 1']
+    assert durations[-3:] == ['bill_analyzer_llm_request_duration_seconds_bucket{task="summary",le="+Inf"} 2',
+                              'bill_analyzer_llm_request_duration_seconds_sum{task="summary"} 7.3',
+                              'bill_analyzer_llm_request_duration_seconds_count{task="summary"} 2']
+    assert 'bill_analyzer_bill_processing_duration_seconds_bucket{le="30"} 1' in lines
+    assert 'bill_analyzer_bill_processing_duration_seconds_count 1' in lines
+    # No per-bill series
+    assert 'C-21' not in text
+
+
+def test_write_replaces_both_files(tmp_path):
+    telemetry = Telemetry('gpt-4o-mini')
+    telemetry.record_call('summary', 'C-21', usage(1000, 100), 1.0)
+    report_path, metrics_path = str(tmp_path / 'report.json'), str(tmp_path / 'metrics.prom')
+
+    telemetry.write(report_path, metrics_path)
+
+    with open(report_path) as file:
+        assert json.load(file)['totals']['calls'] == 1
+    with open(metrics_path) as file:
+        assert file.read() == telemetry.prometheus()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['metrics.prom', 'report.json']